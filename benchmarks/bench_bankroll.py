@@ -0,0 +1,60 @@
+"""
+Monte Carlo bankroll simulation time: fractional-Kelly seasons, each betting on one posterior
+draw, with outcomes resampled from the de-vigged market or bootstrapped from the results,
+on a synthetic season with a fitted (Laplace) posterior.
+
+    python benchmarks/bench_bankroll.py --seasons 1 --sims 10000 --kelly 0.25
+    python benchmarks/bench_bankroll.py --outcomes bootstrap
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.betting import BANKROLL_OUTCOMES, bankroll_summary, simulate_bankroll
+from src.mlb_betting.config import MODEL_FEATURES
+from src.mlb_betting.modeling import BayesianBettingModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--sims', type=int, default=10000)
+    parser.add_argument('--kelly', type=float, default=0.25)
+    parser.add_argument('--threshold', type=float, default=0.02)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--outcomes', default='market', choices=BANKROLL_OUTCOMES,
+                        help="Where simulated results come from")
+    args = parser.parse_args()
+
+    # 1. Engineered seasons and a quick posterior
+    games = synthetic.generate_games(range(2024 - args.seasons, 2024))
+    df_long = features.create_team_centric_df(synthetic.merged_frame(games))
+    df = features.finalize_training_data(features.calculate_advanced_features(features.calculate_form_features(df_long)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = BayesianBettingModel(model_path=str(Path(tmp) / "model.nc"))
+        model.train(df, MODEL_FEATURES, backend='laplace', random_seed=0)
+
+        # 2. Simulated seasons
+        start = time.perf_counter()
+        sims = simulate_bankroll(df, model, n_sims=args.sims, kelly_fraction=args.kelly,
+                                 threshold=args.threshold, chunk_size=args.chunk_size, seed=0,
+                                 outcomes=args.outcomes)
+        elapsed = time.perf_counter() - start
+
+    summary = bankroll_summary(sims)
+    print(f"\nrows: {len(df)}, simulated seasons: {args.sims}, Kelly fraction: {args.kelly}")
+    print(f"simulate_bankroll: {elapsed:.2f}s ({elapsed / args.sims * 1e6:.0f} us / season)")
+    print(f"outcomes: {summary['outcomes']}")
+    print(f"risk of ruin: {summary['risk_of_ruin']:.3%}, P(profit): {summary['prob_profit']:.1%}")
+    print(summary['distribution'].round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
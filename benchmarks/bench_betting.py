@@ -0,0 +1,97 @@
+"""
+Betting simulation time: the original row-wise simulate_betting against the array-based
+one, and a whole threshold x stake-rule sweep in one sweep_betting call.
+
+    python benchmarks/bench_betting.py --seasons 5 --thresholds 100
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.betting import simulate_betting, sweep_betting
+
+
+def legacy_simulate_betting(df, threshold=0.05, stake=100):
+    """
+    The original implementation, kept here as the reference
+    """
+    sim = df.copy()
+
+    def us_odds_to_prob(odds):
+        if pd.isna(odds): return np.nan
+        if odds > 0:
+            return 100 / (odds + 100)
+        else:
+            return (-odds) / (-odds + 100)
+
+    sim['vegas_prob'] = sim['moneyline_closing'].apply(us_odds_to_prob)
+    sim['edge'] = sim['my_prob'] - sim['vegas_prob']
+    sim['bet_placed'] = sim['edge'] > threshold
+
+    def calculate_pnl(row):
+        if not row['bet_placed']: return 0
+        if row['moneyline_closing'] > 0:
+            decimal_odds = 1 + (row['moneyline_closing'] / 100)
+        else:
+            decimal_odds = 1 + (100 / -row['moneyline_closing'])
+        if row['result'] == 1:
+            return stake * (decimal_odds - 1)
+        else:
+            return -stake
+
+    sim['pnl'] = sim.apply(calculate_pnl, axis=1)
+    total_bets = sim['bet_placed'].sum()
+    total_profit = sim['pnl'].sum()
+    roi = (total_profit / (total_bets * stake)) * 100 if total_bets > 0 else 0
+    return {"total_bets": int(total_bets), "total_profit": float(total_profit), "roi": float(roi)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--thresholds', type=int, default=100)
+    args = parser.parse_args()
+
+    # 1. Backtest-shaped rows: engineered seasons plus a noisy model probability
+    games = synthetic.generate_games(range(2024 - args.seasons, 2024))
+    df_long = features.create_team_centric_df(synthetic.merged_frame(games))
+    df = features.finalize_training_data(features.calculate_advanced_features(features.calculate_form_features(df_long)))
+    rng = np.random.default_rng(0)
+    df['my_prob'] = np.clip(df['log5_prob'] + rng.normal(0, 0.05, len(df)), 0.01, 0.99)
+    thresholds = np.linspace(0, 0.2, args.thresholds)
+
+    # 2. One setting, old and new
+    start = time.perf_counter()
+    expected = legacy_simulate_betting(df, 0.05)
+    t_old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = simulate_betting(df, 0.05)
+    t_new = time.perf_counter() - start
+    assert result['total_bets'] == expected['total_bets']
+    assert np.isclose(result['total_profit'], expected['total_profit'])
+
+    # 3. The full grid in one call
+    start = time.perf_counter()
+    table = sweep_betting(df, thresholds, stakes=[50, 100], kelly_fractions=[0.1, 0.25, 0.5])
+    t_sweep = time.perf_counter() - start
+
+    print(f"rows: {len(df)}")
+    print(f"row-wise simulate_betting, 1 setting:    {t_old:8.3f}s")
+    print(f"array simulate_betting, 1 setting:       {t_new:8.3f}s  ({t_old / t_new:.0f}x)")
+    print(f"sweep_betting, {len(table):4d} settings:           {t_sweep:8.3f}s")
+    print(f"row-wise equivalent of the sweep (est.): {t_old * len(table):8.1f}s")
+    best = table.sort_values('roi', ascending=False).head(3)
+    print(best[['stake_rule', 'stake', 'threshold', 'total_bets', 'total_profit', 'roi']].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
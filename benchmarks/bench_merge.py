@@ -0,0 +1,96 @@
+"""
+Schedule / odds join time: the original many-to-many merge + score filter against the
+keyed one-to-one join, on synthetic seasons with doubleheaders.
+
+    python benchmarks/bench_merge.py --seasons 5 --doubleheader-rate 0.05
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import pandas as pd
+
+from src.mlb_betting import synthetic
+from src.mlb_betting.config import get_team_abbr
+from src.mlb_betting.data_loading import BettingDataLoader, _merge_games_and_odds
+
+
+def legacy_merge(df_mlb, df_odds):
+    """
+    The original implementation, kept here as the reference
+    """
+    df_mlb = df_mlb.sort_values('date')
+    df_mlb = df_mlb.drop_duplicates(subset=['game_id'], keep='last')
+    mask_valid = (df_mlb['home_score'] > 0) | (df_mlb['away_score'] > 0) | (df_mlb['home_hits'] > 0)
+    df_mlb = df_mlb[mask_valid].copy()
+
+    df_mlb['date'] = pd.to_datetime(df_mlb['date'])
+    df_odds['date'] = pd.to_datetime(df_odds['date'])
+    df_mlb['home_abbr'] = df_mlb['home_team'].apply(get_team_abbr)
+    df_mlb['away_abbr'] = df_mlb['away_team'].apply(get_team_abbr)
+    df_odds['home_abbr'] = df_odds['home_team_abbr']
+    df_odds['away_abbr'] = df_odds['away_team_abbr']
+
+    df_merged = pd.merge(
+        df_mlb, df_odds, how='left',
+        left_on=['date', 'home_abbr', 'away_abbr'],
+        right_on=['date', 'home_team_abbr', 'away_team_abbr'],
+        suffixes=('', '_odds')
+    )
+    condition = (
+        (df_merged['home_score'] == df_merged['home_score_odds']) &
+        (df_merged['away_score'] == df_merged['away_score_odds'])
+    ) | (df_merged['home_score_odds'].isna())
+    return df_merged[condition].copy(), len(df_merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--doubleheader-rate', type=float, default=0.05)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # 1. Schedule and selected-book odds, as load_and_merge_seasons sees them
+    games = synthetic.generate_games(range(2024 - args.seasons, 2024), doubleheader_rate=args.doubleheader_rate)
+    df_mlb = synthetic.schedule_frame(games)
+    with tempfile.TemporaryDirectory() as tmp:
+        odds_file = synthetic.write_odds_file(games, str(Path(tmp) / "odds.json"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_odds = BettingDataLoader(odds_file).load_odds(stream=True)
+    n_doubleheaders = int((games['game_number'] > 1).sum())
+
+    # 2. Best of a few runs each
+    def timed(fn):
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()) as log:
+                result = fn(df_mlb.copy(), df_odds.copy())
+            best = min(best, time.perf_counter() - start)
+        return best, result, log.getvalue().strip()
+
+    t_old, (df_old, n_blowup), _ = timed(legacy_merge)
+    t_new, df_new, report = timed(_merge_games_and_odds)
+
+    print(f"games: {len(df_mlb)} ({n_doubleheaders} doubleheader second games), odds records: {len(df_odds)}")
+    print(f"legacy merge + score filter: {t_old:7.3f}s  intermediate rows {n_blowup}, output rows {len(df_old)}, "
+          f"duplicated game_ids {int(df_old['game_id'].duplicated().sum())}")
+    print(f"keyed one-to-one join:       {t_new:7.3f}s  output rows {len(df_new)} ({t_old / t_new:.1f}x)")
+    print(report)
+
+    # Same odds on every game the old join got right
+    old = df_old.drop_duplicates('game_id', keep=False).set_index('game_id')['home_moneyline']
+    new = df_new.set_index('game_id')['home_moneyline'].loc[old.index]
+    assert new.equals(old), "keyed join disagrees with the legacy join on unambiguous games"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Peak memory / wall time of BettingDataLoader.load_odds: json.load path vs stream=True.
+
+    python benchmarks/bench_odds_memory.py --seasons 5
+
+Each mode runs in its own subprocess so peak RSS is not shared between them.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.mlb_betting import synthetic
+from src.mlb_betting.data_loading import BettingDataLoader
+
+
+def measure(odds_file: str, stream: bool):
+    loader = BettingDataLoader(odds_file)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = loader.load_odds(stream=stream)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ru_maxrss is KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    table_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"{'stream' if stream else 'json.load':>10} | rows {len(df):>7} | {elapsed:6.2f}s | "
+          f"tracemalloc peak {peak / 1e6:8.1f} MB | peak RSS {peak_rss:8.1f} MB | table {table_mb:6.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=5)
+    parser.add_argument('--odds-file', help="Existing odds_history.json (skips the synthetic file)")
+    parser.add_argument('--mode', choices=['eager', 'stream'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        measure(args.odds_file, stream=args.mode == 'stream')
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        odds_file = args.odds_file
+        if odds_file is None:
+            odds_file = os.path.join(tmp, "odds_history.json")
+            games = synthetic.generate_games(range(2024 - args.seasons, 2024))
+            synthetic.write_odds_file(games, odds_file)
+
+        print(f"Odds file: {os.path.getsize(odds_file) / 1e6:.1f} MB")
+        for mode in ['eager', 'stream']:
+            subprocess.run(
+                [sys.executable, __file__, '--mode', mode, '--odds-file', odds_file],
+                check=True
+            )
+
+
+if __name__ == "__main__":
+    main()
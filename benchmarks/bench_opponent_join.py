@@ -0,0 +1,71 @@
+"""
+Wall time and output size of features.calculate_advanced_features: the original
+(date, opponent) hash merge against pairing the two rows of each game_id, on synthetic seasons.
+
+    python benchmarks/bench_opponent_join.py --seasons 1 5 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting import features, synthetic
+
+
+def legacy_advanced_features(df):
+    """
+    The original implementation, kept here as the reference
+    """
+    df_adv = df.copy()
+    df_adv['rest_days'] = df_adv.groupby('team')['date'].diff().dt.days
+    df_adv['rest_days'] = df_adv['rest_days'].fillna(5).astype(features.METRIC_DTYPE)
+
+    opponent_stats = df_adv[['date', 'team', 'rolling_pythag_win_pct']].copy()
+    opponent_stats = opponent_stats.rename(columns={'team': 'opponent', 'rolling_pythag_win_pct': 'opp_pythag_win_pct'})
+    df_adv = pd.merge(df_adv, opponent_stats, on=['date', 'opponent'], how='left')
+
+    df_adv['log5_prob'] = features.log5_prob(df_adv['rolling_pythag_win_pct'], df_adv['opp_pythag_win_pct'])
+    return df_adv
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--doubleheader-rate', type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(f"{'seasons':>7} | {'games':>6} | {'legacy':>8} {'rows':>7} | {'game_id':>8} {'rows':>7} | speedup")
+    for n_seasons in args.seasons:
+        games = synthetic.generate_games(range(2024 - n_seasons, 2024), doubleheader_rate=args.doubleheader_rate)
+        df_form = features.calculate_form_features(features.create_team_centric_df(synthetic.merged_frame(games)))
+
+        t_old, expected = best_of(lambda: legacy_advanced_features(df_form.drop(columns='game_id')))
+        t_new, result = best_of(lambda: features.calculate_advanced_features(df_form))
+        assert len(result) == 2 * len(games)
+
+        # Identical wherever the old join was unambiguous (no doubleheader that day)
+        single = ~expected.duplicated(['date', 'team'], keep=False).to_numpy()
+        clean = ~result.duplicated(['date', 'team'], keep=False).to_numpy()
+        for col in ['opp_pythag_win_pct', 'log5_prob', 'rest_days']:
+            assert np.array_equal(expected.loc[single, col].to_numpy(), result.loc[clean, col].to_numpy(), equal_nan=True), col
+
+        print(f"{n_seasons:>7} | {len(games):>6} | {t_old:7.3f}s {len(expected):>7} | {t_new:7.3f}s {len(result):>7} | {t_old / t_new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Scoring time of BayesianBettingModel.predict (closed form over the posterior draws)
+against the original pm.sample_posterior_predictive path, on a synthetic season,
+plus the cold start of a fresh process scoring from the saved artifact.
+
+    python benchmarks/bench_predict.py --seasons 1 --draws 1000 --chains 2
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import arviz as az
+import numpy as np
+import pymc as pm
+
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.config import MODEL_FEATURES
+from src.mlb_betting.modeling import BayesianBettingModel
+
+
+def legacy_predict(model, df_new, feature_cols):
+    """
+    The original posterior predictive implementation, kept here as the reference
+    """
+    X_scaled = model.transform(df_new[feature_cols].values)
+
+    with pm.Model():
+        alpha = pm.Normal("alpha", mu=0, sigma=1)
+        betas = pm.Normal("betas", mu=0, sigma=1, shape=X_scaled.shape[1])
+        theta = pm.math.sigmoid(alpha + pm.math.dot(X_scaled, betas))
+        pm.Bernoulli("y_obs", p=theta, shape=len(X_scaled))
+        pm.sample_posterior_predictive(model.trace, var_names=["y_obs"], extend_inferencedata=True, progressbar=False)
+
+    return model.trace.posterior_predictive["y_obs"].mean(dim=["chain", "draw"]).values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--draws', type=int, default=1000)
+    parser.add_argument('--chains', type=int, default=2)
+    args = parser.parse_args()
+
+    # 1. A season of training rows and a stand-in posterior (no sampling needed to time scoring)
+    games = synthetic.generate_games(range(2024 - args.seasons, 2024))
+    df_long = features.create_team_centric_df(synthetic.merged_frame(games))
+    df_train = features.finalize_training_data(features.calculate_advanced_features(features.calculate_form_features(df_long)))
+
+    rng = np.random.default_rng(0)
+    model = BayesianBettingModel(model_path="unused.nc")
+    model.feature_cols = MODEL_FEATURES
+    model.fit_preprocessing(df_train[MODEL_FEATURES].values)
+    model.trace = az.from_dict(posterior={
+        'alpha': rng.normal(0, 0.1, (args.chains, args.draws)),
+        'betas': rng.normal(0, 0.1, (args.chains, args.draws, len(MODEL_FEATURES))),
+    })
+
+    # 2. Time both paths
+    start = time.perf_counter()
+    probs = model.predict(df_train, MODEL_FEATURES)
+    t_new = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_interval = model.predict(df_train, MODEL_FEATURES, credible_interval=0.9)
+    t_interval = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = legacy_predict(model, df_train, MODEL_FEATURES)
+    t_old = time.perf_counter() - start
+
+    print(f"rows: {len(df_train)}, posterior draws: {args.chains * args.draws}")
+    print(f"posterior predictive:  {t_old:8.3f}s")
+    print(f"closed form:           {t_new:8.3f}s  ({t_old / t_new:.0f}x)")
+    print(f"closed form + 90% CI:  {t_interval:8.3f}s")
+    print(f"max |difference| (sampling noise of the old path): {np.abs(probs - legacy).max():.4f}")
+    assert np.allclose(probs, df_interval['prob_mean'])
+
+    # 3. Cold start: new interpreter, load the artifact, score the season
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_dir = model.save(str(Path(tmp) / "artifact"))
+        rows = str(Path(tmp) / "rows.parquet")
+        df_train.to_parquet(rows)
+        script = (
+            "import sys, time; start = time.perf_counter()\n"
+            f"sys.path.append({str(PROJECT_ROOT)!r})\n"
+            "import pandas as pd\n"
+            "from src.mlb_betting.modeling import BayesianBettingModel\n"
+            f"probs = BayesianBettingModel.load({artifact_dir!r}).predict(pd.read_parquet({rows!r}))\n"
+            "print(f'{time.perf_counter() - start:.3f}')\n"
+        )
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+        t_process = time.perf_counter() - start
+    print(f"cold start (imports + load + score): {float(out.split()[-1]):.3f}s in-process, {t_process:.3f}s wall incl. interpreter")
+
+
+if __name__ == "__main__":
+    main()
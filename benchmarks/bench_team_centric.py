@@ -0,0 +1,92 @@
+"""
+Peak memory / wall time of features.create_team_centric_df against the original
+copy-rename-concat implementation, on a merged frame padded with extra odds columns.
+
+    python benchmarks/bench_team_centric.py --seasons 1 5 20 --extra-columns 40
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting import features, synthetic
+
+
+def legacy_team_centric_df(df_master):
+    """
+    The original implementation: two full copies, renamed, concatenated, then subset and sorted
+    """
+    df_home = df_master.copy().rename(columns={
+        'home_team_abbr': 'team', 'away_team_abbr': 'opponent', 'home_score': 'runs_scored',
+        'away_score': 'runs_allowed', 'home_hits': 'hits', 'home_errors': 'errors',
+        'away_hits': 'opp_hits', 'away_errors': 'opp_errors', 'home_moneyline': 'moneyline_closing',
+        'away_moneyline': 'moneyline_opp'
+    })
+    df_home['is_home'] = 1
+    df_home['result'] = (df_home['runs_scored'] > df_home['runs_allowed']).astype(int)
+
+    df_away = df_master.copy().rename(columns={
+        'away_team_abbr': 'team', 'home_team_abbr': 'opponent', 'away_score': 'runs_scored',
+        'home_score': 'runs_allowed', 'away_hits': 'hits', 'away_errors': 'errors',
+        'home_hits': 'opp_hits', 'home_errors': 'opp_errors', 'away_moneyline': 'moneyline_closing',
+        'home_moneyline': 'moneyline_opp'
+    })
+    df_away['is_home'] = 0
+    df_away['result'] = (df_away['runs_scored'] > df_away['runs_allowed']).astype(int)
+
+    cols_to_keep = [
+        'date', 'team', 'opponent', 'is_home', 'result',
+        'runs_scored', 'runs_allowed', 'hits', 'errors', 'moneyline_closing'
+    ]
+    df_long = pd.concat([df_home[cols_to_keep], df_away[cols_to_keep]])
+    return df_long.sort_values(['team', 'date']).reset_index(drop=True)
+
+
+def measure(func, df, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak / 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--extra-columns', type=int, default=40,
+                        help="Extra per-book odds columns on the merged frame")
+    args = parser.parse_args()
+
+    print(f"{'seasons':>7} | {'games':>6} | {'frame MB':>8} | {'legacy':>17} | {'new':>17} | speedup")
+    for n_seasons in args.seasons:
+        games = synthetic.generate_games(range(2024 - n_seasons, 2024))
+        df_master = synthetic.merged_frame(games)
+        rng = np.random.default_rng(0)
+        for i in range(args.extra_columns):
+            df_master[f'book_{i}_moneyline'] = rng.normal(0, 150, len(df_master))
+
+        frame_mb = df_master.memory_usage(deep=True).sum() / 1e6
+        t_old, mem_old, expected = measure(legacy_team_centric_df, df_master)
+        t_new, mem_new, result = measure(features.create_team_centric_df, df_master)
+        # Same values once the legacy object / int64 output is stored in the pipeline dtypes
+        pd.testing.assert_frame_equal(features.compact_dtypes(expected), result.drop(columns='game_id'), check_exact=True)
+
+        print(f"{n_seasons:>7} | {len(df_master):>6} | {frame_mb:8.1f} | "
+              f"{t_old:6.3f}s {mem_old:6.1f} MB | {t_new:6.3f}s {mem_new:6.1f} MB | {t_old / t_new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Wall time and hold-out log-loss of every BayesianBettingModel.train backend, on the
+same synthetic seasons (train on all but the last month, score the last month).
+
+    python benchmarks/bench_training.py --seasons 1 --backends nuts advi fullrank_advi laplace
+    python benchmarks/bench_training.py --backends nuts --adaptive   # fixed budget vs convergence-driven NUTS
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.config import MODEL_FEATURES
+from src.mlb_betting.modeling import BayesianBettingModel, TRAINING_BACKENDS
+
+
+def log_loss(y, p):
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--backends', nargs='+', default=list(TRAINING_BACKENDS), choices=TRAINING_BACKENDS)
+    parser.add_argument('--draws', type=int, default=2000)
+    parser.add_argument('--tune', type=int, default=None, help="Per chain (default: train()'s)")
+    parser.add_argument('--adaptive', action='store_true', help="Also run NUTS in adaptive (early stopping) mode")
+    args = parser.parse_args()
+
+    games = synthetic.generate_games(range(2024 - args.seasons, 2024))
+    df = features.finalize_training_data(features.calculate_advanced_features(
+        features.calculate_form_features(features.create_team_centric_df(synthetic.merged_frame(games)))))
+    cutoff = df['date'].max() - np.timedelta64(30, 'D')
+    df_train, df_test = df[df['date'] <= cutoff], df[df['date'] > cutoff]
+    y_test = df_test['result'].to_numpy()
+    print(f"train rows: {len(df_train)}, hold-out rows: {len(df_test)}, base rate log-loss: {log_loss(y_test, np.full(len(y_test), y_test.mean())):.4f}")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [(backend, {}) for backend in args.backends]
+        if args.adaptive:
+            runs.append(('nuts', {'adaptive': True, 'draws': None}))  # default budget, ADAPTIVE_MAX_DRAWS
+
+        for backend, options in runs:
+            label = backend + (' (adaptive)' if options.get('adaptive') else '')
+            model = BayesianBettingModel(model_path=str(Path(tmp) / f"{len(rows)}.nc"))
+            options = {'draws': args.draws, 'tune': args.tune, **options}
+            start = time.perf_counter()
+            model.train(df_train, MODEL_FEATURES, backend=backend, random_seed=1, **options)
+            wall = time.perf_counter() - start
+            probs = model.predict(df_test, MODEL_FEATURES)
+            _, betas = model.posterior_draws()
+            rows.append((label, wall, model.training, log_loss(y_test, probs), betas.mean(axis=0), betas.std(axis=0)))
+
+    print(f"\n{'backend':<18} | {'train()':>8} | {'fit':>8} | {'draws':>6} | {'R-hat':>6} | {'ESS bulk':>8} | hold-out log-loss")
+    for label, wall, training, loss, _, _ in rows:
+        diagnostics = training.get('diagnostics', {})
+        rhat, ess = diagnostics.get('max_rhat', np.nan), diagnostics.get('min_ess_bulk', np.nan)
+        print(f"{label:<18} | {wall:7.1f}s | {training['wall_time_s']:7.1f}s | {training.get('draws', args.draws):>6} | "
+              f"{rhat:6.3f} | {ess:8.0f} | {loss:.4f}")
+
+    print("\nposterior mean (sd) of betas:")
+    print(f"{'feature':<24}" + "".join(f"{r[0]:>20}" for r in rows))
+    for i, col in enumerate(MODEL_FEATURES):
+        print(f"{col:<24}" + "".join(f"{r[4][i]:>12.3f} ({r[5][i]:.3f})" for r in rows))
+
+
+if __name__ == "__main__":
+    main()
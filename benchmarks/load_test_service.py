@@ -0,0 +1,141 @@
+"""
+Load test of the scoring service: throughput and latency percentiles for single
+matchups and full slates, in-process and over the local HTTP endpoint.
+
+    python benchmarks/load_test_service.py --requests 2000 --clients 4
+    python benchmarks/load_test_service.py --url http://127.0.0.1:8080   # an already running service
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import arviz as az
+import numpy as np
+
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.config import MODEL_FEATURES
+from src.mlb_betting.feature_store import TeamFeatureStore
+from src.mlb_betting.modeling import BayesianBettingModel
+from src.mlb_betting.service import ScoringService, make_server
+
+
+def build_service(draws: int) -> ScoringService:
+    """
+    One synthetic season of team state and a stand-in posterior of the real model's shape
+    """
+    games = synthetic.merged_frame(synthetic.generate_games([2023]))
+    df_train = features.finalize_training_data(features.calculate_advanced_features(
+        features.calculate_form_features(features.create_team_centric_df(games))))
+
+    rng = np.random.default_rng(0)
+    model = BayesianBettingModel(model_path="unused.nc")
+    model.feature_cols = MODEL_FEATURES
+    model.fit_preprocessing(df_train[MODEL_FEATURES].values)
+    model.trace = az.from_dict(posterior={
+        'alpha': rng.normal(0, 0.1, (2, draws // 2)),
+        'betas': rng.normal(0, 0.1, (2, draws // 2, len(MODEL_FEATURES))),
+    })
+
+    store = TeamFeatureStore()
+    store.update(games)
+    return ScoringService(model, store)
+
+
+def slate(n_games: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    teams = rng.permutation(synthetic.TEAMS)[:2 * n_games]
+    return [
+        {'home': home, 'away': away, 'date': '2023-10-01',
+         'home_moneyline': int(rng.choice([-160, -130, -110, 105, 125])),
+         'away_moneyline': int(rng.choice([-150, -120, 100, 115, 140]))}
+        for home, away in zip(teams[0::2], teams[1::2])
+    ]
+
+
+def report(label: str, latencies: list, wall: float):
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    print(f"{label:<24} | {len(ms) / wall:9.0f} req/s | p50 {p50:6.2f} ms | p95 {p95:6.2f} ms | p99 {p99:6.2f} ms | max {ms.max():6.2f} ms")
+
+
+def run_in_process(service: ScoringService, payloads: list):
+    latencies = []
+    start = time.perf_counter()
+    for games in payloads:
+        t0 = time.perf_counter()
+        service.score(games)
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - start
+
+
+def run_http(url: str, payloads: list, clients: int):
+    """
+    `clients` threads, each on one keep-alive connection, sharing the payloads
+    """
+    parsed = urlparse(url)
+    latencies, lock = [], threading.Lock()
+
+    def worker(chunk):
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port)
+        local = []
+        for games in chunk:
+            body = json.dumps({'games': games})
+            t0 = time.perf_counter()
+            conn.request("POST", "/score", body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - t0)
+            assert response.status == 200, response.status
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(payloads[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--draws', type=int, default=2000)
+    parser.add_argument('--url', default=None, help="Test a running service instead of an in-process one")
+    args = parser.parse_args()
+
+    single = [slate(1, seed) for seed in range(args.requests)]
+    full = [slate(15, seed) for seed in range(args.requests // 10)]
+
+    server = None
+    if args.url is None:
+        service = build_service(args.draws)
+        run_in_process(service, single[:50])  # warm up
+
+        report("in-process, 1 game", *run_in_process(service, single))
+        report("in-process, 15 games", *run_in_process(service, full))
+
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        args.url = f"http://127.0.0.1:{server.server_port}"
+
+    report(f"HTTP x{args.clients}, 1 game", *run_http(args.url, single, args.clients))
+    report(f"HTTP x{args.clients}, 15 games", *run_http(args.url, full, args.clients))
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
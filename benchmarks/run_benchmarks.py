@@ -0,0 +1,197 @@
+"""
+Time and memory of every pipeline function, from schedule / odds parsing to simulate_betting,
+on synthetic data (synthetic.write_dataset: 30 teams, doubleheaders, missing books) at
+several sizes. Runs offline. Results can be stored as a baseline and compared against.
+
+    python benchmarks/run_benchmarks.py                              # 1, 5 and 20 seasons
+    python benchmarks/run_benchmarks.py --seasons 1 5 --save-baseline
+    python benchmarks/run_benchmarks.py --seasons 1 5 --check       # exit 1 on a regression
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.betting import simulate_betting
+from src.mlb_betting.config import FEATURE_SPEC, MODEL_FEATURES
+from src.mlb_betting.data_loading import MLBStatsAPI, BettingDataLoader, load_and_merge_seasons, _merge_games_and_odds
+from src.mlb_betting.modeling import BayesianBettingModel
+
+BASELINE_PATH = PROJECT_ROOT / "benchmarks" / "baseline.json"
+
+STAGES = [
+    'parse_schedule', 'load_odds', 'merge', 'ingest', 'team_centric', 'form_features',
+    'advanced_features', 'training_data', 'train', 'predict', 'simulate_betting',
+]
+
+
+def measure(fn, repeat: int = 3):
+    """
+    Best wall time of `repeat` plain runs, then one run under tracemalloc for the peak
+    allocation (tracing slows the code down, so it is never timed). Returns (result, wall_s, peak_mb).
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def run_size(n_seasons: int, stages: list, repeat: int, backend: str, draws: int) -> list:
+    """
+    Every stage on n_seasons of synthetic data; each stage consumes the previous stage's output
+    """
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data = synthetic.write_dataset(tmp, n_seasons=n_seasons)
+        payloads = [synthetic.schedule_json(data['games'], season) for season in data['seasons']]
+        model_path = os.path.join(tmp, "model.nc")
+
+        def train():
+            model = BayesianBettingModel(model_path=model_path)
+            model.train(df_train, MODEL_FEATURES, backend=backend, draws=draws, random_seed=0)
+            return model
+
+        # 1. The pipeline, one (name, function, rows_in) at a time
+        steps = [
+            ('parse_schedule', lambda: pd.concat([MLBStatsAPI._parse_schedule(p) for p in payloads], ignore_index=True),
+             lambda: len(data['games'])),
+            ('load_odds', lambda: BettingDataLoader(data['odds_file']).load_odds(stream=True, seasons=data['seasons']),
+             lambda: len(data['games'])),
+            ('merge', lambda: _merge_games_and_odds(MLBStatsAPI._completed_games(outputs['parse_schedule']), outputs['load_odds']),
+             lambda: len(outputs['parse_schedule'])),
+            ('ingest', lambda: load_and_merge_seasons(data['seasons'], data['odds_file'], cache_dir=data['cache_dir']),
+             lambda: len(data['games'])),
+            ('team_centric', lambda: features.create_team_centric_df(outputs['ingest']), lambda: len(outputs['ingest'])),
+            ('form_features', lambda: features.calculate_form_features(outputs['team_centric'], FEATURE_SPEC),
+             lambda: len(outputs['team_centric'])),
+            ('advanced_features', lambda: features.calculate_advanced_features(outputs['form_features']),
+             lambda: len(outputs['form_features'])),
+            ('training_data', lambda: features.finalize_training_data(outputs['advanced_features'], FEATURE_SPEC),
+             lambda: len(outputs['advanced_features'])),
+            ('train', train, lambda: len(df_train)),
+            ('predict', lambda: outputs['train'].predict(df_train, MODEL_FEATURES), lambda: len(df_train)),
+            ('simulate_betting', lambda: simulate_betting(df_train.assign(my_prob=outputs['predict'])), lambda: len(df_train)),
+        ]
+
+        # 2. Every stage runs (its output feeds the next), only the selected ones are measured
+        outputs = {}
+        df_train = None
+        for name, fn, rows_in in steps:
+            if name in stages:
+                # One fit is enough signal for the slow samplers
+                result, wall, peak = measure(fn, repeat if name != 'train' or backend == 'laplace' else 1)
+                rows.append({
+                    'seasons': n_seasons, 'stage': name, 'wall_s': wall, 'peak_mb': peak,
+                    'rows_in': rows_in(), 'rows_per_s': rows_in() / max(wall, 1e-9),
+                })
+                print(f"  {n_seasons:>2} seasons  {name:<18} {wall:8.3f}s  {peak:8.1f} MB")
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = fn()
+            outputs[name] = result
+            if name == 'training_data':
+                df_train = result
+    return rows
+
+
+def compare(results: pd.DataFrame, baseline: pd.DataFrame, threshold: float, min_delta: float) -> pd.DataFrame:
+    """
+    Joins a run onto the baseline by (seasons, stage) with the % change of time and memory.
+    A stage regresses when it got more than threshold % slower and at least min_delta seconds slower.
+    """
+    table = results.merge(baseline, on=['seasons', 'stage'], how='left', suffixes=('', '_baseline'))
+    table['wall_change_%'] = (table['wall_s'] / table['wall_s_baseline'] - 1) * 100
+    table['peak_change_%'] = (table['peak_mb'] / table['peak_mb_baseline'] - 1) * 100
+    table['regression'] = (table['wall_change_%'] > threshold) & (table['wall_s'] - table['wall_s_baseline'] > min_delta)
+    columns = ['seasons', 'stage', 'wall_s_baseline', 'wall_s', 'wall_change_%', 'peak_mb_baseline', 'peak_mb',
+               'peak_change_%', 'regression']
+    return table[columns]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (the best one counts)")
+    parser.add_argument('--backend', default='laplace', help="train() backend (nuts takes minutes per size)")
+    parser.add_argument('--draws', type=int, default=2000)
+    parser.add_argument('--output', help="Also write this run's results to a JSON file")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help="Baseline to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline")
+    parser.add_argument('--threshold', type=float, default=25, help="Regression: this many %% slower ...")
+    parser.add_argument('--min-delta', type=float, default=0.1, help="... and at least this many seconds slower")
+    parser.add_argument('--check', action='store_true', help="Exit with status 1 when a stage regressed")
+    args = parser.parse_args()
+
+    rows = []
+    for n_seasons in args.seasons:
+        print(f"{n_seasons} season(s):")
+        rows += run_size(n_seasons, args.stages, args.repeat, args.backend, args.draws)
+    results = pd.DataFrame(rows)
+
+    run = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        'backend': args.backend,
+        'results': rows,
+    }
+
+    print()
+    print(results.pivot(index='stage', columns='seasons', values='wall_s').loc[
+        [s for s in STAGES if s in args.stages]].round(3).to_string())
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=1)
+        print(f"\nResults written to {args.output}")
+
+    regressed = False
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        print(f"\nAgainst the baseline of {baseline['created']} ({baseline['machine']}, backend {baseline['backend']}):")
+        table = compare(results, pd.DataFrame(baseline['results']), args.threshold, args.min_delta)
+        print(table.round(3).to_string(index=False))
+        for row in table[table['regression']].itertuples(index=False):
+            print(f"⚠️ {row.stage} at {row.seasons} seasons: {row.wall_s_baseline:.3f}s -> {row.wall_s:.3f}s")
+        regressed = bool(table['regression'].any())
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(run, f, indent=1)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.check and regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
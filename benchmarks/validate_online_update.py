@@ -0,0 +1,95 @@
+"""
+Validation harness for BayesianBettingModel.update: train on a season up to a cutoff,
+apply one online update per following day, then compare the result with a full refit
+on the same rows (same preprocessing, same backend).
+
+    python benchmarks/validate_online_update.py --days 30 --backend laplace
+    python benchmarks/validate_online_update.py --days 5 --backend nuts
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.config import MODEL_FEATURES
+from src.mlb_betting.modeling import BayesianBettingModel, laplace_draws, logistic_model
+
+
+def full_refit(model: BayesianBettingModel, df, backend: str, draws: int, seed: int):
+    """
+    Posterior on all rows with the model's (unchanged) preprocessing, so coefficients are comparable
+    """
+    X = model.transform(df[MODEL_FEATURES].values)
+    y = df['result'].values
+    if backend == 'laplace':
+        return laplace_draws(X, y, draws, seed)
+
+    import pymc as pm
+    with logistic_model(X, y):
+        trace = pm.sample(draws // 2, tune=1000, chains=2, cores=1, random_seed=seed, progressbar=False)
+    alpha = trace.posterior['alpha'].values.reshape(-1)
+    return alpha, trace.posterior['betas'].values.reshape(len(alpha), -1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=30, help="Number of daily updates after the cutoff")
+    parser.add_argument('--backend', choices=['laplace', 'nuts'], default='laplace')
+    parser.add_argument('--draws', type=int, default=2000)
+    args = parser.parse_args()
+
+    games = synthetic.generate_games([2023])
+    df = features.finalize_training_data(features.calculate_advanced_features(
+        features.calculate_form_features(features.create_team_centric_df(synthetic.merged_frame(games)))))
+    days = np.sort(df['date'].unique())
+    update_days = days[-args.days:]
+    df_base = df[df['date'] < update_days[0]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1. Base model, then one update per day
+        model = BayesianBettingModel(model_path=str(Path(tmp) / "model.nc"))
+        model.train(df_base, MODEL_FEATURES, backend=args.backend, draws=args.draws, random_seed=0)
+
+        update_times = []
+        for i, day in enumerate(update_days):
+            start = time.perf_counter()
+            model.update(df[df['date'] == day], backend=args.backend, draws=args.draws, random_seed=100 + i)
+            update_times.append(time.perf_counter() - start)
+
+        # 2. Full refit on everything
+        start = time.perf_counter()
+        alpha_full, betas_full = full_refit(model, df, args.backend, args.draws, seed=1)
+        refit_time = time.perf_counter() - start
+
+    alpha_upd, betas_upd = model.posterior_draws()
+    upd = np.column_stack([alpha_upd, betas_upd])
+    full = np.column_stack([alpha_full, betas_full])
+    names = ['alpha'] + MODEL_FEATURES
+
+    z = (upd.mean(axis=0) - full.mean(axis=0)) / full.std(axis=0)
+    sd_ratio = upd.std(axis=0) / full.std(axis=0)
+
+    # Predictions on the update days from both posteriors
+    X = model.transform(df[df['date'] >= update_days[0]][MODEL_FEATURES].values)
+    p_upd = (1 / (1 + np.exp(-(X @ betas_upd.T + alpha_upd)))).mean(axis=1)
+    p_full = (1 / (1 + np.exp(-(X @ betas_full.T + alpha_full)))).mean(axis=1)
+
+    print(f"\n{args.days} daily updates ({args.backend}) vs one full refit on {len(df)} rows")
+    print(f"{'coefficient':<24} | {'updated':>16} | {'full refit':>16} | {'diff / sd':>9} | sd ratio")
+    for i, name in enumerate(names):
+        print(f"{name:<24} | {upd[:, i].mean():7.3f} ({upd[:, i].std():.3f}) | {full[:, i].mean():7.3f} ({full[:, i].std():.3f}) | "
+              f"{z[i]:9.3f} | {sd_ratio[i]:.3f}")
+    print(f"\nmax |mean diff| / sd: {np.abs(z).max():.3f}, sd ratio range: {sd_ratio.min():.3f} - {sd_ratio.max():.3f}")
+    print(f"win probability on the update days: mean |diff| {np.abs(p_upd - p_full).mean():.5f}, max {np.abs(p_upd - p_full).max():.5f}")
+    print(f"time: update median {np.median(update_times):.3f}s / max {max(update_times):.3f}s, full refit {refit_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
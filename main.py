@@ -1,76 +1,334 @@
+"""
+MLB betting pipeline. Every subcommand runs the stages it needs, reusing stored ones:
+
+    python main.py                      # the whole pipeline (same as `run`)
+    python main.py run --backtest       # ... plus the walk-forward backtest (one fit per fold)
+    python main.py ingest   --season 2023
+    python main.py features --season 2023
+    python main.py train    --season 2023 --backend laplace
+    python main.py predict  --season 2023 --output predictions.csv
+    python main.py backtest --season 2023 --freq MS --threshold 0.02 0.05
+    python main.py simulate --season 2023 --threshold 0.02 0.05 0.08 --kelly 0.25
+"""
+import argparse
 import sys
+from datetime import date
 from pathlib import Path
-import pandas as pd
 
 sys.path.append(str(Path(__file__).parent))
 
-from src.mlb_betting.config import PROJECT_ROOT, DATA_DIR
-from src.mlb_betting.data_loading import load_and_merge_data
-from src.mlb_betting import features
-from src.mlb_betting.modeling import BayesianBettingModel, simulate_betting
+from src.mlb_betting.config import DATA_DIR, SCHEDULE_CACHE_DIR, TEAM_STATE_PATH, FEATURE_SPEC, MODEL_FEATURES
+
+# pandas, the pipeline modules and (when a model is fitted) PyMC / ArviZ are imported inside
+# the stages that use them: `--help` needs none of them, and a subcommand whose stages are
+# stored never imports the samplers.
+
+COMMANDS = ('run', 'ingest', 'features', 'train', 'predict', 'backtest', 'simulate')
+
+
+class PipelineRun:
+  """
+  The pipeline's stages for one season. Each stage is stored in the artifact store (see
+  artifacts.py) under a hash of its inputs, parameters and code, computed at most once per
+  run, and measured by `metrics` (see instrumentation.py). Asking for a later stage runs or
+  loads the ones before it.
+  """
+  def __init__(self, season: int = 2023, use_cache: bool = True, metrics=None, backend: str = 'nuts'):
+    from src.mlb_betting.artifacts import ArtifactStore
+    from src.mlb_betting.instrumentation import RunMetrics
+
+    self.season = season
+    self.backend = backend
+    self.store = ArtifactStore(enabled=use_cache)
+    self.metrics = metrics or RunMetrics()
+    self.odds_file = DATA_DIR / "raw" / "odds_history.json"
+    self.feature_cols = MODEL_FEATURES
+    self.results = {}
+
+  def run_stage(self, name: str, compute, rows_in: int = None, **store_kwargs):
+    if name in self.results:
+      return self.results[name]
+    with self.metrics.stage(name, rows_in=rows_in) as record:
+      value, key = self.store.stage(name, compute, **store_kwargs)
+      record['cached'] = self.store.last_hit
+      record['rows_out'] = len(value) if hasattr(value, 'shape') else None
+    self.results[name] = (value, key)
+    return value, key
+
+  def ingest(self):
+    from src.mlb_betting import config, data_loading
+    from src.mlb_betting.artifacts import file_fingerprint
+
+    if not self.odds_file.exists():
+      raise FileNotFoundError(f"Odds file not found at {self.odds_file}")
+
+    # A season still in progress gets new games every day
+    as_of = date.today().isoformat() if self.season >= date.today().year else None
+    return self.run_stage(
+      'ingest',
+      lambda: data_loading.load_and_merge_data(season=self.season, odds_filepath=str(self.odds_file),
+                                               cache_dir=str(SCHEDULE_CACHE_DIR)),
+      params={'season': self.season, 'as_of': as_of}, inputs=[file_fingerprint(str(self.odds_file))],
+      code=[data_loading, config],
+    )
+
+  def features(self):
+    """
+    (training rows, key): team-centric frame -> form features -> advanced features -> training data
+    """
+    from src.mlb_betting import config, features
+
+    df_raw, raw_key = self.ingest()
+    df_long, long_key = self.run_stage(
+      'team_centric', lambda: features.create_team_centric_df(df_raw), rows_in=len(df_raw),
+      inputs=[raw_key], code=[features, config],
+    )
+    df_rolling, rolling_key = self.run_stage(
+      'form_features', lambda: features.calculate_form_features(df_long, FEATURE_SPEC), rows_in=len(df_long),
+      params={'spec': FEATURE_SPEC}, inputs=[long_key], code=[features],
+    )
+    df_adv, adv_key = self.run_stage(
+      'advanced_features', lambda: features.calculate_advanced_features(df_rolling), rows_in=len(df_rolling),
+      inputs=[rolling_key], code=[features],
+    )
+    return self.run_stage(
+      'training_data', lambda: features.finalize_training_data(df_adv, FEATURE_SPEC), rows_in=len(df_adv),
+      params={'spec': FEATURE_SPEC}, inputs=[adv_key], code=[features, config],
+    )
+
+  def team_state(self):
+    """
+    Current per-team state, so the scoring service can serve the next games without this pipeline
+    """
+    from src.mlb_betting.feature_store import TeamFeatureStore
+
+    df_raw, _ = self.ingest()
+    with self.metrics.stage('team_state', rows_in=len(df_raw)):
+      team_store = TeamFeatureStore(FEATURE_SPEC)
+      team_store.update(df_raw)
+      team_store.save(str(TEAM_STATE_PATH))
+
+  def model(self):
+    from src.mlb_betting import modeling
 
-def run_pipeline():
+    df_train, train_key = self.features()
+    model_path = DATA_DIR / "models" / "bayesian_v1.nc"
+
+    def train():
+      model = modeling.BayesianBettingModel(model_path=str(model_path))
+      model.train(df_train, feature_cols=self.feature_cols, target_col='result', backend=self.backend)
+      return model
+
+    fitted = 'model' not in self.results
+    model, model_key = self.run_stage(
+      'model', train, rows_in=len(df_train),
+      params={'feature_cols': self.feature_cols, 'target_col': 'result', 'backend': self.backend},
+      inputs=[train_key], code=[modeling], kind='model',
+    )
+    if fitted and model.training and 'draws' in model.training:
+      self.metrics.stages[-1]['draws'] = model.training['draws']
+      self.metrics.stages[-1]['draws_per_s'] = model.training['draws'] / max(model.training['wall_time_s'], 1e-9)
+    return model, model_key
+
+  def predictions(self):
+    """
+    (training rows with the model's my_prob, key)
+    """
+    from src.mlb_betting import modeling
+
+    df_train, train_key = self.features()
+    model, model_key = self.model()
+    return self.run_stage(
+      'predict', lambda: df_train.assign(my_prob=model.predict(df_train, feature_cols=self.feature_cols)),
+      rows_in=len(df_train), inputs=[train_key, model_key], code=[modeling],
+    )
+
+  def backtest(self, freq: str = 'W'):
+    """
+    (out-of-sample rows with my_prob and fold, key): weekly walk-forward folds by default
+    """
+    from src.mlb_betting import backtest as backtest_module, modeling
+
+    df_train, train_key = self.features()
+    return self.run_stage(
+      'backtest',
+      lambda: backtest_module.backtest(df_train, self.feature_cols, target_col='result', freq=freq,
+                                       cache_dir=str(DATA_DIR / "cache" / "backtest")),
+      rows_in=len(df_train), params={'feature_cols': self.feature_cols, 'freq': freq},
+      inputs=[train_key], code=[backtest_module, modeling],
+    )
+
+  def simulate(self, df, thresholds=(0.05,), kelly_fractions=()):
+    """
+    sweep_betting over the thresholds (flat $100 stakes, plus fractional Kelly if asked)
+    """
+    from src.mlb_betting.betting import sweep_betting
+
+    return self.metrics.track('simulate', sweep_betting, df, thresholds, kelly_fractions=kelly_fractions,
+                              rows_in=len(df))
+
+  def finish(self, metrics_path: str = None):
+    print(f"\n⏱️ STAGES ⏱️")
+    print(self.metrics.report())
+    print(f"Metrics appended to {self.metrics.write(metrics_path)}")
+
+
+def run_pipeline(season: int = 2023, threshold: float = 0.05, use_cache: bool = True,
+                 metrics=None, metrics_path: str = None, backend: str = 'nuts', backtest: bool = False):
+    """
+    Every stage up to the backtest is stored in the artifact store and skipped when nothing it
+    depends on changed. Changing only the threshold re-runs only the betting simulation.
+    backtest=True adds the weekly walk-forward evaluation (one model fit per fold).
+    Each stage's wall / CPU time, memory and row counts are appended to the metrics file.
+    """
     print("STARTING PIPELINE")
-    
+    run = PipelineRun(season, use_cache, metrics, backend)
+
     # --- 1. INGESTION ---
-    # We use 2023 data for this demo
-    season = 2023
-    odds_file = DATA_DIR / "raw" / "odds_history.json"
-    
     print(f"\n--- Phase 1: Ingestion (Season {season}) ---")
-    if not odds_file.exists():
-        print(f"❌ Error: Odds file not found at {odds_file}")
+    if not run.odds_file.exists():
+        print(f"❌ Error: Odds file not found at {run.odds_file}")
         return
 
-    df_raw = load_and_merge_data(season=season, odds_filepath=str(odds_file))
+    df_raw, _ = run.ingest()
     print(f"✅ Loaded {len(df_raw)} games.")
 
     # --- 2. FEATURE ENGINEERING ---
     print("\n--- Phase 2: Feature Engineering ---")
-    
-    df_long = features.create_team_centric_df(df_raw)
-    
-    df_rolling = features.calculate_rolling_features(df_long, window_size=10)
-    
-    df_adv = features.calculate_advanced_features(df_rolling)
-    
-    df_train = features.finalize_training_data(df_adv)
-    
+    df_train, _ = run.features()
     print(f"Engineered features. Training set: {len(df_train)} rows.")
+    run.team_state()
 
     # --- 3. MODEL TRAINING ---
     print("\n--- Phase 3: Model Training ---")
-    model_path = DATA_DIR / "models" / "bayesian_v1.nc"
-    
-    model = BayesianBettingModel(model_path=str(model_path))
-    
-    
-    feature_cols = [
-        'is_home', 'rest_days', 'log5_prob', 
-        'rolling_10_runs_scored', 'rolling_10_runs_allowed',
-        'rolling_10_hits', 'rolling_10_errors',
-        'rolling_pythag_win_pct', 'opp_pythag_win_pct',
-        'team_code', 'opponent_code'
-    ]
-    
-    
-    model.train(df_train, feature_cols=feature_cols, target_col='result')
+    run.model()
 
     # --- 4. EVALUATION ---
     print("\n--- Phase 4: Evaluation ---")
-    
-    probs = model.predict(df_train, feature_cols=feature_cols)
-    df_train['my_prob'] = probs
-    
-    # Simulate Betting
-    results = simulate_betting(df_train, threshold=0.05)
-    
-    print(f"\n💰 RESULTS 💰")
-    print(f"Bets Placed: {results['total_bets']}")
-    print(f"Total Profit: ${results['total_profit']:.2f}")
-    print(f"ROI: {results['roi']:.2f}%")
-    
+    df_pred, _ = run.predictions()
+    _print_results("💰 RESULTS 💰", run.simulate(df_pred, [threshold]).iloc[0])
+
+    # Out-of-sample: weekly walk-forward folds, each trained only on earlier games
+    if backtest:
+        df_oos, _ = run.backtest()
+        _print_results("📈 WALK-FORWARD (out-of-sample) 📈", run.simulate(df_oos, [threshold]).iloc[0])
+
+    run.finish(metrics_path)
     print("\nPipeline Finished Successfully.")
 
+
+def _print_results(title: str, row):
+    print(f"\n{title}")
+    print(f"Bets Placed: {int(row['total_bets'])}")
+    print(f"Total Profit: ${row['total_profit']:.2f}")
+    print(f"ROI: {row['roi']:.2f}%")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--season', type=int, default=2023)
+    common.add_argument('--no-cache', action='store_true', help="Recompute every stage (nothing is read or stored)")
+    common.add_argument('--metrics', default=None, help="Metrics file to append this run to (JSON lines)")
+    common.add_argument('--profile', metavar='STAGE', help="Attach cProfile to one stage (e.g. model, form_features)")
+    common.add_argument('--trace-memory', action='store_true', help="Record tracemalloc peaks per stage (slower)")
+
+    model = argparse.ArgumentParser(add_help=False)
+    model.add_argument('--backend', default='nuts', choices=('nuts', 'advi', 'fullrank_advi', 'laplace'),
+                       help="Training backend (see BayesianBettingModel.train)")
+
+    bets = argparse.ArgumentParser(add_help=False)
+    bets.add_argument('--threshold', type=float, nargs='+', default=[0.05], help="Minimum edge(s) to place a bet")
+    bets.add_argument('--kelly', type=float, nargs='*', default=[], metavar='FRACTION',
+                      help="Also stake fractional Kelly on a $10,000 bankroll")
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    run_cmd = commands.add_parser('run', parents=[common, model], help="The whole pipeline (default)")
+    run_cmd.add_argument('--threshold', type=float, default=0.05, help="Minimum edge to place a bet")
+    run_cmd.add_argument('--backtest', action='store_true', help="Also run the weekly walk-forward backtest (slow)")
+    commands.add_parser('ingest', parents=[common], help="Load and merge the season's games and odds")
+    commands.add_parser('features', parents=[common], help="Build the training data and the team state")
+    commands.add_parser('train', parents=[common, model], help="Fit (or load) the model")
+    predict_cmd = commands.add_parser('predict', parents=[common, model], help="Score the season's games")
+    predict_cmd.add_argument('--output', help="CSV path (default data/predictions/predictions_<season>.csv)")
+    backtest_cmd = commands.add_parser('backtest', parents=[common, bets], help="Walk-forward out-of-sample evaluation")
+    backtest_cmd.add_argument('--freq', default='W', help="Test period per fold (D, W, MS, ...)")
+    simulate_cmd = commands.add_parser('simulate', parents=[common, model, bets], help="Betting results of the predictions")
+    simulate_cmd.add_argument('--oos', action='store_true', help="Bet the walk-forward predictions instead")
+    return parser
+
+
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # No subcommand (e.g. `python main.py --season 2022`) runs the whole pipeline
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv = ['run', *argv]
+    args = build_parser().parse_args(argv)
+
+    from src.mlb_betting.instrumentation import RunMetrics
+    metrics = RunMetrics(run_name=args.command, trace_memory=args.trace_memory, profile_stage=args.profile)
+    if args.command == 'run':
+        run_pipeline(season=args.season, threshold=args.threshold, use_cache=not args.no_cache,
+                     metrics=metrics, metrics_path=args.metrics, backend=args.backend, backtest=args.backtest)
+        return
+
+    run = PipelineRun(args.season, not args.no_cache, metrics, getattr(args, 'backend', 'nuts'))
+    try:
+        _COMMANDS[args.command](run, args)
+    except FileNotFoundError as e:
+        sys.exit(f"❌ Error: {e}")
+    run.finish(args.metrics)
+
+
+def _ingest(run, args):
+    df_raw, key = run.ingest()
+    print(f"✅ Loaded {len(df_raw)} games for {args.season} ({key}).")
+
+
+def _features(run, args):
+    df_train, key = run.features()
+    run.team_state()
+    print(f"Engineered features. Training set: {len(df_train)} rows ({key}); team state saved to {TEAM_STATE_PATH}.")
+
+
+def _train(run, args):
+    model, key = run.model()
+    training = model.training or {}
+    print(f"Model {key}: {training.get('backend', args.backend)} backend, {len(model.posterior_draws()[0])} posterior draws.")
+    if 'diagnostics' in training:
+        print(f"Convergence: {training['diagnostics']}")
+
+
+def _predict(run, args):
+    df_pred, _ = run.predictions()
+    output = Path(args.output or DATA_DIR / "predictions" / f"predictions_{args.season}.csv")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    df_pred[['date', 'team', 'opponent', 'is_home', 'moneyline_closing', 'my_prob', 'result']].to_csv(output, index=False)
+    print(f"✅ {len(df_pred)} predictions written to {output}")
+
+
+def _backtest(run, args):
+    df_oos, _ = run.backtest(args.freq)
+    print(f"\n📈 WALK-FORWARD (out-of-sample, {df_oos['fold'].nunique()} folds) 📈")
+    print(run.simulate(df_oos, args.threshold, args.kelly).round(2).to_string(index=False))
+
+
+def _simulate(run, args):
+    df, _ = run.backtest() if args.oos else run.predictions()
+    print(f"\n💰 RESULTS ({'out-of-sample' if args.oos else 'in-sample'}) 💰")
+    print(run.simulate(df, args.threshold, args.kelly).round(2).to_string(index=False))
+
+
+_COMMANDS = {
+    'ingest': _ingest,
+    'features': _features,
+    'train': _train,
+    'predict': _predict,
+    'backtest': _backtest,
+    'simulate': _simulate,
+}
+
 if __name__ == "__main__":
-    run_pipeline()
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from src.mlb_betting.config import ARTIFACT_DIR
+
+
+class ArtifactStore:
+  """
+  Local cache of pipeline stage outputs, one directory per (stage, key):
+      <root>/<stage>/<key>/data.parquet      DataFrame stages
+      <root>/<stage>/<key>/model/, model.nc  BayesianBettingModel stages (artifact + NetCDF trace)
+      <root>/<stage>/<key>/meta.json         written last: an entry without it is incomplete
+  The key hashes the stage's inputs (upstream keys, file fingerprints), its parameters and the
+  source of the code that computes it (with the package modules that code imports), so any
+  change upstream re-runs everything below it.
+  """
+  def __init__(self, root: str = None, enabled: bool = True):
+    self.root = str(ARTIFACT_DIR if root is None else root)
+    self.enabled = enabled
+    # Whether the latest stage() call was served from the store
+    self.last_hit = False
+
+  def key(self, stage: str, params: dict = None, inputs: list = None, code: list = ()) -> str:
+    payload = {
+      'stage': stage,
+      'params': params or {},
+      'inputs': list(inputs or []),
+      'code': [code_version(module) for module in code],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+  def path(self, stage: str, key: str) -> str:
+    return os.path.join(self.root, stage, key)
+
+  def exists(self, stage: str, key: str) -> bool:
+    return os.path.exists(os.path.join(self.path(stage, key), "meta.json"))
+
+  def stage(self, stage: str, compute, params: dict = None, inputs: list = None, code: list = (), kind: str = 'frame'):
+    """
+    Returns (output, key): the stored artifact when the key matches, else compute() stored under the key.
+    kind: 'frame' (DataFrame -> Parquet) or 'model' (BayesianBettingModel -> artifact dir + NetCDF)
+    """
+    key = self.key(stage, params, inputs, code)
+    self.last_hit = self.enabled and self.exists(stage, key)
+    if self.last_hit:
+      print(f"[{stage}] up to date ({key}), loading stored artifact")
+      return self.load(stage, key), key
+
+    start = time.perf_counter()
+    value = compute()
+    elapsed = time.perf_counter() - start
+    if self.enabled:
+      self.save(stage, key, value, kind, {'params': params or {}, 'inputs': list(inputs or []), 'compute_s': elapsed})
+    return value, key
+
+  def save(self, stage: str, key: str, value, kind: str, meta: dict = None):
+    """
+    Writes into a scratch directory and renames it into place, so readers never see half an artifact
+    """
+    final = self.path(stage, key)
+    scratch = f"{final}.tmp-{os.getpid()}"
+    shutil.rmtree(scratch, ignore_errors=True)
+    os.makedirs(scratch)
+
+    if kind == 'frame':
+      value.to_parquet(os.path.join(scratch, "data.parquet"))
+    elif kind == 'model':
+      value.save(os.path.join(scratch, "model"))
+      if value.trace is not None:
+        value.trace.to_netcdf(os.path.join(scratch, "model.nc"))
+    else:
+      raise ValueError(f"Unknown artifact kind {kind!r}: expected 'frame' or 'model'")
+
+    with open(os.path.join(scratch, "meta.json"), 'w') as f:
+      json.dump({'stage': stage, 'key': key, 'kind': kind, 'created': time.time(), **(meta or {})}, f, default=str)
+
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(scratch, final)
+
+  def load(self, stage: str, key: str):
+    path = self.path(stage, key)
+    with open(os.path.join(path, "meta.json"), 'r') as f:
+      kind = json.load(f)['kind']
+
+    if kind == 'frame':
+      return pd.read_parquet(os.path.join(path, "data.parquet"))
+    from src.mlb_betting.modeling import BayesianBettingModel
+    return BayesianBettingModel.load(os.path.join(path, "model"))
+
+  def entries(self, stage: str = None) -> pd.DataFrame:
+    """
+    One row per stored artifact: stage, key, kind, created (UTC), size_mb, compute_s, params
+    """
+    rows = []
+    stages = [stage] if stage else sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+    for name in stages:
+      stage_dir = os.path.join(self.root, name)
+      if not os.path.isdir(stage_dir):
+        continue
+      for key in sorted(os.listdir(stage_dir)):
+        meta_file = os.path.join(stage_dir, key, "meta.json")
+        if not os.path.exists(meta_file):
+          continue
+        with open(meta_file, 'r') as f:
+          meta = json.load(f)
+        rows.append({
+          'stage': name,
+          'key': key,
+          'kind': meta['kind'],
+          'created': pd.Timestamp(meta['created'], unit='s', tz='UTC').floor('s'),
+          'size_mb': _dir_size(os.path.join(stage_dir, key)) / 1e6,
+          'compute_s': meta.get('compute_s'),
+          'params': json.dumps(meta.get('params', {}), sort_keys=True, default=str),
+        })
+    columns = ['stage', 'key', 'kind', 'created', 'size_mb', 'compute_s', 'params']
+    entries = pd.DataFrame(rows, columns=columns)
+    entries['created'] = pd.to_datetime(entries['created'], utc=True)
+    return entries.sort_values(['stage', 'created'], ignore_index=True)
+
+  def evict(self, stage: str = None, key: str = None, older_than_days: float = None, keep_latest: int = None) -> list:
+    """
+    Deletes matching artifacts (and any incomplete leftovers) and returns their (stage, key) pairs.
+    keep_latest spares the newest N artifacts of each stage.
+    """
+    entries = self.entries(stage)
+    if key is not None:
+      entries = entries[entries['key'] == key]
+    if older_than_days is not None:
+      entries = entries[entries['created'] < pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=older_than_days)]
+    if keep_latest:
+      newest = self.entries(stage).groupby('stage').tail(keep_latest)
+      entries = entries[~entries['key'].isin(newest['key'])]
+
+    removed = []
+    for row in entries.itertuples(index=False):
+      shutil.rmtree(self.path(row.stage, row.key), ignore_errors=True)
+      removed.append((row.stage, row.key))
+
+    # Incomplete entries (interrupted writes) are never valid
+    for stage_dir in ([os.path.join(self.root, stage)] if stage else _subdirs(self.root)):
+      for name in _subdirs(stage_dir, full=False):
+        if not os.path.exists(os.path.join(stage_dir, name, "meta.json")):
+          shutil.rmtree(os.path.join(stage_dir, name), ignore_errors=True)
+    return removed
+
+
+def code_version(module) -> str:
+    """
+    Hash of a module's source and of every module of its package it imports, directly or not:
+    editing the code that computes a stage, or anything that code calls into, invalidates it
+    """
+    digest = hashlib.sha256()
+    for path in sorted(_package_sources(module)):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _package_sources(module) -> set:
+    """
+    Source files of the module and of its transitive imports from the same package
+    (src.mlb_betting), found by parsing the sources: nothing gets imported
+    """
+    package = module.__name__.rpartition('.')[0]
+    package_dir = os.path.dirname(module.__file__)
+    seen = set()
+    todo = [module.__file__]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # `from package import module` as well as `from package.module import name`
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for name in names:
+                if name.startswith(package + '.'):
+                    source = os.path.join(package_dir, name[len(package) + 1:].split('.')[0] + ".py")
+                    if os.path.exists(source):
+                        todo.append(source)
+    return seen
+
+
+def file_fingerprint(path: str) -> dict:
+    """
+    Cheap identity of an input file (path, size, modification time) for stage keys
+    """
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(dirpath, name)) for dirpath, _, names in os.walk(path) for name in names)
+
+
+def _subdirs(path: str, full: bool = True) -> list:
+    if not os.path.isdir(path):
+        return []
+    names = sorted(name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name)))
+    return [os.path.join(path, name) for name in names] if full else names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or evict stored pipeline stage artifacts")
+    parser.add_argument('--root', default=None, help=f"Artifact store directory (default {ARTIFACT_DIR})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_cmd = commands.add_parser('list', help="Show stored artifacts")
+    list_cmd.add_argument('--stage')
+
+    evict_cmd = commands.add_parser('evict', help="Delete stored artifacts")
+    evict_cmd.add_argument('--stage')
+    evict_cmd.add_argument('--key')
+    evict_cmd.add_argument('--older-than', type=float, metavar='DAYS')
+    evict_cmd.add_argument('--keep-latest', type=int, metavar='N', help="Keep the newest N per stage")
+    evict_cmd.add_argument('--all', action='store_true', help="Required to evict without any filter")
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.root)
+    if args.command == 'list':
+        entries = store.entries(args.stage)
+        if entries.empty:
+            print(f"No artifacts in {store.root}")
+            return
+        entries['params'] = entries['params'].where(entries['params'].str.len() <= 60, entries['params'].str[:57] + "...")
+        entries['created'] = entries['created'].dt.strftime('%Y-%m-%d %H:%M:%S %Z')
+        print(entries.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+        print(f"\n{len(entries)} artifacts, {entries['size_mb'].sum():.1f} MB in {store.root}")
+        return
+
+    filters = [args.stage, args.key, args.older_than, args.keep_latest]
+    if all(f is None for f in filters) and not args.all:
+        parser.error("evict needs --stage, --key, --older-than, --keep-latest or --all")
+    removed = store.evict(args.stage, args.key, args.older_than, args.keep_latest)
+    for stage, key in removed:
+        print(f"Evicted {stage}/{key}")
+    print(f"{len(removed)} artifacts evicted")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting.modeling import BayesianBettingModel
+
+
+def walk_forward_folds(dates, freq: str = 'W', min_train_days: int = 30, train_days: int = None) -> list:
+    """
+    Rolling-origin folds over game dates: each fold tests one period (freq='D' a day, 'W' a
+    week, 'MS' a month, any pandas frequency) and trains on every earlier date, or on the last
+    train_days only. Testing starts once min_train_days of history exist.
+    Returns dicts with train_start, test_start, test_end (test_end exclusive).
+    """
+    dates = pd.to_datetime(pd.Series(dates)).dt.normalize()
+    first, last = dates.min(), dates.max()
+
+    # Period starts after the warm-up, plus the end of the last period
+    starts = pd.date_range(first + pd.Timedelta(days=min_train_days), last, freq=freq, normalize=True)
+    if len(starts) == 0 or starts[0] > first + pd.Timedelta(days=min_train_days):
+        starts = starts.insert(0, first + pd.Timedelta(days=min_train_days))
+    bounds = list(starts) + [last + pd.Timedelta(days=1)]
+
+    folds = []
+    for test_start, test_end in zip(bounds[:-1], bounds[1:]):
+        if not ((dates >= test_start) & (dates < test_end)).any():
+            continue
+        train_start = first if train_days is None else test_start - pd.Timedelta(days=train_days)
+        folds.append({'fold': len(folds), 'train_start': train_start, 'test_start': test_start, 'test_end': test_end})
+    return folds
+
+
+def backtest(df: pd.DataFrame, feature_cols: list, target_col: str = 'result', freq: str = 'W',
+             min_train_days: int = 30, train_days: int = None, backend: str = 'laplace',
+             train_kwargs: dict = None, max_workers: int = None, cache_dir: str = None) -> pd.DataFrame:
+    """
+    Walk-forward backtest over finalize_training_data output: one model per fold, fitted in
+    parallel across a process pool, each predicting only its own (future) test period.
+    Fold models are cached in cache_dir by a hash of their training rows and settings, so re-runs
+    and overlapping backtests only fit what changed.
+    Returns the out-of-sample rows (date order) with 'my_prob' and 'fold', ready for simulate_betting.
+    """
+    train_kwargs = dict(train_kwargs or {})
+    if backend == 'nuts':
+        # The pool already spreads folds over the cores
+        train_kwargs.setdefault('cores', 1)
+
+    folds = walk_forward_folds(df['date'], freq, min_train_days, train_days)
+    print(f"Backtest: {len(folds)} folds ({freq}), backend {backend}")
+
+    # 1. One job per fold: its training rows, its test rows, where its model lives
+    columns = list(dict.fromkeys(list(feature_cols) + [target_col]))
+    jobs = []
+    for fold in folds:
+        train = (df['date'] >= fold['train_start']) & (df['date'] < fold['test_start'])
+        test = (df['date'] >= fold['test_start']) & (df['date'] < fold['test_end'])
+        df_fold = df.loc[train, columns]
+        key = fold_key(df_fold, feature_cols, target_col, backend, train_kwargs)
+        model_dir = os.path.join(cache_dir, key) if cache_dir else None
+        jobs.append((fold, df_fold, df.loc[test, columns], feature_cols, target_col, backend, train_kwargs, model_dir))
+
+    # 2. Fit / load and predict every fold
+    if max_workers == 1 or len(jobs) <= 1:
+        results = [_run_fold(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_run_fold, jobs))
+
+    # 3. Stitch the out-of-sample predictions back onto the rows
+    pieces = []
+    for (fold, _, df_test, *_), (probs, cached) in zip(jobs, results):
+        piece = df.loc[df_test.index].copy()
+        piece['my_prob'] = probs
+        piece['fold'] = fold['fold']
+        pieces.append(piece)
+
+    n_cached = sum(cached for _, cached in results)
+    print(f"Backtest done: {len(folds) - n_cached} folds fitted, {n_cached} from cache")
+    if not pieces:
+        return df.iloc[:0].assign(my_prob=pd.Series(dtype=float), fold=pd.Series(dtype=int))
+    return pd.concat(pieces).sort_values('date', kind='stable')
+
+
+def fold_key(df_train: pd.DataFrame, feature_cols: list, target_col: str, backend: str, train_kwargs: dict) -> str:
+    """
+    Content hash of a fold's training rows and fit settings (the fold model's cache key)
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df_train[list(feature_cols) + [target_col]], index=False).values.tobytes())
+    digest.update(json.dumps({
+        'feature_cols': list(feature_cols), 'target_col': target_col,
+        'backend': backend, 'train_kwargs': train_kwargs,
+    }, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:20]
+
+
+def _run_fold(job):
+    """
+    Worker: load the fold model from the cache or fit it, then score the test rows.
+    Returns (probabilities, loaded_from_cache).
+    """
+    fold, df_train, df_test, feature_cols, target_col, backend, train_kwargs, model_dir = job
+
+    if model_dir and os.path.exists(os.path.join(model_dir, "meta.json")):
+        model = BayesianBettingModel.load(model_dir)
+        return np.asarray(model.predict(df_test, feature_cols)), True
+
+    # train() writes the trace and the artifact next to model_path (the cache entry, or a scratch dir)
+    with tempfile.TemporaryDirectory() as scratch:
+        model_path = (model_dir or os.path.join(scratch, f"fold_{fold['fold']}")) + ".nc"
+        model = BayesianBettingModel(model_path=model_path)
+        model.train(df_train, feature_cols, target_col=target_col, backend=backend, **train_kwargs)
+        return np.asarray(model.predict(df_test, feature_cols)), False
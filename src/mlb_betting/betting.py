@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting.odds import american_to_decimal, american_to_prob, devig
+
+BANKROLL_OUTCOMES = ('market', 'bootstrap')
+
+
+def simulate_betting(df, threshold=0.05, stake=100):
+    """
+    Simulates betting $100 whenever our model sees an edge > 5%.
+    """
+    row = sweep_betting(df, thresholds=[threshold], stakes=[stake]).iloc[0]
+    return {
+    "total_bets": int(row['total_bets']),
+    "total_profit": float(row['total_profit']),
+    "roi": float(row['roi'])
+    }
+
+
+def sweep_betting(df, thresholds, stakes=(100,), kelly_fractions=(), odds_cols=('moneyline_closing',),
+                  bankroll: float = 10000, prob_col: str = 'my_prob', result_col: str = 'result') -> pd.DataFrame:
+    """
+    Every (sportsbook, threshold, stake rule) combination of simulate_betting in one pass.
+    A bet is placed whenever my_prob beats the book's implied probability by more than the threshold.
+      stakes:          flat stake amounts ('flat' rule)
+      kelly_fractions: fractional Kelly on a fixed (non-compounding) bankroll ('kelly' rule)
+      odds_cols:       moneyline columns to bet into, one per sportsbook (list, or {name: column})
+    Returns a tidy table: one row per combination with total_bets, total_staked, total_profit, roi.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    if not isinstance(odds_cols, dict):
+        odds_cols = {col: col for col in odds_cols}
+
+    probs = df[prob_col].to_numpy(dtype=float)
+    won = df[result_col].to_numpy(dtype=float) == 1
+
+    tables = []
+    for book, col in odds_cols.items():
+        # 1. Per-row edge and the profit of a 1-unit bet, read once
+        moneyline = df[col].to_numpy(dtype=float)
+        decimal_odds = american_to_decimal(moneyline)
+        edge = probs - american_to_prob(moneyline)
+        unit_pnl = np.where(won, decimal_odds - 1, -1.0)
+        kelly = np.clip((probs * decimal_odds - 1) / (decimal_odds - 1), 0, None)
+
+        # 2. Sort by edge once: the bets of any threshold are a suffix, so every
+        # threshold is one binary search into suffix sums
+        valid = ~np.isnan(edge)
+        order = np.argsort(edge[valid], kind='stable')
+        sorted_edge = edge[valid][order]
+
+        def suffix_sums(values):
+            return np.r_[np.cumsum(values[valid][order][::-1])[::-1], 0.0]
+
+        start = np.searchsorted(sorted_edge, thresholds, side='right')
+        n_bets = len(sorted_edge) - start
+        flat_profit = suffix_sums(unit_pnl)[start]
+        kelly_staked = suffix_sums(kelly)[start]
+        kelly_profit = suffix_sums(kelly * unit_pnl)[start]
+
+        # 3. Stake rules scale the per-unit sums
+        for stake in stakes:
+            tables.append(_sweep_table(book, thresholds, 'flat', stake, n_bets, n_bets * stake, flat_profit * stake))
+        for fraction in kelly_fractions:
+            scale = fraction * bankroll
+            tables.append(_sweep_table(book, thresholds, 'kelly', fraction, n_bets, kelly_staked * scale, kelly_profit * scale))
+
+    return pd.concat(tables, ignore_index=True)
+
+
+def _sweep_table(book, thresholds, rule, size, n_bets, staked, profit) -> pd.DataFrame:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(staked > 0, profit / staked * 100, 0.0)
+    return pd.DataFrame({
+        'sportsbook': book,
+        'threshold': thresholds,
+        'stake_rule': rule,
+        'stake': float(size),
+        'total_bets': n_bets.astype(int),
+        'total_staked': staked,
+        'total_profit': profit,
+        'roi': roi,
+    })
+
+
+def simulate_bankroll(df, model, n_sims: int = 10000, kelly_fraction: float = 0.25, threshold: float = 0.0,
+                      bankroll: float = 1000, ruin_level: float = 0.1, max_exposure: float = 1.0,
+                      chunk_size: int = 1000, seed: int = None, odds_col: str = 'moneyline_closing',
+                      outcomes: str = 'market', result_col: str = 'result') -> pd.DataFrame:
+    """
+    Monte Carlo seasons of fractional-Kelly betting, walking the games in date order.
+    Every simulated season takes one posterior draw as the bettor's win probabilities: that draw
+    picks the bets (edge > threshold) and sizes them, so parameter uncertainty shows up as
+    different bets and stakes from season to season. The outcomes never come from the model:
+      'market'     resampled from the de-vigged closing line (both sides of the game, see
+                   market_probabilities): the model's edge has to be real against the market
+      'bootstrap'  the actual results, resampled day by day with replacement
+    Bets on the same date share that morning's bankroll (daily exposure capped at max_exposure).
+    Simulations run chunk_size at a time: memory is chunk_size x number of priced games.
+    Returns one row per simulated season: final_bankroll, max_drawdown, ruined
+    (bankroll fell below ruin_level x the starting bankroll at some point); attrs['outcomes'] names the source.
+    """
+    if outcomes not in BANKROLL_OUTCOMES:
+        raise ValueError(f"Unknown outcomes {outcomes!r}, expected one of {BANKROLL_OUTCOMES}")
+    rng = np.random.default_rng(seed)
+    df = df.sort_values('date', kind='stable')
+
+    # 1. Every priced game is a candidate bet; which ones are taken depends on the draw
+    moneyline = df[odds_col].to_numpy(dtype=float)
+    priced = ~np.isnan(moneyline)
+    decimal_odds = american_to_decimal(moneyline[priced])
+    implied = american_to_prob(moneyline[priced])
+    days = df['date'].to_numpy()[priced]
+    day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if len(days) else np.array([], dtype=int)
+    n_days = len(day_starts)
+
+    if n_days:
+        X = model.transform(df.loc[priced, model.feature_cols].values)
+        alpha, betas = model.posterior_draws()
+        if outcomes == 'market':
+            true_probs = market_probabilities(df, odds_col)[priced]
+        else:
+            won = df[result_col].to_numpy(dtype=float)[priced] == 1
+
+    # 2. Simulated seasons, a chunk at a time
+    final = np.empty(n_sims)
+    drawdown = np.empty(n_sims)
+    ruined = np.empty(n_sims, dtype=bool)
+    for start in range(0, n_sims, chunk_size):
+        stop = min(start + chunk_size, n_sims)
+        if not n_days:
+            final[start:stop], drawdown[start:stop], ruined[start:stop] = bankroll, 0.0, False
+            continue
+
+        # Bets and stakes of each season from its posterior draw
+        draw = rng.integers(len(alpha), size=stop - start)
+        probs = 1 / (1 + np.exp(-(alpha[draw, None] + betas[draw] @ X.T)))
+        kelly = np.clip((probs * decimal_odds - 1) / (decimal_odds - 1), 0, None)
+        fractions = np.where(probs - implied > threshold, kelly_fraction * kelly, 0.0)
+
+        # Cap the bankroll share at risk on any one day
+        exposure = np.add.reduceat(fractions, day_starts, axis=1)
+        scale = np.minimum(1, max_exposure / np.where(exposure > 0, exposure, 1))
+        fractions = fractions * np.repeat(scale, np.diff(np.r_[day_starts, len(days)]), axis=1)
+
+        if outcomes == 'market':
+            season_won = rng.random(fractions.shape) < true_probs
+        else:
+            season_won = won
+        returns = np.where(season_won, fractions * (decimal_odds - 1), -fractions)
+
+        # Daily compounding as a cumulative sum of log growth
+        with np.errstate(divide='ignore'):
+            log_growth = np.log1p(np.maximum(np.add.reduceat(returns, day_starts, axis=1), -1))
+        if outcomes == 'bootstrap':
+            log_growth = np.take_along_axis(log_growth, rng.integers(n_days, size=log_growth.shape), axis=1)
+        log_path = np.cumsum(log_growth, axis=1)
+        peak = np.maximum.accumulate(np.maximum(log_path, 0), axis=1)
+
+        final[start:stop] = bankroll * np.exp(log_path[:, -1])
+        drawdown[start:stop] = 1 - np.exp((log_path - peak).min(axis=1)).clip(max=1)
+        ruined[start:stop] = log_path.min(axis=1) < np.log(ruin_level)
+
+    sims = pd.DataFrame({'final_bankroll': final, 'max_drawdown': drawdown, 'ruined': ruined})
+    sims.attrs['outcomes'] = outcomes
+    return sims
+
+
+def market_probabilities(df, odds_col: str = 'moneyline_closing') -> np.ndarray:
+    """
+    Win probability implied by the closing line with the bookmaker's margin removed.
+    Each team row is paired with its opponent's row of the same game (date, team / opponent swapped,
+    doubleheaders in order) and both sides are de-vigged. Rows without their opponent's row (dropped
+    early-season games) are divided by the median overround of the paired rows; without team columns
+    nothing can be paired and the raw implied probability (margin included) is returned.
+    """
+    implied = american_to_prob(df[odds_col].to_numpy(dtype=float))
+    if not {'date', 'team', 'opponent'} <= set(df.columns):
+        return implied
+
+    # 1. The opponent's line of every row
+    keys = pd.DataFrame({
+        'date': df['date'].to_numpy(),
+        'team': df['team'].astype(str).to_numpy(),
+        'opponent': df['opponent'].astype(str).to_numpy(),
+    })
+    keys['nth'] = keys.groupby(['date', 'team', 'opponent']).cumcount()
+    sides = keys.assign(opp_implied=implied).rename(columns={'team': 'opponent', 'opponent': 'team'})
+    opp_implied = keys.merge(sides, on=['date', 'team', 'opponent', 'nth'], how='left')['opp_implied'].to_numpy()
+
+    # 2. De-vig the paired rows, scale the rest by the typical margin
+    overround = implied + opp_implied
+    paired = ~np.isnan(overround)
+    typical = np.median(overround[paired]) if paired.any() else 1.0
+    return np.where(paired, devig(implied, opp_implied), implied / typical)
+
+
+def bankroll_summary(sims: pd.DataFrame, bankroll: float = 1000, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> dict:
+    """
+    Headline numbers and quantiles of simulate_bankroll output, with the outcome source it used
+    """
+    distribution = sims[['final_bankroll', 'max_drawdown']].quantile(list(quantiles)).T
+    distribution.columns = [f"p{q * 100:g}" for q in quantiles]
+    distribution.insert(0, 'mean', sims[['final_bankroll', 'max_drawdown']].mean())
+    return {
+        'outcomes': sims.attrs.get('outcomes'),
+        'risk_of_ruin': float(sims['ruined'].mean()),
+        'prob_profit': float((sims['final_bankroll'] > bankroll).mean()),
+        'median_final_bankroll': float(sims['final_bankroll'].median()),
+        'distribution': distribution,
+    }
@@ -3,6 +3,29 @@ from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = PROJECT_ROOT / "data"
+SCHEDULE_CACHE_DIR = DATA_DIR / "cache" / "schedule"
+TEAM_STATE_PATH = DATA_DIR / "state" / "team_state.json"
+ARTIFACT_DIR = DATA_DIR / "artifacts"
+METRICS_PATH = DATA_DIR / "metrics" / "runs.jsonl"
+PROFILE_DIR = DATA_DIR / "metrics" / "profiles"
+
+# Recent-form features. Every window (rolling mean) and EWMA span is built for every
+# metric in one pass; the primary window also drives the Pythagorean / Log5 features.
+FEATURE_SPEC = {
+    'metrics': ['runs_scored', 'runs_allowed', 'hits', 'errors'],
+    'windows': [5, 10, 20, 40],
+    'ewm_spans': [5, 10, 20],
+    'primary_window': 10,
+}
+
+# Columns the Bayesian model is trained on
+MODEL_FEATURES = [
+    'is_home', 'rest_days', 'log5_prob',
+    'rolling_10_runs_scored', 'rolling_10_runs_allowed',
+    'rolling_10_hits', 'rolling_10_errors',
+    'rolling_pythag_win_pct', 'opp_pythag_win_pct',
+    'team_code', 'opponent_code'
+]
 
 TEAM_MAPPING = {
         # East
@@ -48,6 +71,11 @@ TEAM_MAPPING = {
         'Colorado Rockies': 'COL', 'Colorado': 'COL'
 }
 
+# Stable team dictionary: a team's code is its position in TEAMS, whatever season or
+# slice of games is being encoded, so train and predict always agree
+TEAMS = sorted(set(TEAM_MAPPING.values()))
+TEAM_CODES = {abbr: code for code, abbr in enumerate(TEAMS)}
+
 def get_team_abbr(name: str) -> str:
   if not isinstance(name, str):
     return "UNKNOWN"
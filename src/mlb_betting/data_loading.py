@@ -4,24 +4,77 @@ import json
 import os
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-from src.mlb_betting.config import get_team_abbr
+from src.mlb_betting.config import TEAM_CODES, get_team_abbr
+from src.mlb_betting.odds import american_to_prob, prob_to_american
 
 class MLBStatsAPI:
   base_url = "https://statsapi.mlb.com/api/v1"
   """
   Wrapper for the MLB Stats API
   """
-  def __init__(self):
+  def __init__(self, cache_dir: str = None, base_url: str = None, pool_size: int = 10):
     self.session = requests.Session()
     retries = Retry(total=3, backoff_factor=1, status_forcelist=[500,502,503,504])
-    self.session.mount('https://', HTTPAdapter(max_retries=retries))
+    # pool_size keeps one live connection per concurrent season fetch
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size)
+    self.session.mount('https://', adapter)
+    self.session.mount('http://', adapter)
 
-  def get_season_schedule(self, season: int) -> pd.DataFrame:
+    # Optional on-disk schedule cache (one Parquet file per season)
+    self.cache_dir = cache_dir
+    if base_url is not None:
+      self.base_url = base_url
+
+  def get_season_schedule(self, season: int, end_date: str = None, refresh: bool = False) -> pd.DataFrame:
+        """
+        Fetch schedule with hits/errors.
+        With a cache_dir, only dates that are not final yet (up to end_date) are re-fetched.
+        """
+        if self.cache_dir is None:
+            df_games = self._fetch_schedule(season)
+            return self._completed_games(df_games)
+
+        cache_file = self._cache_path(season)
+        df_cached = None
+        if not refresh and os.path.exists(cache_file):
+            df_cached = pd.read_parquet(cache_file)
+
+        # 1. Cold cache: one full-season request
+        if df_cached is None:
+            df_games = self._fetch_schedule(season)
+            if df_games is None:
+                return pd.DataFrame()
+            self._write_cache(df_games, cache_file)
+            return self._completed_games(df_games)
+
+        # 2. Warm cache: only re-fetch the date ranges that still have unfinished games
+        if end_date is None:
+            end_date = pd.Timestamp.today().strftime('%Y-%m-%d')
+
+        ranges = self._pending_date_ranges(df_cached, end_date)
+        if not ranges:
+            print(f"Schedule cache for {season} is up to date.")
+            return self._completed_games(df_cached)
+
+        df_updated = df_cached
+        for start, end in ranges:
+            df_range = self._fetch_schedule(season, start_date=start, end_date=end)
+            if df_range is None:
+                continue
+            in_range = (df_updated['date'] >= start) & (df_updated['date'] <= end)
+            df_updated = pd.concat([df_updated[~in_range], df_range], ignore_index=True)
+
+        df_updated = df_updated.sort_values(['date', 'game_id'], kind='stable').reset_index(drop=True)
+        self._write_cache(df_updated, cache_file)
+        return self._completed_games(df_updated)
+
+  def _fetch_schedule(self, season: int, start_date: str = None, end_date: str = None):
         """
-        Fetch schedule with hits/errors
+        Requests the schedule (whole season or a date range). Returns None on API errors.
         """
         url = f"{self.base_url}/schedule"
 
@@ -31,22 +84,32 @@ class MLBStatsAPI:
             'gameType': 'R',
             'hydrate': 'linescore'
         }
+        if start_date is not None:
+            params['startDate'] = start_date
+            params['endDate'] = end_date
+            print(f"Fetching schedule + stats for {season} ({start_date} to {end_date})...")
+        else:
+            print(f"Fetching schedule + stats for {season}...")
 
-        print(f"Fetching schedule + stats for {season}...")
         try:
             response = self.session.get(url, params=params)
             response.raise_for_status()
             data = response.json()
         except Exception as e:
             print(f"❌ API Error: {e}")
-            return pd.DataFrame()
+            return None
 
-        games_list = []
+        return self._parse_schedule(data)
 
-        if 'dates' not in data:
-            return pd.DataFrame()
+  @staticmethod
+  def _parse_schedule(data: dict) -> pd.DataFrame:
+        """
+        Flattens the schedule JSON. Unplayed games are kept (with empty scores)
+        so the cache knows which dates are still open.
+        """
+        games_list = []
 
-        for date_obj in data['dates']:
+        for date_obj in data.get('dates', []):
             date = date_obj['date']
             for game in date_obj['games']:
 
@@ -54,45 +117,233 @@ class MLBStatsAPI:
                 home_team_data = game['teams']['home']
                 away_team_data = game['teams']['away']
 
-                
-                if 'score' not in home_team_data or 'score' not in away_team_data:
-                    continue 
-
                 # 2. Get 'linescore' stats
                 linescore = game.get('linescore', {})
                 ls_home = linescore.get('teams', {}).get('home', {})
                 ls_away = linescore.get('teams', {}).get('away', {})
 
-
                 games_list.append({
                     'game_id': game['gamePk'],
                     'date': date,
                     'home_team': home_team_data['team']['name'],
                     'away_team': away_team_data['team']['name'],
-                    'home_score': home_team_data['score'], 
-                    'away_score': away_team_data['score'], 
-                    'home_hits': ls_home.get('hits', 0),   
+                    'home_score': home_team_data.get('score'),
+                    'away_score': away_team_data.get('score'),
+                    'home_hits': ls_home.get('hits', 0),
                     'home_errors': ls_home.get('errors', 0),
                     'away_hits': ls_away.get('hits', 0),
-                    'away_errors': ls_away.get('errors', 0)
+                    'away_errors': ls_away.get('errors', 0),
+                    # No status: not known to be final, so the date is fetched again next time
+                    'status': game.get('status', {}).get('abstractGameState', 'Unknown')
                 })
 
-        return pd.DataFrame(games_list)
+        columns = [
+            'game_id', 'date', 'home_team', 'away_team', 'home_score', 'away_score',
+            'home_hits', 'home_errors', 'away_hits', 'away_errors', 'status'
+        ]
+        return pd.DataFrame(games_list, columns=columns)
+
+  @staticmethod
+  def _completed_games(df_games) -> pd.DataFrame:
+        """
+        Keeps games with a score, in the same shape the API wrapper always returned.
+        """
+        if df_games is None or df_games.empty:
+            return pd.DataFrame()
+
+        scored = df_games['home_score'].notna() & df_games['away_score'].notna()
+        df_done = df_games[scored].drop(columns=['status']).reset_index(drop=True)
+        df_done['home_score'] = df_done['home_score'].astype('int64')
+        df_done['away_score'] = df_done['away_score'].astype('int64')
+        return df_done
+
+  @staticmethod
+  def _pending_date_ranges(df_cached: pd.DataFrame, end_date: str, max_gap_days: int = 7) -> list:
+        """
+        Groups the cached dates with unfinished games (up to end_date) into
+        (startDate, endDate) ranges, so a daily refresh is one or two requests.
+        """
+        open_games = (df_cached['status'] != 'Final') & (df_cached['date'] <= end_date)
+        pending = pd.to_datetime(pd.Series(df_cached.loc[open_games, 'date'].unique())).sort_values()
+        if pending.empty:
+            return []
+
+        # A new range starts wherever two pending dates are more than max_gap_days apart
+        new_block = pending.diff().dt.days.fillna(max_gap_days + 1) > max_gap_days
+        block_id = new_block.cumsum()
+
+        ranges = []
+        for _, block in pending.groupby(block_id.values):
+            ranges.append((block.min().strftime('%Y-%m-%d'), block.max().strftime('%Y-%m-%d')))
+        return ranges
+
+  def _cache_path(self, season: int) -> str:
+    return os.path.join(self.cache_dir, f"schedule_{season}.parquet")
+
+  @staticmethod
+  def _write_cache(df_games: pd.DataFrame, cache_file: str):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    df_games.to_parquet(cache_file, index=False)
+
+
+ODDS_FALLBACK_BOOKS = ['pinnacle', 'caesars', 'draftkings', 'fanduel']
+
+ODDS_GAME_DTYPES = {
+    'away_team_abbr': 'category',
+    'away_score': 'float32',
+    'home_team_abbr': 'category',
+    'home_score': 'float32',
+    'game_type': 'category',
+}
+
+ODDS_LINE_DTYPES = {
+    'game_idx': 'int32',
+    'book': 'category',
+    'book_rank': 'int16',
+    'opening_home': 'float32',
+    'opening_away': 'float32',
+    'current_home': 'float32',
+    'current_away': 'float32',
+}
+
+ODDS_BATCH_DTYPES = {
+    **ODDS_GAME_DTYPES,
+    'home_moneyline': 'float32',
+    'away_moneyline': 'float32',
+    'sportsbook': 'category',
+}
+
+
+class OddsMarket:
+  """
+  Every sportsbook's opening and current moneyline for every game, built in one pass.
+  games: one row per game (row position == game_idx)
+  lines: long table, one row per (game, listed book), with categorical book ids
+  """
+  def __init__(self, games: pd.DataFrame, lines: pd.DataFrame):
+    self.games = games
+    # Book ids stay string categories even when nothing is listed (an empty batch or date window),
+    # so batches always merge and the names can be lowercased
+    self.lines = lines.assign(book=lines['book'].cat.set_categories(lines['book'].cat.categories.astype(str)))
+
+  @property
+  def books(self) -> list:
+    return list(self.lines['book'].cat.categories)
+
+  def select_book(self, target_book: str = 'bet365', fallbacks: list = None, line: str = 'current') -> pd.DataFrame:
+    """
+    One row per game in the load_odds layout.
+    Target book first, then the fallbacks in order, then whichever book is listed first.
+    """
+    fallbacks = ODDS_FALLBACK_BOOKS if fallbacks is None else fallbacks
+    lines = self.lines
+
+    df = self.games.drop(columns=['game_idx']).reset_index(drop=True)
+    if lines.empty:
+      df['home_moneyline'] = np.full(len(df), np.nan, dtype='float32')
+      df['away_moneyline'] = np.full(len(df), np.nan, dtype='float32')
+      df['sportsbook'] = pd.Categorical([None] * len(df), dtype=lines['book'].dtype)
+      return df
+
+    # 1. Priority tier of every category (case insensitive): 0 = target, 1..n = fallbacks, n+1 = any other
+    preference = [target_book.lower()] + [fb.lower() for fb in fallbacks]
+    categories = lines['book'].cat.categories.str.lower()
+    tier_of_category = np.array([preference.index(c) if c in preference else len(preference) for c in categories])
+    codes = lines['book'].cat.codes.to_numpy()
+    tier = np.where(codes >= 0, tier_of_category[codes], len(preference))
+
+    # 2. Best (tier, list position) per game
+    game_idx = lines['game_idx'].to_numpy()
+    order = np.lexsort((lines['book_rank'].to_numpy(), tier, game_idx))
+    first = order[np.unique(game_idx[order], return_index=True)[1]]
+
+    # 3. Scatter back onto the game table (games without any book stay empty)
+    n_games = len(self.games)
+    home = np.full(n_games, np.nan, dtype='float32')
+    away = np.full(n_games, np.nan, dtype='float32')
+    book_codes = np.full(n_games, -1, dtype=codes.dtype)
+
+    chosen = game_idx[first]
+    home[chosen] = lines[f'{line}_home'].to_numpy()[first]
+    away[chosen] = lines[f'{line}_away'].to_numpy()[first]
+    book_codes[chosen] = codes[first]
+
+    df['home_moneyline'] = home
+    df['away_moneyline'] = away
+    df['sportsbook'] = pd.Categorical.from_codes(book_codes, dtype=lines['book'].dtype)
+    return df
+
+  def book_matrix(self, line: str = 'current', side: str = 'home') -> pd.DataFrame:
+    """
+    Wide games x books view of one line, for comparing books side by side
+    """
+    values = np.full((len(self.games), len(self.books)), np.nan, dtype='float32')
+    codes = self.lines['book'].cat.codes.to_numpy()
+    listed = codes >= 0
+    values[self.lines['game_idx'].to_numpy()[listed], codes[listed]] = self.lines[f'{line}_{side}'].to_numpy()[listed]
+    return pd.DataFrame(values, columns=self.books, index=self.games['game_idx'])
+
+  def consensus(self, line: str = 'current', books: list = None) -> pd.DataFrame:
+    """
+    Vig-free implied probability averaged over books, and the moneyline it implies
+    """
+    lines = self.lines
+    if books is not None:
+      lines = lines[lines['book'].str.lower().isin([b.lower() for b in books])]
+
+    home_prob = american_to_prob(lines[f'{line}_home'].to_numpy())
+    away_prob = american_to_prob(lines[f'{line}_away'].to_numpy())
+    fair_home = home_prob / (home_prob + away_prob)
+
+    valid = ~np.isnan(fair_home)
+    game_idx = lines['game_idx'].to_numpy()[valid]
+    n_games = len(self.games)
+    n_books = np.bincount(game_idx, minlength=n_games)
+    with np.errstate(invalid='ignore'):
+      mean_home = np.bincount(game_idx, weights=fair_home[valid], minlength=n_games) / n_books
+
+    df = self.games.drop(columns=['game_idx']).reset_index(drop=True)
+    df['n_books'] = n_books.astype('int16')
+    df['consensus_home_prob'] = mean_home
+    df['consensus_away_prob'] = 1 - mean_home
+    df['consensus_home_moneyline'] = prob_to_american(mean_home)
+    df['consensus_away_moneyline'] = prob_to_american(1 - mean_home)
+    return df
+
+  @classmethod
+  def concat(cls, markets: list) -> "OddsMarket":
+    """
+    Stacks batches, shifting game_idx and merging the categories
+    """
+    if not markets:
+      return cls(_empty_frame(['game_idx', 'date'], {**ODDS_GAME_DTYPES, 'game_idx': 'int32'}),
+                 _empty_frame([], ODDS_LINE_DTYPES))
+
+    offsets = np.cumsum([0] + [len(m.games) for m in markets[:-1]])
+    games = _concat_categorical([m.games.assign(game_idx=m.games['game_idx'] + off) for m, off in zip(markets, offsets)])
+    lines = _concat_categorical([m.lines.assign(game_idx=m.lines['game_idx'] + off) for m, off in zip(markets, offsets)])
+    return cls(games.astype({'game_idx': 'int32'}), lines.astype({'game_idx': 'int32'}))
 
 
 class BettingDataLoader:
   def __init__(self, filepath:str):
     self.filepath = filepath
 
-  def load_odds(self, target_book: str = 'bet365') -> pd.DataFrame:
+  def load_odds(self, target_book: str = 'bet365', stream: bool = False, start_date: str = None,
+                end_date: str = None, seasons: list = None) -> pd.DataFrame:
     """
-    Fetch odds from file and select book to use
+    Fetch odds from file and select book to use.
+    stream=True parses the file incrementally (bounded memory) and applies the date/season filters.
     """
     print(f"Loading odds from {self.filepath} using {target_book}...")
 
     if not os.path.exists(self.filepath):
       raise FileNotFoundError(f"Could not find file: {self.filepath}")
 
+    if stream:
+      batches = list(self.iter_odds_batches(target_book, start_date=start_date, end_date=end_date, seasons=seasons))
+      return _concat_categorical(batches, ODDS_BATCH_DTYPES)
+
     with open(self.filepath, 'r') as f:
       raw_data = json.load(f)
 
@@ -100,115 +351,405 @@ class BettingDataLoader:
       return pd.json_normalize(raw_data, sep='_')
 
     elif isinstance(raw_data, dict):
-      games_list = []
-
-      for date, games in raw_data.items():
-          for game in games:
-              view = game.get('gameView', {})
-
-              # Filter for Regular Season games
-              g_type = view.get('gameType', 'R')
-              if g_type != 'R':
-                  continue
-
-              
-              odds_section = game.get('odds', {})
-              moneylines = odds_section.get('moneyline', [])
-
-              selected_book = None
-
-              # 1. Try Target (Case Insensitive)
-              for book in moneylines:
-                  if book.get('sportsbook', '').lower() == target_book.lower():
-                      selected_book = book
-                      break
-
-              # 2. Try Fallbacks (Case Insensitive)
-              if selected_book is None and moneylines:
-                  fallbacks = ['pinnacle', 'caesars', 'draftkings', 'fanduel']
-                  for fb in fallbacks:
-                      for book in moneylines:
-                          # FIX: Added .lower() here too
-                          if book.get('sportsbook', '').lower() == fb:
-                              selected_book = book
-                              break
-                      if selected_book: break
-
-                  # 3. Last Resort: Take the first one
-                  if selected_book is None:
-                      selected_book = moneylines[0]
-
-              game_info = {
-                  'date': date,
-                  'away_team_abbr': view.get('awayTeam', {}).get('shortName'),
-                  'away_score': view.get('awayTeamScore'),
-                  'home_team_abbr': view.get('homeTeam', {}).get('shortName'),
-                  'home_score': view.get('homeTeamScore'),
-                  'game_type': g_type # Saved for audit
-              }
-
-              if selected_book:
-                  current = selected_book.get('currentLine', {})
-                  game_info['home_moneyline'] = current.get('homeOdds')
-                  game_info['away_moneyline'] = current.get('awayOdds')
-                  game_info['sportsbook'] = selected_book.get('sportsbook')
-              else:
-                  game_info['home_moneyline'] = np.nan
-                  game_info['away_moneyline'] = np.nan
-                  game_info['sportsbook'] = None
-
-          
-              games_list.append(game_info)
-
-      return pd.json_normalize(games_list, sep='_')
-
-
-def load_and_merge_data(season: int, odds_filepath: str) -> pd.DataFrame:
+      records = _filter_dates(_iter_loaded_odds(raw_data), start_date, end_date, seasons)
+      market = OddsMarket.concat(list(_market_batches(records)))
+      return market.select_book(target_book)
+
+  def load_market(self, stream: bool = True, start_date: str = None, end_date: str = None,
+                  seasons: list = None, batch_size: int = 5000) -> OddsMarket:
+    """
+    All books' opening/current lines for every game, in one pass over the file
+    """
+    print(f"Loading all sportsbook lines from {self.filepath}...")
+
+    if not os.path.exists(self.filepath):
+      raise FileNotFoundError(f"Could not find file: {self.filepath}")
+
+    if stream:
+      records = _iter_odds_json(self.filepath)
+    else:
+      with open(self.filepath, 'r') as f:
+        records = _iter_loaded_odds(json.load(f))
+
+    records = _filter_dates(records, start_date, end_date, seasons)
+    return OddsMarket.concat(list(_market_batches(records, batch_size)))
+
+  def iter_odds_batches(self, target_book: str = 'bet365', batch_size: int = 5000, start_date: str = None,
+                        end_date: str = None, seasons: list = None):
+    """
+    Generator of typed DataFrame batches, built while walking the file one game at a time.
+    Games outside the date/season filters are dropped before they reach a batch.
+    """
+    records = _filter_dates(_iter_odds_json(self.filepath), start_date, end_date, seasons)
+
+    for batch in _market_batches(records, batch_size):
+      if isinstance(batch, OddsMarket):
+        yield batch.select_book(target_book)
+      else:
+        yield pd.json_normalize(batch, sep='_')
+
+
+def _filter_dates(records, start_date: str = None, end_date: str = None, seasons: list = None):
+    """
+    Drops (date, game, is_flat) records outside the date range / seasons
+    """
+    if start_date is None and end_date is None and seasons is None:
+        yield from records
+        return
+
+    seasons = None if seasons is None else {int(s) for s in seasons}
+    for record in records:
+        date = record[0]
+        if date is None:
+            continue
+        if start_date is not None and date < start_date:
+            continue
+        if end_date is not None and date > end_date:
+            continue
+        if seasons is not None and int(date[:4]) not in seasons:
+            continue
+        yield record
+
+
+def _market_batches(records, batch_size: int = 5000):
+    """
+    Groups (date, game, is_flat) records into OddsMarket batches with a single pass over each game.
+    Flat (pre-normalized) records are passed through as plain lists of dicts.
+    """
+    games = {'date': [], 'away_team_abbr': [], 'away_score': [], 'home_team_abbr': [], 'home_score': [], 'game_type': []}
+    lines = {col: [] for col in ODDS_LINE_DTYPES}
+    flat = []
+
+    def market():
+        df_games = pd.DataFrame(games).astype(ODDS_GAME_DTYPES)
+        df_games.insert(0, 'game_idx', np.arange(len(df_games), dtype='int32'))
+        df_games['date'] = pd.to_datetime(df_games['date'])
+        return OddsMarket(df_games, pd.DataFrame(lines, columns=list(ODDS_LINE_DTYPES)).astype(ODDS_LINE_DTYPES))
+
+    for date, game, is_flat in records:
+        if is_flat:
+            flat.append(game)
+            if len(flat) >= batch_size:
+                yield flat
+                flat = []
+            continue
+
+        view = game.get('gameView', {})
+
+        # Filter for Regular Season games
+        g_type = view.get('gameType', 'R')
+        if g_type != 'R':
+            continue
+
+        game_idx = len(games['date'])
+        games['date'].append(date)
+        games['away_team_abbr'].append(view.get('awayTeam', {}).get('shortName'))
+        games['away_score'].append(view.get('awayTeamScore'))
+        games['home_team_abbr'].append(view.get('homeTeam', {}).get('shortName'))
+        games['home_score'].append(view.get('homeTeamScore'))
+        games['game_type'].append(g_type) # Saved for audit
+
+        for rank, book in enumerate(game.get('odds', {}).get('moneyline', [])):
+            opening = book.get('openingLine') or {}
+            current = book.get('currentLine') or {}
+            lines['game_idx'].append(game_idx)
+            lines['book'].append(book.get('sportsbook'))
+            lines['book_rank'].append(rank)
+            lines['opening_home'].append(opening.get('homeOdds'))
+            lines['opening_away'].append(opening.get('awayOdds'))
+            lines['current_home'].append(current.get('homeOdds'))
+            lines['current_away'].append(current.get('awayOdds'))
+
+        if game_idx + 1 >= batch_size:
+            yield market()
+            for col in games: games[col] = []
+            for col in lines: lines[col] = []
+
+    if games['date']:
+        yield market()
+    if flat:
+        yield flat
+
+
+def _iter_loaded_odds(raw_data: dict):
+    """
+    Same records as _iter_odds_json, from an already loaded {date: [game, ...]} dict
+    """
+    for date, games in raw_data.items():
+        for game in games:
+            yield date, game, False
+
+
+def _empty_frame(columns: list, dtypes: dict) -> pd.DataFrame:
+    columns = columns + [c for c in dtypes if c not in columns]
+    return pd.DataFrame(columns=columns).astype({c: d for c, d in dtypes.items() if c in columns})
+
+
+def _concat_categorical(frames: list, dtypes: dict = None) -> pd.DataFrame:
+    """
+    Concatenates batches, merging the categories so categorical columns stay categorical
+    """
+    if not frames:
+        return _empty_frame(['date'], dtypes or {})
+
+    df = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            categories = pd.api.types.union_categoricals([f[col] for f in frames]).categories
+            df[col] = pd.Categorical(df[col], categories=categories)
+    return df
+
+
+def _iter_odds_json(filepath: str, chunk_size: int = 1 << 20):
+    """
+    Incremental walker over the odds history, one game at a time.
+    Yields (date, game, False) for the {date: [game, ...]} layout and
+    (record['date'], record, True) for a flat [record, ...] list.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(filepath, 'r') as f:
+        buf, pos = '', 0
+        eof = False
+
+        def fill():
+            # Drop what has been consumed and read the next chunk
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+
+        def next_char():
+            # First non-whitespace character (not consumed)
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if eof:
+                    raise ValueError(f"Unexpected end of file in {filepath}")
+                fill()
+
+        def expect(chars: str) -> str:
+            nonlocal pos
+            ch = next_char()
+            if ch not in chars:
+                raise ValueError(f"Malformed odds file {filepath}: expected one of {chars!r}, got {ch!r}")
+            pos += 1
+            return ch
+
+        def decode():
+            # One complete JSON value (object or string); read more until it fits in the buffer
+            nonlocal pos
+            next_char()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    pos = end
+                    return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+
+        def items(closing: str):
+            # Values of a JSON array, consumed one at a time
+            nonlocal pos
+            if next_char() == closing:
+                pos += 1
+                return
+            while True:
+                yield decode()
+                if expect(',' + closing) == closing:
+                    return
+
+        fill()
+        if expect('{[') == '[':
+            for record in items(']'):
+                yield record.get('date'), record, True
+            return
+
+        if next_char() == '}':
+            return
+        while True:
+            date = decode()
+            expect(':')
+            expect('[')
+            for game in items(']'):
+                yield date, game, False
+            if expect(',}') == '}':
+                return
+
+
+def load_and_merge_data(season: int, odds_filepath: str, cache_dir: str = None) -> pd.DataFrame:
   """
   Steps:
   1. Gathers MLB API and Betting data
   2. Cleans data, removes duplicates and standardizes team names
   3. Merges cleaned data
   """
-  # 1. MLB API data
-  api = MLBStatsAPI()
-  df_mlb = api.get_season_schedule(season)
+  return load_and_merge_seasons([season], odds_filepath, cache_dir=cache_dir, max_workers=1)
+
+
+def load_and_merge_seasons(seasons: list, odds_filepath: str, cache_dir: str = None, max_workers: int = 4) -> pd.DataFrame:
+  """
+  Multi-season version of load_and_merge_data.
+  Season schedules are fetched concurrently (at most max_workers requests in flight,
+  over one pooled session) while the odds file is streamed once for all seasons.
+  Raises ValueError when no season has a completed game.
+  """
+  api = MLBStatsAPI(cache_dir=cache_dir, pool_size=max_workers)
+  loader = BettingDataLoader(odds_filepath)
+
+  # 1. MLB API data + Odds Data, overlapped
+  with ThreadPoolExecutor(max_workers=max_workers + 1) as pool:
+    odds_future = pool.submit(loader.load_odds, target_book='bet365', stream=True, seasons=seasons)
+    schedule_futures = [pool.submit(api.get_season_schedule, season) for season in seasons]
+
+    schedules = [future.result() for future in schedule_futures]
+    df_odds = odds_future.result()
 
-  df_mlb = df_mlb.sort_values('date')
+  schedules = [df for df in schedules if not df.empty]
+  if not schedules:
+    raise ValueError(f"No completed games for seasons {list(seasons)}: the schedule cache is empty and the API returned nothing")
+  df_mlb = pd.concat(schedules, ignore_index=True)
+
+  # 2. Clean and merge once for all seasons
+  return _merge_games_and_odds(df_mlb, df_odds)
+
+
+def _merge_games_and_odds(df_mlb: pd.DataFrame, df_odds: pd.DataFrame) -> pd.DataFrame:
+  """
+  Cleans the schedule, standardizes team names and joins the odds onto each game.
+  The join is one-to-one (see match_games): every completed game appears once, with
+  the odds columns empty when no odds record could be paired with it. game_number is the
+  game's order within its day's matchup (1, or 2 for the second game of a doubleheader).
+  """
+  df_mlb = df_mlb.sort_values(['date', 'game_id'], kind='stable')
   df_mlb = df_mlb.drop_duplicates(subset=['game_id'], keep='last')
 
   mask_valid = (df_mlb['home_score'] > 0) | (df_mlb['away_score'] > 0) | (df_mlb['home_hits'] > 0)
-  df_mlb = df_mlb[mask_valid].copy()
-
-  # 2. Load Odds Data
-  loader = BettingDataLoader(odds_filepath)
-  df_odds = loader.load_odds(target_book='bet365')
+  df_mlb = df_mlb[mask_valid].reset_index(drop=True)
 
   # 3. Team name standardization
-  df_mlb['date'] = pd.to_datetime(df_mlb['date'])
-  df_odds['date'] = pd.to_datetime(df_odds['date'])
-  
-  df_mlb['home_abbr'] = df_mlb['home_team'].apply(get_team_abbr)
-  df_mlb['away_abbr'] = df_mlb['away_team'].apply(get_team_abbr)
-  
+  df_mlb['date'] = pd.to_datetime(df_mlb['date'], format='%Y-%m-%d')
+  df_odds = df_odds.reset_index(drop=True)
+  if not pd.api.types.is_datetime64_any_dtype(df_odds['date']):
+    df_odds['date'] = pd.to_datetime(df_odds['date'])
+
+  df_mlb['home_abbr'] = team_abbrs(df_mlb['home_team'])
+  df_mlb['away_abbr'] = team_abbrs(df_mlb['away_team'])
+
   df_odds['home_abbr'] = df_odds['home_team_abbr']
   df_odds['away_abbr'] = df_odds['away_team_abbr']
 
-  # 4. Merge
-  df_merged = pd.merge(
-    df_mlb,
-    df_odds,
-    how='left', 
-    left_on=['date', 'home_abbr', 'away_abbr'],
-    right_on=['date', 'home_team_abbr', 'away_team_abbr'],
-    suffixes=('', '_odds')
+  unknown_names = set(df_mlb.loc[df_mlb['home_abbr'] == "UNKNOWN", 'home_team']) | set(df_mlb.loc[df_mlb['away_abbr'] == "UNKNOWN", 'away_team'])
+  unknown_abbrs = (set(df_odds['home_abbr'].dropna()) | set(df_odds['away_abbr'].dropna())) - set(TEAM_CODES)
+  if unknown_names:
+    print(f"⚠️ Unknown MLB team names (mapped to UNKNOWN): {sorted(map(str, unknown_names))}")
+  if unknown_abbrs:
+    print(f"⚠️ Unknown odds team abbreviations: {sorted(map(str, unknown_abbrs))}")
+
+  # 4. Merge: one odds row (or none) per game, keyed on the matchup and its game number
+  df_mlb['game_number'] = game_numbers(df_mlb)
+  df_odds['game_number'] = game_numbers(df_odds)
+  positions, report = match_games(df_mlb, df_odds)
+  print(
+    f"Matched odds for {report['matched_on_score'] + report['matched_on_game_number']} games "
+    f"({report['matched_on_score']} on score, {report['matched_on_game_number']} on game number); "
+    f"{report['mlb_unmatched']} games without odds, {report['odds_unmatched']} odds records without a game"
   )
-  
-  # 5. Handle Doubleheaders Manually
-  condition = (
-      (df_merged['home_score'] == df_merged['home_score_odds']) &
-      (df_merged['away_score'] == df_merged['away_score_odds'])
-  ) | (df_merged['home_score_odds'].isna()) 
-  
-  df_final = df_merged[condition].copy()
-  return df_final
+
+  df_matched = df_odds.drop(columns=['date', 'game_number']).reindex(positions).reset_index(drop=True)
+  df_matched.columns = [f"{col}_odds" if col in df_mlb.columns else col for col in df_matched.columns]
+  return pd.concat([df_mlb, df_matched], axis=1)
+
+
+def team_abbrs(names) -> np.ndarray:
+  """
+  Vectorized get_team_abbr: each distinct name is looked up once
+  """
+  codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+  lookup = np.array([get_team_abbr(name) for name in uniques] + ["UNKNOWN"], dtype=object)
+  return lookup[codes]
+
+
+def game_numbers(df: pd.DataFrame) -> np.ndarray:
+  """
+  Order (1, 2, ...) of every row within its (date, home_abbr, away_abbr) matchup, in row order
+  """
+  keys = [df['date'].dt.normalize(), df['home_abbr'], df['away_abbr']]
+  return df.groupby(keys, sort=False, dropna=False, observed=True).cumcount().to_numpy() + 1
+
+
+def match_games(df_mlb: pd.DataFrame, df_odds: pd.DataFrame) -> tuple:
+  """
+  One-to-one pairing of schedule games with odds records, both keyed by date / home_abbr / away_abbr.
+  1. Same key and same final score. On a doubleheader with identical scores, games pair in order.
+  2. Leftover games and odds records without a score pair on the key plus the game number
+     (the 'game_number' column, see game_numbers, computed here when it is missing).
+  Odds records whose score contradicts every game are left unpaired.
+  Returns (position of the paired df_odds row per df_mlb row, -1 if none; counts report).
+  """
+  n_mlb, n_odds = len(df_mlb), len(df_odds)
+
+  # Shared integer codes for both sides, packed into one int64 key per row
+  def codes(*columns, dtype=object):
+    values = np.concatenate([np.asarray(frame[col], dtype=dtype) for col in columns for frame in (df_mlb, df_odds)])
+    labels, uniques = pd.factorize(values)
+    return (labels + 1).reshape(len(columns), -1), len(uniques) + 1
+
+  days = np.concatenate([
+    frame['date'].to_numpy().astype('datetime64[D]').astype('int64') for frame in (df_mlb, df_odds)
+  ])
+  (home, away), n_teams = codes('home_abbr', 'away_abbr')
+  (home_score, away_score), n_scores = codes('home_score', 'away_score', dtype=float)
+  game_number = np.concatenate([
+    frame['game_number'].to_numpy() if 'game_number' in frame else game_numbers(frame) for frame in (df_mlb, df_odds)
+  ]).astype('int64')
+  game_key = ((days - days.min(initial=0)) * n_teams + home) * n_teams + away
+  score_key = (game_key * n_scores + home_score) * n_scores + away_score
+  number_key = game_key * (game_number.max(initial=0) + 1) + game_number
+  has_score = (home_score > 0) & (away_score > 0)
+
+  # 1. Score-first
+  left, right = np.arange(n_mlb), np.arange(n_mlb, n_mlb + n_odds)
+  positions = _pair_in_order(score_key, left, right[has_score[right]])
+  matched_on_score = int((positions >= 0).sum())
+
+  # 2. Game number among the leftovers
+  paired = np.zeros(n_mlb + n_odds, dtype=bool)
+  paired[positions[positions >= 0]] = True
+  rest_mlb = np.flatnonzero(positions < 0)
+  rest_odds = right[~paired[right] & ~has_score[right]]
+  positions[rest_mlb] = _pair_in_order(number_key, rest_mlb, rest_odds)
+
+  positions = np.where(positions >= 0, positions - n_mlb, -1)
+  n_paired = int((positions >= 0).sum())
+  return positions, {
+    'matched_on_score': matched_on_score,
+    'matched_on_game_number': n_paired - matched_on_score,
+    'mlb_unmatched': n_mlb - n_paired,
+    'odds_unmatched': n_odds - n_paired,
+  }
+
+
+def _pair_in_order(keys: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+  """
+  Pairs the n-th `left` row of each key with the n-th `right` row of the same key.
+  Returns the paired right row per left row (-1 if none).
+  """
+  def occurrence(rows):
+    order = np.argsort(keys[rows], kind='stable')
+    sorted_keys = keys[rows][order]
+    starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]] if len(rows) else np.array([], dtype=bool)
+    run_start = np.maximum.accumulate(np.where(starts, np.arange(len(rows)), 0)) if len(rows) else starts.astype(int)
+    occ = np.empty(len(rows), dtype='int64')
+    occ[order] = np.arange(len(rows)) - run_start
+    return occ
+
+  occ_left, occ_right = occurrence(left), occurrence(right)
+  stride = max(occ_left.max(initial=0), occ_right.max(initial=0)) + 1
+  hits = pd.Index(keys[right] * stride + occ_right).get_indexer(keys[left] * stride + occ_left)
+  return np.where(hits >= 0, right[hits], -1)
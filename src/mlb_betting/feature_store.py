@@ -0,0 +1,454 @@
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting.config import FEATURE_SPEC
+from src.mlb_betting.features import FLAG_DTYPE, TEAM_CENTRIC_COLUMNS, TEAM_DTYPE, compact_dtypes, form_feature_columns, log5_prob, team_codes
+
+# Where each side's numbers live in a merged (one row per game) frame
+SIDE_COLUMNS = {
+    1: {col: home_col for col, (home_col, _) in TEAM_CENTRIC_COLUMNS.items()},
+    0: {col: away_col for col, (_, away_col) in TEAM_CENTRIC_COLUMNS.items()},
+}
+
+RESULT_COLUMNS = ['result', 'runs_scored', 'runs_allowed', 'hits', 'errors']
+
+
+class TeamState:
+  """
+  Everything needed to produce one team's next pre-game features:
+  a ring buffer of the last max(window) games, running window sums, EWMA state and the last game date.
+  """
+  def __init__(self, spec: dict):
+    self.spec = spec
+    n_metrics = len(spec['metrics'])
+
+    self.recent = deque(maxlen=max(spec['windows']))
+    self.n_games = 0
+    self.last_date = None
+    self.window_sums = [[0.0] * n_metrics for _ in spec['windows']]
+    self.window_missing = [[0] * n_metrics for _ in spec['windows']]
+    # Per span and metric: [weighted mean, old weight, observations], as pandas' ewm(adjust=True) keeps them
+    self.ewm = [[[math.nan, 1.0, 0] for _ in range(n_metrics)] for _ in spec.get('ewm_spans', [])]
+    # form_features() only changes when a game is pushed; cached for repeated scoring
+    self._form = None
+
+  def push(self, values: list, date: pd.Timestamp):
+    """
+    Adds one finished game (metric values in spec order). O(1) in the length of the history.
+    """
+    # 1. Rolling windows: add the new game, drop the one leaving each window
+    for w_idx, window in enumerate(self.spec['windows']):
+      sums, missing = self.window_sums[w_idx], self.window_missing[w_idx]
+      leaving = self.recent[-window] if len(self.recent) >= window else None
+      for i, value in enumerate(values):
+        if leaving is not None:
+          if leaving[i] != leaving[i]:
+            missing[i] -= 1
+          else:
+            sums[i] -= leaving[i]
+        if value != value:
+          missing[i] += 1
+        else:
+          sums[i] += value
+
+    self.recent.append(tuple(values))
+
+    # 2. EWMA, same arithmetic as pandas so the results are bit-identical
+    for s_idx, span in enumerate(self.spec.get('ewm_spans', [])):
+      alpha = 1. / (1. + (span - 1) / 2)
+      old_wt_factor = 1. - alpha
+      for i, cur in enumerate(values):
+        state = self.ewm[s_idx][i]
+        weighted, old_wt, nobs = state
+        is_observation = cur == cur
+        nobs += is_observation
+        if weighted == weighted:
+          old_wt *= old_wt_factor
+          if is_observation:
+            if weighted != cur:
+              weighted = old_wt * weighted + 1. * cur
+              weighted /= (old_wt + 1.)
+            old_wt += 1.
+        elif is_observation:
+          weighted = cur
+        state[:] = [weighted, old_wt, nobs]
+
+    self.n_games += 1
+    self.last_date = date
+    self._form = None
+
+  def form_features(self) -> dict:
+    """
+    Pre-game form columns (same names as features.calculate_form_features).
+    The returned dict is shared until the next push(); do not modify it.
+    """
+    if self._form is not None:
+      return self._form
+
+    spec = self.spec
+    metrics = spec['metrics']
+    primary = spec.get('primary_window', spec['windows'][0])
+    runs, allowed = metrics.index('runs_scored'), metrics.index('runs_allowed')
+
+    row = {}
+    for w_idx, window in enumerate(spec['windows']):
+      full = self.n_games >= window
+      sums = [
+        s if full and m == 0 else math.nan
+        for s, m in zip(self.window_sums[w_idx], self.window_missing[w_idx])
+      ]
+      for i, metric in enumerate(metrics):
+        row[f'rolling_{window}_{metric}'] = sums[i] / window
+
+      pythag_col = 'rolling_pythag_win_pct' if window == primary else f'rolling_{window}_pythag_win_pct'
+      row[pythag_col] = (sums[runs] ** 2) / ((sums[runs] ** 2) + (sums[allowed] ** 2) + 1e-9)
+
+    for s_idx, span in enumerate(spec.get('ewm_spans', [])):
+      for i, metric in enumerate(metrics):
+        weighted, _, nobs = self.ewm[s_idx][i]
+        row[f'ewm_{span}_{metric}'] = weighted if nobs >= 1 else math.nan
+
+    self._form = row
+    return row
+
+  def rest_days(self, date: pd.Timestamp) -> float:
+    # Fill the first game of the season with huge rest (e.g., 5 days)
+    return 5.0 if self.last_date is None else float((date - self.last_date).days)
+
+  def to_dict(self) -> dict:
+    return {
+      'recent': [list(v) for v in self.recent],
+      'n_games': self.n_games,
+      'last_date': None if self.last_date is None else self.last_date.isoformat(),
+      'window_sums': self.window_sums,
+      'window_missing': self.window_missing,
+      'ewm': self.ewm,
+    }
+
+  @classmethod
+  def from_dict(cls, data: dict, spec: dict) -> "TeamState":
+    state = cls(spec)
+    state.recent.extend(tuple(v) for v in data['recent'])
+    state.n_games = data['n_games']
+    state.last_date = None if data['last_date'] is None else pd.Timestamp(data['last_date'])
+    state.window_sums = data['window_sums']
+    state.window_missing = data['window_missing']
+    state.ewm = data['ewm']
+    return state
+
+
+class TeamFeatureStore:
+  """
+  Incremental replacement for re-running the feature pipeline over the full history.
+  update() absorbs finished games, features_for() emits pre-game rows for upcoming ones;
+  both cost O(1) per game. The rows match create_team_centric_df -> calculate_form_features ->
+  calculate_advanced_features (exactly, for integer box-score metrics).
+  """
+  def __init__(self, spec: dict = None):
+    self.spec = FEATURE_SPEC if spec is None else spec
+    self.teams = {}
+    # Last game date absorbed by update() / process()
+    self.last_update = None
+
+  def _state(self, team: str) -> TeamState:
+    if team not in self.teams:
+      self.teams[team] = TeamState(self.spec)
+    return self.teams[team]
+
+  def update(self, df_games: pd.DataFrame):
+    """
+    Absorbs finished games (merged, one row per game) in date order.
+    Games on or before the last date already absorbed are skipped, so re-running a day does not
+    count its games twice.
+    """
+    skipped = 0
+    newest = self.last_update
+    for game in _iter_games(df_games):
+      if self.last_update is not None and game['date'] <= self.last_update:
+        skipped += 1
+        continue
+      self._push(game)
+      newest = game['date']
+    if skipped:
+      print(f"Skipped {skipped} games on or before {self.last_update.date()} (already absorbed)")
+    self.last_update = newest
+
+  def features_for(self, df_games: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pre-game feature rows (two per game) for upcoming games, without changing the state
+    """
+    rows = {1: [], 0: []}
+    for game in _iter_games(df_games):
+      for is_home, row in self._game_rows(game).items():
+        rows[is_home].append(row)
+    return self._frame(rows, with_results=False)
+
+  def matchup(self, home: str, away: str, date) -> list:
+    """
+    Pre-game rows [home, away] for one upcoming game as plain dicts, straight from the
+    in-memory state (no DataFrame, for low-latency scoring). Values are rounded to
+    float32 like the frames, so they match features_for().
+    """
+    game = {'home_team_abbr': home, 'away_team_abbr': away, 'date': pd.Timestamp(date)}
+    rows = self._game_rows(game)
+    float_cols = [col for col, value in rows[1].items() if isinstance(value, float)]
+    for row in rows.values():
+      # One array round trip per row instead of a numpy scalar per value
+      row.update(zip(float_cols, np.array([row[c] for c in float_cols], dtype=np.float32).tolist()))
+      row['log5_prob'] = _log5(row['rolling_pythag_win_pct'], row['opp_pythag_win_pct'])
+    return [rows[1], rows[0]]
+
+  def process(self, df_games: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replays finished games: emit each game's pre-game rows, then absorb its result.
+    Returns the rows in the same order as the batch pipeline.
+    """
+    rows = {1: [], 0: []}
+    for game in _iter_games(df_games):
+      for is_home, row in self._game_rows(game).items():
+        side = SIDE_COLUMNS[is_home]
+        row['runs_scored'] = game[side['runs_scored']]
+        row['runs_allowed'] = game[side['runs_allowed']]
+        row['hits'] = game[side['hits']]
+        row['errors'] = game[side['errors']]
+        row['result'] = int(row['runs_scored'] > row['runs_allowed'])
+        rows[is_home].append(row)
+      self._push(game)
+      self.last_update = game['date']
+    return self._frame(rows, with_results=True)
+
+  def _game_rows(self, game: dict) -> dict:
+    home, away = game['home_team_abbr'], game['away_team_abbr']
+    if not isinstance(home, str) or not isinstance(away, str):
+      return {}
+
+    date = game['date']
+    state = {1: self._state(home), 0: self._state(away)}
+    form = {side: state[side].form_features() for side in (1, 0)}
+
+    rows = {}
+    for is_home in (1, 0):
+      columns = SIDE_COLUMNS[is_home]
+      B = form[1 - is_home]['rolling_pythag_win_pct']
+
+      row = {
+        'date': date,
+        'team': game[columns['team']],
+        'opponent': game[columns['opponent']],
+        'is_home': is_home,
+        'moneyline_closing': game.get(columns['moneyline_closing'], math.nan),
+        **form[is_home],
+        'rest_days': state[is_home].rest_days(date),
+        'opp_pythag_win_pct': B,
+      }
+      rows[is_home] = row
+    return rows
+
+  def _push(self, game: dict):
+    for is_home in (1, 0):
+      columns = SIDE_COLUMNS[is_home]
+      team = game[columns['team']]
+      if not isinstance(team, str):
+        continue
+      values = [float(game[columns[metric]]) for metric in self.spec['metrics']]
+      self._state(team).push(values, game['date'])
+
+  def _frame(self, rows: dict, with_results: bool) -> pd.DataFrame:
+    """
+    Long frame in batch order: home rows then away rows, stable-sorted by team and date
+    """
+    columns = ['date', 'team', 'opponent', 'is_home']
+    if with_results:
+      columns += RESULT_COLUMNS
+    columns += ['moneyline_closing'] + form_feature_columns(self.spec) + ['rest_days', 'opp_pythag_win_pct']
+
+    df = compact_dtypes(pd.DataFrame(rows[1] + rows[0], columns=columns))
+    # Log5 from the stored (float32) Pythagorean columns, as the batch pipeline does
+    df['log5_prob'] = log5_prob(df['rolling_pythag_win_pct'], df['opp_pythag_win_pct'])
+    return df.sort_values(['team', 'date'], kind='stable').reset_index(drop=True)
+
+  def save(self, path: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+      json.dump({
+        'spec': self.spec,
+        'last_update': None if self.last_update is None else self.last_update.isoformat(),
+        'teams': {t: s.to_dict() for t, s in self.teams.items()},
+      }, f)
+
+  @classmethod
+  def load(cls, path: str) -> "TeamFeatureStore":
+    with open(path, 'r') as f:
+      data = json.load(f)
+    store = cls(data['spec'])
+    store.teams = {t: TeamState.from_dict(s, store.spec) for t, s in data['teams'].items()}
+    if data.get('last_update') is not None:
+      store.last_update = pd.Timestamp(data['last_update'])
+    return store
+
+
+def _log5(A: float, B: float) -> float:
+    """
+    Scalar features.log5_prob (float64 arithmetic, float32 result) without the numpy call overhead
+    """
+    numerator = A * (1 - B)
+    denominator = (A * (1 - B)) + (B * (1 - A))
+    if denominator != denominator or denominator == 0:
+        return math.nan
+    return float(np.float32(numerator / denominator))
+
+
+def _iter_games(df_games: pd.DataFrame):
+    """
+    Game rows as dicts, in date order (stable, so doubleheaders keep their order)
+    """
+    df = df_games.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values('date', kind='stable')
+    yield from df.to_dict('records')
+
+
+class FeatureIndex:
+  """
+  Post-game team form sorted per team by date, for point-in-time lookups: "features for team X
+  going into date D" is one binary search. Each row is the team's form after that game (the
+  TeamFeatureStore state), so a lookup for D includes every game played before D, the last one too.
+  """
+  # Composite sort key: team id in the high part, days since epoch in the low part
+  KEY_SPAN = 1_000_000
+
+  def __init__(self, df_state: pd.DataFrame, feature_cols: list = None):
+    """
+    df_state: one row per (team, game) with 'team', 'date' and the form columns as they stand
+    after that game, in game order (see from_games)
+    """
+    if feature_cols is None:
+      feature_cols = [c for c in form_feature_columns(FEATURE_SPEC) if c in df_state.columns]
+    self.feature_cols = list(feature_cols)
+
+    # Stable team codes (config.TEAMS), so ids mean the same thing in every index
+    codes = team_codes(df_state['team'])
+    df = df_state[codes >= 0]
+    team_ids = codes[codes >= 0]
+    self.teams = pd.Index(TEAM_DTYPE.categories)
+    days = df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+
+    # Stable: the later game of a doubleheader stays last on its day
+    keys = team_ids.astype(np.int64) * self.KEY_SPAN + days
+    order = np.argsort(keys, kind='stable')
+
+    self.keys = keys[order]
+    self.team_ids = team_ids[order]
+    self.days = days[order]
+    self.values = df[self.feature_cols].to_numpy(dtype='float64')[order]
+
+  @classmethod
+  def from_games(cls, df_games: pd.DataFrame, spec: dict = None) -> "FeatureIndex":
+    """
+    Replays finished games (merged, one row per game) through a TeamFeatureStore and
+    records both teams' form after every game
+    """
+    store = TeamFeatureStore(spec)
+    rows = []
+    for game in _iter_games(df_games):
+      store._push(game)
+      for is_home in (1, 0):
+        team = game[SIDE_COLUMNS[is_home]['team']]
+        if isinstance(team, str):
+          rows.append({'team': team, 'date': game['date'], **store.teams[team].form_features()})
+
+    columns = form_feature_columns(store.spec)
+    return cls(compact_dtypes(pd.DataFrame(rows, columns=['team', 'date'] + columns)), columns)
+
+  def lookup(self, teams, dates) -> pd.DataFrame:
+    """
+    Batched as-of lookup: for every (team, date) pair, the team's form after its last game
+    before that date ('last_game_date'). Unknown teams or no earlier game come back as NaN.
+    """
+    team_ids = team_codes(pd.Index(teams))
+    days = pd.to_datetime(pd.Index(dates)).to_numpy().astype('datetime64[D]').astype(np.int64)
+    query = team_ids.astype(np.int64) * self.KEY_SPAN + days
+
+    # side='left': games on the date itself are not played yet
+    pos = np.searchsorted(self.keys, query, side='left') - 1
+    found = (team_ids >= 0) & (pos >= 0)
+    found[found] = self.team_ids[pos[found]] == team_ids[found]
+
+    values = np.full((len(query), len(self.feature_cols)), np.nan)
+    values[found] = self.values[pos[found]]
+    last_game = np.full(len(query), np.datetime64('NaT'), dtype='datetime64[D]')
+    last_game[found] = self.days[pos[found]].astype('datetime64[D]')
+
+    df = pd.DataFrame(values, columns=self.feature_cols)
+    df.insert(0, 'last_game_date', last_game.astype('datetime64[ns]'))
+    return df
+
+  def as_of(self, team: str, date) -> pd.Series:
+    """
+    One team's form going into a date (single binary search, no frame building).
+    The Series name is the date of the last game it includes (NaT if there is none).
+    """
+    pos = self._position(team, date)
+    if pos is None:
+      return pd.Series(np.nan, index=self.feature_cols, name=pd.NaT)
+    return pd.Series(self.values[pos], index=self.feature_cols, name=pd.Timestamp(self.days[pos].astype('datetime64[D]')))
+
+  def _position(self, team: str, date):
+    if team not in self.teams:
+      return None
+    team_id = self.teams.get_loc(team)
+    day = pd.Timestamp(date).to_datetime64().astype('datetime64[D]').astype(np.int64)
+    pos = int(np.searchsorted(self.keys, team_id * self.KEY_SPAN + day, side='left')) - 1
+    if pos < 0 or self.team_ids[pos] != team_id:
+      return None
+    return pos
+
+  def matchups(self, teams, opponents, dates, is_home=1) -> pd.DataFrame:
+    """
+    Batched model inputs for team vs opponent on each date, the same columns (and float32
+    values) TeamFeatureStore.features_for gives for that game: the team's form, is_home,
+    rest_days, the opponent's Pythagorean win %, Log5 and both team codes
+    """
+    team_ids = team_codes(pd.Index(teams))
+    df_team = self.lookup(teams, dates)
+    df_opp = self.lookup(opponents, dates)
+
+    # Days since the last game; a known team without one gets the season-opener rest
+    query_days = pd.to_datetime(pd.Index(dates)).normalize()
+    rest = (query_days - pd.DatetimeIndex(df_team['last_game_date'])).days.to_numpy(dtype='float64', na_value=np.nan)
+    rest = np.where(np.isnan(rest) & (team_ids >= 0), 5.0, rest)
+
+    df = df_team.drop(columns=['last_game_date'])
+    df.insert(0, 'is_home', np.broadcast_to(np.asarray(is_home, dtype=FLAG_DTYPE), len(df)))
+    df['rest_days'] = rest
+    df['opp_pythag_win_pct'] = df_opp['rolling_pythag_win_pct']
+    df['log5_prob'] = log5_prob(df['rolling_pythag_win_pct'], df['opp_pythag_win_pct']).astype('float64')
+    df['team_code'] = team_ids
+    df['opponent_code'] = team_codes(pd.Index(opponents))
+    return df
+
+  def matchup(self, team: str, opponent: str, date, is_home: int = 1) -> pd.Series:
+    """
+    Model input vector for team vs opponent on a date: one row of matchups, from two binary
+    searches without building a frame
+    """
+    pos, opp_pos = self._position(team, date), self._position(opponent, date)
+    values = self.values[pos] if pos is not None else np.full(len(self.feature_cols), np.nan)
+    pythag = self.feature_cols.index('rolling_pythag_win_pct')
+    A = values[pythag]
+    B = self.values[opp_pos, pythag] if opp_pos is not None else math.nan
+
+    if pos is not None:
+      day = pd.Timestamp(date).to_datetime64().astype('datetime64[D]').astype(np.int64)
+      rest = float(day - self.days[pos])
+    else:
+      rest = 5.0 if team in self.teams else math.nan
+
+    index = ['is_home'] + self.feature_cols + ['rest_days', 'opp_pythag_win_pct', 'log5_prob', 'team_code', 'opponent_code']
+    codes = [self.teams.get_loc(t) if t in self.teams else -1 for t in (team, opponent)]
+    return pd.Series([is_home, *values, rest, B, _log5(A, B), *codes], index=index, dtype='float64')
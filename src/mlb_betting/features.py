@@ -1,83 +1,220 @@
+import numpy as np
 import pandas as pd
 
+from src.mlb_betting.config import FEATURE_SPEC, TEAMS
+
+# Teams are categorical over the fixed TEAMS dictionary (int8 codes, the same in every frame).
+# Abbreviations outside the dictionary become missing, like a missing team.
+TEAM_DTYPE = pd.CategoricalDtype(TEAMS)
+
+# Box-score metrics are small integers and the engineered features are averages or
+# probabilities, so single precision is plenty and halves the frame
+METRIC_DTYPE = 'float32'
+FLAG_DTYPE = 'int8'
+
+# Identifiers are never downcast: float32 is exact only up to 2**24 and game ids run to ~2e8
+ID_COLUMNS = ('game_id', 'game_number', 'team_code', 'opponent_code')
+
+# Long-format column <- (column on the home row, column on the away row)
+TEAM_CENTRIC_COLUMNS = {
+    'team': ('home_team_abbr', 'away_team_abbr'),
+    'opponent': ('away_team_abbr', 'home_team_abbr'),
+    'runs_scored': ('home_score', 'away_score'),
+    'runs_allowed': ('away_score', 'home_score'),
+    'hits': ('home_hits', 'away_hits'),
+    'errors': ('home_errors', 'away_errors'),
+    'moneyline_closing': ('home_moneyline', 'away_moneyline'),
+}
+
 def create_team_centric_df(df_master: pd.DataFrame) -> pd.DataFrame:
     """
     Transforms 1 Game Row (Home vs Away) into 2 Team Rows (Team vs Opponent).
     This allows us to calculate 'Recent Form' for every team easily.
+    Only the needed columns are read: each one is stacked home-then-away and the
+    result is put in (team, date) order with a single stable sort.
+    Teams come out as TEAM_DTYPE categoricals, metrics as float32. When the games have a
+    game_id, both rows of a game carry it (see calculate_advanced_features).
     """
-    # 1. Home stats
-    df_home = df_master.copy()
-    df_home = df_home.rename(columns={
-        'home_team_abbr': 'team',
-        'away_team_abbr': 'opponent',
-        'home_score': 'runs_scored',
-        'away_score': 'runs_allowed',
-        'home_hits': 'hits',
-        'home_errors': 'errors',
-        'away_hits': 'opp_hits',
-        'away_errors': 'opp_errors',
-        'home_moneyline': 'moneyline_closing',
-        'away_moneyline': 'moneyline_opp' # We keep opponent odds for reference
-    })
-    df_home['is_home'] = 1
-    df_home['result'] = (df_home['runs_scored'] > df_home['runs_allowed']).astype(int)
-
-    # 2. Away stats
-    df_away = df_master.copy()
-    df_away = df_away.rename(columns={
-        'away_team_abbr': 'team',
-        'home_team_abbr': 'opponent',
-        'away_score': 'runs_scored',
-        'home_score': 'runs_allowed',
-        'away_hits': 'hits',
-        'away_errors': 'errors',
-        'home_hits': 'opp_hits',
-        'home_errors': 'opp_errors',
-        'away_moneyline': 'moneyline_closing',
-        'home_moneyline': 'moneyline_opp'
-    })
-    df_away['is_home'] = 0
-    df_away['result'] = (df_away['runs_scored'] > df_away['runs_allowed']).astype(int)
-
-    # 3. Concatenate and sort
-    
+    n = len(df_master)
+
+    # 1. Stack the home and away side of each needed column
+    stacked = {'date': _stack(df_master['date'], df_master['date'])}
+    if 'game_id' in df_master.columns:
+        stacked['game_id'] = _stack(df_master['game_id'], df_master['game_id'])
+    for col, (home_col, away_col) in TEAM_CENTRIC_COLUMNS.items():
+        stacked[col] = _stack(df_master[home_col], df_master[away_col])
+
+    # Abbreviations outside config.TEAMS get no code: say so instead of losing the rows silently
+    team_values = pd.Series(stacked['team'], dtype=object)
+    codes = {col: team_codes(stacked[col]) for col in ['team', 'opponent']}
+    unknown = (codes['team'] < 0) & team_values.notna().to_numpy()
+    if unknown.any():
+        affected = unknown | ((codes['opponent'] < 0) & pd.notna(pd.Series(stacked['opponent'], dtype=object)).to_numpy())
+        print(f"⚠️ Unknown odds team abbreviations: {sorted(map(str, team_values[unknown].unique()))} "
+              f"({int(affected.sum())} team rows without a team or opponent code)")
+    for col in ['team', 'opponent']:
+        stacked[col] = pd.Categorical.from_codes(codes[col], dtype=TEAM_DTYPE)
+    for col in ['runs_scored', 'runs_allowed', 'hits', 'errors', 'moneyline_closing']:
+        stacked[col] = np.asarray(stacked[col], dtype=METRIC_DTYPE)
+
+    stacked['is_home'] = np.r_[np.ones(n, dtype=FLAG_DTYPE), np.zeros(n, dtype=FLAG_DTYPE)]
+    stacked['result'] = (stacked['runs_scored'] > stacked['runs_allowed']).astype(FLAG_DTYPE)
+
+    # 2. One stable sort on the team codes and dates (missing teams / dates last, like sort_values)
+    team_keys = stacked['team'].codes.astype(np.int64)
+    team_keys[team_keys < 0] = len(TEAMS)
+    dates = np.asarray(stacked['date'], dtype='datetime64[ns]')
+    date_keys = np.where(np.isnat(dates), np.iinfo(np.int64).max, dates.view(np.int64))
+    order = np.lexsort((date_keys, team_keys))
+
     cols_to_keep = [
         'date', 'team', 'opponent', 'is_home', 'result',
         'runs_scored', 'runs_allowed', 'hits', 'errors',
         'moneyline_closing'
     ]
+    if 'game_id' in stacked:
+        cols_to_keep.insert(1, 'game_id')
+    return pd.DataFrame({col: stacked[col].take(order) for col in cols_to_keep})
 
-    df_long = pd.concat([df_home[cols_to_keep], df_away[cols_to_keep]])
-
-    df_long = df_long.sort_values(['team', 'date']).reset_index(drop=True)
 
-    return df_long
+def _stack(home: pd.Series, away: pd.Series):
+    """
+    Home values followed by away values, without going through a DataFrame concat
+    """
+    if isinstance(home.dtype, np.dtype) and home.dtype == away.dtype:
+        return np.concatenate([home.to_numpy(), away.to_numpy()])
+    return pd.concat([home, away], ignore_index=True).array
 
 
 def calculate_rolling_features(df_long, window_size=10):
     """
     Calculates rolling averages for the last N games.
     """
-    df_features = df_long.copy()
+    spec = {
+        'metrics': ['runs_scored', 'runs_allowed', 'hits', 'errors'],
+        'windows': [window_size],
+        'ewm_spans': [],
+        'primary_window': window_size,
+    }
+    return calculate_form_features(df_long, spec)
+
+
+def calculate_form_features(df_long: pd.DataFrame, spec: dict = None) -> pd.DataFrame:
+    """
+    Builds every rolling window and EWMA span in the spec, for every metric, from a
+    single team-sorted pass (see config.FEATURE_SPEC). Column names:
+      rolling_{w}_{metric}, rolling_{w}_pythag_win_pct, ewm_{span}_{metric}
+    The primary window's Pythagorean win % keeps its original name, rolling_pythag_win_pct.
+    """
+    spec = FEATURE_SPEC if spec is None else spec
+    metrics = list(spec['metrics'])
+    primary = spec.get('primary_window', spec['windows'][0])
 
-    # Metrics we want to average
-    metrics = ['runs_scored', 'runs_allowed', 'hits', 'errors']
+    # 1. Sort once, shared by every window and span
+    order, position, has_team = _team_order(df_long['team'])
+    values = df_long[metrics].to_numpy(dtype='float64')[order]
 
-    for metric in metrics:
-        col_name = f'rolling_{window_size}_{metric}'
+    new_cols = {}
+    runs_idx = [metrics.index('runs_scored'), metrics.index('runs_allowed')]
 
-        df_features[col_name] = (
-            df_features.groupby('team')[metric]
-            .transform(lambda x: x.shift(1).rolling(window=window_size).mean())
-        )
+    # 2. Rolling means (and the Pythagorean expectation from the same window sums)
+    for window in spec['windows']:
+        rolling_sums = np.full(values.shape, np.nan)
+        rolling_sums[order] = _shifted_rolling_sums(values, position, window)
+        rolling_sums[~has_team] = np.nan
+
+        for i, metric in enumerate(metrics):
+            new_cols[f'rolling_{window}_{metric}'] = rolling_sums[:, i] / window
+
+        # Pythagorean Expectation
+        rolling_runs = rolling_sums[:, runs_idx[0]]
+        rolling_allowed = rolling_sums[:, runs_idx[1]]
+        pythag_col = 'rolling_pythag_win_pct' if window == primary else f'rolling_{window}_pythag_win_pct'
+        new_cols[pythag_col] = (rolling_runs ** 2) / ((rolling_runs ** 2) + (rolling_allowed ** 2) + 1e-9)
+
+    # 3. Exponentially weighted means of the previous games
+    if spec.get('ewm_spans'):
+        shifted = np.full(values.shape, np.nan)
+        shifted[1:] = values[:-1]
+        shifted[position == 0] = np.nan
+        team_block = np.cumsum(position == 0)
+        grouped = pd.DataFrame(shifted).groupby(team_block, sort=True)
+
+        for span in spec['ewm_spans']:
+            ewm = np.full(values.shape, np.nan)
+            ewm[order] = grouped.ewm(span=span).mean().to_numpy()
+            ewm[~has_team] = np.nan
+            for i, metric in enumerate(metrics):
+                new_cols[f'ewm_{span}_{metric}'] = ewm[:, i]
+
+    # 4. Computed in float64, stored compact
+    new_cols = {col: values.astype(METRIC_DTYPE) for col, values in new_cols.items()}
+    df_features = df_long.drop(columns=[c for c in new_cols if c in df_long.columns])
+    return pd.concat([df_features, pd.DataFrame(new_cols, index=df_long.index)], axis=1)
+
+
+def form_feature_columns(spec: dict = None) -> list:
+    """
+    Names of the columns calculate_form_features adds for a spec
+    """
+    spec = FEATURE_SPEC if spec is None else spec
+    primary = spec.get('primary_window', spec['windows'][0])
+    columns = []
+    for window in spec['windows']:
+        columns += [f'rolling_{window}_{metric}' for metric in spec['metrics']]
+        columns.append('rolling_pythag_win_pct' if window == primary else f'rolling_{window}_pythag_win_pct')
+    for span in spec.get('ewm_spans', []):
+        columns += [f'ewm_{span}_{metric}' for metric in spec['metrics']]
+    return columns
+
+
+def _team_order(teams: pd.Series):
+    """
+    Stable team-major ordering of the rows.
+    Returns the sort order, each sorted row's position within its team's history,
+    and a mask (original row order) of rows that have a team at all.
+    """
+    codes, _ = pd.factorize(teams)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
 
-    # Pythagorean Expectation
-    rolling_runs = df_features.groupby('team')['runs_scored'].transform(lambda x: x.shift(1).rolling(window_size).sum())
-    rolling_allowed = df_features.groupby('team')['runs_allowed'].transform(lambda x: x.shift(1).rolling(window_size).sum())
+    n = len(codes)
+    group_starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if n else np.array([], dtype=int)
+    group_sizes = np.diff(np.r_[group_starts, n])
+    position = np.arange(n) - np.repeat(group_starts, group_sizes)
 
-    df_features['rolling_pythag_win_pct'] = (rolling_runs ** 2) / ((rolling_runs ** 2) + (rolling_allowed ** 2) + 1e-9)
+    return order, position, codes >= 0
+
+
+def _shifted_rolling_sums(values: np.ndarray, position: np.ndarray, window: int) -> np.ndarray:
+    """
+    Equivalent of groupby(team).transform(lambda x: x.shift(1).rolling(window).sum()) for
+    every column of `values` at once. Rows must already be sorted team-major (see _team_order).
+
+    Uses prefix sums, so each window sum is two lookups: O(n) whatever the window or
+    history length. Missing values make the window NaN, as pandas' min_periods=window does.
+    Integer-valued metrics (runs, hits, errors) give exactly the pandas result.
+    """
+    n = len(values)
+    # Work metric-major so every cumulative sum runs over contiguous memory
+    values = np.ascontiguousarray(values.T)
+    missing = np.isnan(values)
+
+    csum = np.zeros((values.shape[0], n + 1))
+    np.cumsum(np.where(missing, 0.0, values), axis=1, out=csum[:, 1:])
+    ccount = np.zeros((values.shape[0], n + 1), dtype=np.int64)
+    np.cumsum(~missing, axis=1, out=ccount[:, 1:])
+
+    # Row i sees rows i-window .. i-1 (the shift keeps the current game out);
+    # rows with fewer than `window` games of history are masked below anyway
+    sums = csum[:, :n].copy()
+    sums[:, window:] -= csum[:, :n - window]
+    counts = ccount[:, :n].copy()
+    counts[:, window:] -= ccount[:, :n - window]
+    full = (counts == window) & (position >= window)
+
+    return np.where(full, sums, np.nan).T
 
-    return df_features
 
 def calculate_advanced_features(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -90,57 +227,123 @@ def calculate_advanced_features(df: pd.DataFrame) -> pd.DataFrame:
     # If played yesterday (May 2 - May 1) = 1 day.
     df_adv['rest_days'] = df_adv.groupby('team')['date'].diff().dt.days
     # Fill the first game of the season with huge rest (e.g., 5 days)
-    df_adv['rest_days'] = df_adv['rest_days'].fillna(5)
-
-    #Create a small lookup table
-    opponent_stats = df_adv[['date', 'team', 'rolling_pythag_win_pct']].copy()
-    opponent_stats = opponent_stats.rename(columns={
-        'team': 'opponent', # Rename so we can join on this
-        'rolling_pythag_win_pct': 'opp_pythag_win_pct'
-    })
-
-    df_adv = pd.merge(
-        df_adv,
-        opponent_stats,
-        on=['date', 'opponent'],
-        how='left'
-    )
+    df_adv['rest_days'] = df_adv['rest_days'].fillna(5).astype(METRIC_DTYPE)
+
+    # Opponent's Pythagorean win % going into the same game
+    if 'game_id' in df_adv.columns:
+        # The other row of the same game_id (exactly one per game, doubleheaders included)
+        partner = opponent_rows(df_adv['game_id'])
+        opp_pythag = df_adv['rolling_pythag_win_pct'].to_numpy()[partner]
+        opp_pythag[partner < 0] = np.nan
+        df_adv['opp_pythag_win_pct'] = opp_pythag.astype(METRIC_DTYPE)
+    else:
+        #Create a small lookup table
+        opponent_stats = df_adv[['date', 'team', 'rolling_pythag_win_pct']].copy()
+        opponent_stats = opponent_stats.rename(columns={
+            'team': 'opponent', # Rename so we can join on this
+            'rolling_pythag_win_pct': 'opp_pythag_win_pct'
+        })
+
+        df_adv = pd.merge(
+            df_adv,
+            opponent_stats,
+            on=['date', 'opponent'],
+            how='left'
+        )
 
     # Log5
-    A = df_adv['rolling_pythag_win_pct']
-    B = df_adv['opp_pythag_win_pct']
+    df_adv['log5_prob'] = log5_prob(df_adv['rolling_pythag_win_pct'], df_adv['opp_pythag_win_pct'])
+
+    return df_adv
+
+
+def opponent_rows(game_ids) -> np.ndarray:
+    """
+    Position of the other side of each row's game (-1 when the game_id does not have exactly two rows)
+    """
+    game_ids = np.asarray(game_ids)
+    n = len(game_ids)
+    order = np.argsort(game_ids, kind='stable')
+    sorted_ids = game_ids[order]
+
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]) if n else np.array([], dtype=int)
+    pairs = starts[np.diff(np.r_[starts, n]) == 2]
+
+    partner = np.full(n, -1)
+    partner[order[pairs]] = order[pairs + 1]
+    partner[order[pairs + 1]] = order[pairs]
+    return partner
+
+
+def log5_prob(A, B) -> np.ndarray:
+    """
+    Log5 win probability of A against B from their Pythagorean win %.
+    Computed in float64 and stored as float32; 0 / 0 stays NaN.
+    """
+    A = np.asarray(A, dtype='float64')
+    B = np.asarray(B, dtype='float64')
 
     # We use a safe division formula
     numerator = A * (1 - B)
     denominator = (A * (1 - B)) + (B * (1 - A))
 
-    df_adv['log5_prob'] = numerator / denominator
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (numerator / denominator).astype(METRIC_DTYPE)
 
-    return df_adv
 
-def finalize_training_data(df: pd.DataFrame) -> pd.DataFrame:
+def team_codes(teams) -> np.ndarray:
     """
-    Drops early season NaNs (pre game 10) and encodes team IDs
+    Stable int8 team codes (position in config.TEAMS, -1 if unknown), for strings or categoricals
     """
+    # Hash once, then look up only the distinct names (-1 codes pick the trailing -1)
+    if isinstance(teams, (list, tuple)):
+        teams = np.asarray(teams, dtype=object)
+    codes, uniques = pd.factorize(teams)
+    known = TEAM_DTYPE.categories.get_indexer(pd.Index(np.asarray(uniques, dtype=object)))
+    return np.append(known, -1).astype('int8')[codes]
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Casts a long / engineered frame to the pipeline dtypes: categorical teams,
+    int8 flags and float32 numbers (dates, ID_COLUMNS and anything else untouched)
+    """
+    df = df.copy()
+    dtypes = {}
+    for col in df.columns:
+        if col in ID_COLUMNS:
+            continue
+        elif col in ('team', 'opponent'):
+            df[col] = pd.Categorical.from_codes(team_codes(df[col]), dtype=TEAM_DTYPE)
+        elif col in ('is_home', 'result'):
+            dtypes[col] = FLAG_DTYPE
+        elif pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            dtypes[col] = METRIC_DTYPE
+    return df.astype(dtypes)
+
+def finalize_training_data(df: pd.DataFrame, spec: dict = None) -> pd.DataFrame:
+    """
+    Drops early season NaNs (before the primary window is full) and encodes team IDs
+    """
+    spec = FEATURE_SPEC if spec is None else spec
+    primary = spec.get('primary_window', spec['windows'][0])
+
     df_train = df.copy()
 
     # 1. Drop the early season NaNs
-    df_train = df_train.dropna(subset=['rolling_10_runs_scored', 'log5_prob'])
+    df_train = df_train.dropna(subset=[f'rolling_{primary}_runs_scored', 'log5_prob'])
     
-    # 2. Encode Team Names for ML process
-    df_train['team_code'] = df_train['team'].astype('category').cat.codes
-    df_train['opponent_code'] = df_train['opponent'].astype('category').cat.codes
+    # 2. Encode Team Names for ML process (stable codes, see config.TEAMS)
+    df_train['team_code'] = team_codes(df_train['team'])
+    df_train['opponent_code'] = team_codes(df_train['opponent'])
 
-    # 3. Final Feature Selection
+    # 3. Final Feature Selection (every form column the spec produced)
+    form_cols = [c for c in form_feature_columns(spec) if c in df_train.columns]
     features = [
         'is_home',
         'rest_days',
         'log5_prob',
-        'rolling_10_runs_scored',
-        'rolling_10_runs_allowed',
-        'rolling_10_hits',
-        'rolling_10_errors',
-        'rolling_pythag_win_pct',
+        *form_cols,
         'opp_pythag_win_pct',
         'team_code',
         'opponent_code',
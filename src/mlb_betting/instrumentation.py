@@ -0,0 +1,198 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.mlb_betting.config import METRICS_PATH, PROFILE_DIR
+
+
+class RunMetrics:
+  """
+  Structured per-stage metrics for one pipeline run:
+    wall_s / cpu_s           perf_counter / process_time around the stage
+    peak_rss_mb              process RSS high-water mark at the end of the stage
+    rss_growth_mb            how much the stage raised that high-water mark
+    tracemalloc_peak_mb      peak traced allocation inside the stage (trace_memory=True only:
+                             tracing slows allocation-heavy code, so it is opt-in)
+    rows_in / rows_out       and anything the caller adds to the record (cached, draws_per_s, ...)
+  profile_stage attaches cProfile to that one stage and writes the .prof file to profile_dir.
+  write() appends the run as one JSON line, so runs can be compared (see compare_runs / main).
+  """
+  def __init__(self, run_name: str = "pipeline", trace_memory: bool = False, profile_stage: str = None,
+               profile_dir: str = None):
+    self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    self.run_name = run_name
+    self.trace_memory = trace_memory
+    self.profile_stage = profile_stage
+    self.profile_dir = str(PROFILE_DIR if profile_dir is None else profile_dir)
+    self.started = time.time()
+    self.stages = []
+
+  @contextmanager
+  def stage(self, name: str, rows_in: int = None, **fields):
+    """
+    Measures the enclosed block. Yields the stage's record, so the block can add rows_out etc.
+    """
+    record = {'stage': name, 'rows_in': rows_in, 'rows_out': None, **fields}
+    profiler = cProfile.Profile() if name == self.profile_stage else None
+    tracing = self.trace_memory and not tracemalloc.is_tracing()
+    if tracing:
+      tracemalloc.start()
+    if self.trace_memory:
+      tracemalloc.reset_peak()
+
+    rss_before = _max_rss_mb()
+    wall, cpu = time.perf_counter(), time.process_time()
+    if profiler:
+      profiler.enable()
+    try:
+      yield record
+    finally:
+      if profiler:
+        profiler.disable()
+      record['wall_s'] = time.perf_counter() - wall
+      record['cpu_s'] = time.process_time() - cpu
+      record['peak_rss_mb'] = _max_rss_mb()
+      record['rss_growth_mb'] = record['peak_rss_mb'] - rss_before
+      if self.trace_memory:
+        record['tracemalloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+      if tracing:
+        tracemalloc.stop()
+      if profiler:
+        record['profile'] = self._dump_profile(name, profiler)
+      self.stages.append(record)
+
+  def track(self, name: str, func, *args, rows_in: int = None, **kwargs):
+    """
+    Runs func(*args, **kwargs) as a stage; rows_out is the length of what it returns
+    """
+    with self.stage(name, rows_in=rows_in) as record:
+      result = func(*args, **kwargs)
+      record['rows_out'] = _rows(result)
+    return result
+
+  def summary(self) -> dict:
+    return {
+      'run_id': self.run_id,
+      'run_name': self.run_name,
+      'started': pd.Timestamp(self.started, unit='s').isoformat(),
+      'python': sys.version.split()[0],
+      'total_wall_s': sum(s['wall_s'] for s in self.stages),
+      'stages': self.stages,
+    }
+
+  def write(self, path: str = None) -> str:
+    """
+    Appends this run to a JSON-lines metrics file (one run per line)
+    """
+    path = str(METRICS_PATH if path is None else path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as f:
+      f.write(json.dumps(self.summary(), default=_json_default) + "\n")
+    return path
+
+  def report(self) -> str:
+    """
+    Human-readable table of this run's stages
+    """
+    return _stage_table(pd.DataFrame(self.stages)).to_string(index=False)
+
+  def _dump_profile(self, name: str, profiler: cProfile.Profile) -> str:
+    os.makedirs(self.profile_dir, exist_ok=True)
+    path = os.path.join(self.profile_dir, f"{self.run_id}_{name}.prof")
+    profiler.dump_stats(path)
+    print(f"cProfile of stage '{name}' written to {path} (python -m pstats {path})")
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+    return path
+
+
+def load_runs(path: str = None) -> list:
+    path = str(METRICS_PATH if path is None else path)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare_runs(runs: list, metric: str = 'wall_s') -> pd.DataFrame:
+    """
+    Stage x run table of one metric, with the latest run's change against the one before it
+    """
+    frames = []
+    for run in runs:
+        stages = pd.DataFrame(run['stages'])
+        if stages.empty:
+            continue
+        # A stage that runs more than once in a run (e.g. two simulations) is summed
+        frames.append(stages.groupby('stage', sort=False)[metric].sum().rename(run['run_id']))
+    if not frames:
+        return pd.DataFrame()
+
+    table = pd.concat(frames, axis=1)
+    if table.shape[1] >= 2:
+        previous, latest = table.iloc[:, -2], table.iloc[:, -1]
+        table['change_%'] = (latest - previous) / previous.where(previous > 0) * 100
+    return table
+
+
+def _stage_table(stages: pd.DataFrame) -> pd.DataFrame:
+    columns = ['stage', 'wall_s', 'cpu_s', 'peak_rss_mb', 'tracemalloc_peak_mb', 'rows_in', 'rows_out', 'cached', 'draws_per_s']
+    return stages[[c for c in columns if c in stages.columns]].round(3)
+
+
+def _rows(value):
+    # Frames, series and arrays only: a dict of results has no rows
+    shape = getattr(value, 'shape', None)
+    return int(shape[0]) if shape else None
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare stage metrics across pipeline runs")
+    parser.add_argument('--metrics', default=None, help=f"Metrics file (default {METRICS_PATH})")
+    parser.add_argument('--runs', type=int, default=5, help="How many recent runs to show")
+    parser.add_argument('--metric', default='wall_s', help="wall_s, cpu_s, peak_rss_mb, tracemalloc_peak_mb, ...")
+    parser.add_argument('--threshold', type=float, default=20, help="Flag stages that got this many %% worse")
+    parser.add_argument('--min-delta', type=float, default=0.1, help="... and at least this much worse in absolute terms")
+    args = parser.parse_args()
+
+    runs = load_runs(args.metrics)[-args.runs:]
+    if not runs:
+        print(f"No runs recorded in {args.metrics or METRICS_PATH}")
+        return
+
+    print(f"Last run {runs[-1]['run_id']}:")
+    print(_stage_table(pd.DataFrame(runs[-1]['stages'])).to_string(index=False))
+
+    table = compare_runs(runs, args.metric)
+    print(f"\n{args.metric} by run:")
+    print(table.round(3).to_string())
+    if 'change_%' in table:
+        delta = table.iloc[:, -2] - table.iloc[:, -3]
+        regressions = table[(table['change_%'] > args.threshold) & (delta > args.min_delta)]
+        for stage, row in regressions.iterrows():
+            print(f"⚠️ {stage}: {args.metric} {row['change_%']:+.0f}% against the previous run")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,132 +1,615 @@
-import pymc as pm
-import arviz as az
+import json
+import os
+import shutil
+import time
+
 import numpy as np
 import pandas as pd
-import os
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import make_pipeline
-from sklearn.impute import SimpleImputer
+
+from src.mlb_betting.betting import simulate_betting  # noqa: F401  (moved; kept importable from here)
+from src.mlb_betting.config import TEAMS
+
+# pymc / arviz / scikit-learn are only needed to train (or to read a bare NetCDF trace);
+# they are imported where used so scoring processes start without them.
+
+ARTIFACT_VERSION = 1
+
+TRAINING_BACKENDS = ('nuts', 'advi', 'fullrank_advi', 'laplace')
+
+# Default draw budget of adaptive NUTS (total over chains): it stops early on easy seasons,
+# so it can afford more than the fixed budget on hard ones
+ADAPTIVE_MAX_DRAWS = 8000
+
+# Default NUTS chains: one per core up to this many. More chains only split the draw budget
+# into shorter chains, each paying the full tuning cost, with less reliable R-hat / ESS
+MAX_DEFAULT_CHAINS = 4
+
+# Adaptive sampling stops once every alpha / betas coordinate meets all of these
+CONVERGENCE_TARGETS = {'rhat': 1.01, 'ess_bulk': 400, 'ess_tail': 400}
+
 
 class BayesianBettingModel:
   def __init__(self, model_path: str = "data/models/bayesian_model_v1.nc"):
     self.model_path = model_path
     self.trace = None
 
-    self.scaler = StandardScaler()
-    self.imputer = SimpleImputer(strategy='mean')
+    # Everything scoring needs, filled by train() or load()
+    self.feature_cols = None
+    self.preprocessing = None
+    self.draws = None
+    self.training = None
   
-  def train(self, df_train: pd.DataFrame, feature_cols: list, target_col: str = 'result'):
+  @property
+  def artifact_dir(self) -> str:
+    """
+    Scoring artifact next to the trace: data/models/bayesian_v1.nc -> data/models/bayesian_v1/
+    """
+    return os.path.splitext(self.model_path)[0]
+
+  def train(self, df_train: pd.DataFrame, feature_cols: list, target_col: str = 'result',
+            backend: str = 'nuts', draws: int = None, tune: int = None, chains: int = None,
+            cores: int = None, vi_iterations: int = 30000, random_seed: int = None,
+            adaptive: bool = False, block_size: int = 250, targets: dict = None):
     """
-    Trains the Bayesian model using PyMC and saves to disc
+    Trains the Bayesian model and saves to disc (the full trace as NetCDF, plus the scoring artifact, see save())
+    backend:
+      'nuts'           full MCMC, one chain per core (at least 2, at most MAX_DEFAULT_CHAINS unless
+                       chains is given); `draws` is the total over all chains (default 2000).
+                       adaptive=True samples in blocks of block_size draws per chain, the chains in parallel,
+                       and stops as soon as R-hat / ESS meet `targets` (see CONVERGENCE_TARGETS), with `draws`
+                       as the budget (default ADAPTIVE_MAX_DRAWS). Only NUTS has an adaptive mode.
+                       tune defaults to 1000 per chain, 500 in adaptive mode
+      'advi'           mean-field variational inference
+      'fullrank_advi'  full-rank variational inference (keeps the correlations between coefficients)
+      'laplace'        Gaussian at the posterior mode (Newton's method in numpy), for quick iteration
+    Every backend ends in the same (chain, draw) posterior of alpha / betas that predict() uses.
     """
+    import arviz as az
+
+    if backend not in TRAINING_BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {TRAINING_BACKENDS}")
+    if adaptive and backend != 'nuts':
+        raise ValueError(f"adaptive=True needs the 'nuts' backend, got {backend!r}")
+    if draws is None:
+        draws = ADAPTIVE_MAX_DRAWS if adaptive else 2000
 
     #1. Prepare Data
     X = df_train[feature_cols].values
     y = df_train[target_col].values
     
     # 2. Imputing and scaling
-    X_imputed = self.imputer.fit_transform(X)
-    X_scaled = self.scaler.fit_transform(X_imputed)
+    self.feature_cols = list(feature_cols)
+    self.fit_preprocessing(X)
+    X_scaled = self.transform(X)
 
-    # 2. Define the Model variables
-    with pm.Model() as bayesian_model:
-        alpha = pm.Normal("alpha", mu=0, sigma=1)
-        betas = pm.Normal("betas", mu=0, sigma=1, shape=X_scaled.shape[1])
+    # 3. Fit the posterior
+    start = time.perf_counter()
+    print(f"Fitting with {backend} (please wait...)")
+    if backend == 'laplace':
+        alpha, betas = laplace_draws(X_scaled, y, draws, random_seed)
+        self.trace = az.from_dict(posterior={'alpha': alpha[None], 'betas': betas[None]})
+    else:
+        import pymc as pm
 
-        mu = alpha + pm.math.dot(X_scaled, betas)
-        theta = pm.math.sigmoid(mu)
-    
-        y_obs = pm.Bernoulli("y_obs", p=theta, observed=y)
+        with logistic_model(X_scaled, y):
+            if tune is None:
+                tune = 500 if adaptive else 1000
+            if backend == 'nuts' and adaptive:
+                self.trace, diagnostics = adaptive_nuts(
+                    chains=chains or MAX_DEFAULT_CHAINS, tune=tune, block_size=block_size, max_draws=draws,
+                    targets=targets, random_seed=random_seed, cores=cores
+                )
+            elif backend == 'nuts':
+                cores = cores or os.cpu_count() or 1
+                chains = chains or min(max(2, cores), MAX_DEFAULT_CHAINS)
+                self.trace = pm.sample(
+                    -(-draws // chains), tune=tune, chains=chains, cores=min(cores, chains),
+                    random_seed=random_seed, return_inferencedata=True, progressbar=False
+                )
+            else:
+                approx = pm.fit(
+                    n=vi_iterations, method=backend, random_seed=random_seed, progressbar=False,
+                    callbacks=[pm.callbacks.CheckParametersConvergence(diff='absolute', tolerance=1e-3)]
+                )
+                self.trace = approx.sample(draws, random_seed=random_seed, return_inferencedata=True)
 
-        print(f"Sampling (please wait...)")
-        self.trace = pm.sample(1000, tune=1000, chains=2, return_inferencedata=True)
+    self.training = {'backend': backend, 'wall_time_s': time.perf_counter() - start}
+    if 'date' in df_train:
+        self.training['last_date'] = _last_date(df_train)
+    if backend == 'nuts':
+        self.training['diagnostics'] = diagnostics if adaptive else convergence_summary(self.trace)
+        self.training['draws'] = int(self.trace.posterior.sizes['chain'] * self.trace.posterior.sizes['draw'])
+    print(f"Fitted in {self.training['wall_time_s']:.1f}s")
 
+    self.draws = None
     os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
     az.to_netcdf(self.trace, self.model_path)
     print(f"Model saved to {self.model_path}")
+    self.save()
+
+  def fit_preprocessing(self, X: np.ndarray):
+    """
+    Fits mean imputation + standard scaling (scikit-learn) and keeps only their parameters
+    """
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler
+
+    imputer = SimpleImputer(strategy='mean', keep_empty_features=True)
+    scaler = StandardScaler().fit(imputer.fit_transform(X))
+    self.preprocessing = {
+        'fill': imputer.statistics_.astype(float).tolist(),
+        'mean': scaler.mean_.tolist(),
+        'scale': scaler.scale_.tolist(),
+    }
+
+  def transform(self, X: np.ndarray) -> np.ndarray:
+    """
+    Same result as imputer.transform -> scaler.transform, in plain numpy
+    """
+    if self.preprocessing is None:
+        raise ValueError("Preprocessing is not fitted: train() or load() the model first")
+    X = np.array(X, dtype=float)
+    missing = np.isnan(X)
+    X[missing] = np.take(self.preprocessing['fill'], np.nonzero(missing)[1])
+    return (X - np.asarray(self.preprocessing['mean'])) / np.asarray(self.preprocessing['scale'])
+
+  def save(self, artifact_dir: str = None) -> str:
+    """
+    Writes the scoring artifact: draws.npy (one row per posterior draw: alpha, then betas)
+    and meta.json (feature columns, preprocessing parameters, team code dictionary).
+    Both go into a scratch directory that is renamed into place, so a process that has the old
+    artifact loaded (draws memory-mapped) keeps reading intact files and a new load() never
+    pairs new draws with old meta.
+    """
+    artifact_dir = (artifact_dir or self.artifact_dir).rstrip(os.sep)
+    alpha, betas = self.posterior_draws()
+    scratch = f"{artifact_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(scratch, ignore_errors=True)
+    os.makedirs(scratch)
+
+    np.save(os.path.join(scratch, "draws.npy"), np.column_stack([alpha, betas]))
+    meta = {
+        'version': ARTIFACT_VERSION,
+        'feature_cols': self.feature_cols,
+        'preprocessing': self.preprocessing,
+        'teams': TEAMS,
+        'n_draws': int(len(alpha)),
+        'training': self.training,
+    }
+    with open(os.path.join(scratch, "meta.json"), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    # A directory can only be renamed over an empty one: move the old artifact aside first.
+    # Mapped files of the old artifact stay valid after it is deleted.
+    previous = f"{artifact_dir}.old-{os.getpid()}"
+    if os.path.exists(artifact_dir):
+        os.replace(artifact_dir, previous)
+    os.replace(scratch, artifact_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+
+    print(f"Scoring artifact saved to {artifact_dir}")
+    return artifact_dir
+
+  @classmethod
+  def load(cls, artifact_dir: str) -> "BayesianBettingModel":
+    """
+    Cold start from a scoring artifact: reads meta.json and memory-maps the draws,
+    no NetCDF, PyMC or scikit-learn involved
+    """
+    with open(os.path.join(artifact_dir, "meta.json"), 'r') as f:
+        meta = json.load(f)
+    if meta['version'] != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported artifact version {meta['version']} in {artifact_dir}")
+    if meta['teams'] != TEAMS:
+        raise ValueError(f"Team codes in {artifact_dir} do not match config.TEAMS; retrain the model")
 
-  def predict(self, df_new: pd.DataFrame, feature_cols: list) -> np.array:
+    model = cls(model_path=artifact_dir.rstrip(os.sep) + ".nc")
+    model.feature_cols = meta['feature_cols']
+    model.preprocessing = meta['preprocessing']
+    model.training = meta.get('training')
+    model.draws = np.load(os.path.join(artifact_dir, "draws.npy"), mmap_mode='r')
+    return model
+
+  def predict(self, df_new: pd.DataFrame, feature_cols: list = None, credible_interval: float = None, chunk_size: int = 1024):
     """
     Loads the model and generates probability predictions for new data.
+    Closed form over the posterior: mean of sigmoid(alpha + X @ betas) across every draw,
+    no posterior predictive sampling. With credible_interval (e.g. 0.9) returns a
+    DataFrame with the mean and the equal-tailed interval of the win probability.
     """
-    # Load Model if needed
-    if self.trace is None:
-        if not os.path.exists(self.model_path):
-            raise FileNotFoundError(f"Model not found at {self.model_path}")
-        print(f"Loading model from {self.model_path}...")
-        self.trace = az.from_netcdf(self.model_path)
+    self._ensure_loaded()
 
-    X = df_new[feature_cols].values
-    
-    X_imputed = self.imputer.transform(X)
-    X_scaled = self.scaler.transform(X_imputed)
+    feature_cols = self.feature_cols if feature_cols is None else list(feature_cols)
+    if self.feature_cols is not None and feature_cols != self.feature_cols:
+        raise ValueError(f"Model was trained on {self.feature_cols}, got {feature_cols}")
+
+    X_scaled = self.transform(df_new[feature_cols].values)
 
     print("Generating Probabilities...")
+    alpha, betas = self.posterior_draws()
+
+    quantiles = None
+    if credible_interval is not None:
+        tail = (1 - credible_interval) / 2
+        quantiles = [tail, 1 - tail]
+
+    probs = posterior_probabilities(X_scaled, alpha, betas, quantiles=quantiles, chunk_size=chunk_size)
+    if quantiles is not None:
+        probs.columns = ['prob_mean', 'prob_lower', 'prob_upper']
+    return probs
+
+  def update(self, df_new: pd.DataFrame, target_col: str = 'result', backend: str = 'laplace',
+             draws: int = None, tune: int = 500, chains: int = 2, random_seed: int = None):
+    """
+    Online update for daily retraining: the current posterior, summarized as a multivariate
+    normal over (alpha, betas), becomes the prior and only the new games are conditioned on.
+    Preprocessing stays as trained, so the coefficients keep their meaning across updates.
+    backend: 'laplace' (Newton's method, milliseconds) or 'nuts' (MCMC under the MvNormal prior).
+    Saves the trace and the artifact like train(); every update is logged under training['updates'].
+    Rows dated on or before the last day already trained / updated on (training['last_date']) are
+    skipped, so re-running a day does not count its games twice.
+    """
+    import arviz as az
+
+    self._ensure_loaded()
+
+    last_date = (self.training or {}).get('last_date')
+    if last_date is not None and 'date' in df_new:
+        fresh = (pd.to_datetime(df_new['date']) > pd.Timestamp(last_date)).to_numpy()
+        if not fresh.all():
+            print(f"Skipping {int((~fresh).sum())} rows on or before {last_date} (already applied)")
+            df_new = df_new[fresh]
+        if df_new.empty:
+            return
+
+    # 1. Current posterior -> Gaussian prior
+    alpha, betas = self.posterior_draws()
+    coefs = np.column_stack([alpha, betas])
+    prior_mean = coefs.mean(axis=0)
+    prior_cov = np.cov(coefs, rowvar=False) + 1e-9 * np.eye(coefs.shape[1])
+    draws = draws or len(alpha)
+
+    X = self.transform(df_new[self.feature_cols].values)
+    y = df_new[target_col].values
+
+    # 2. Condition on the new games only
+    start = time.perf_counter()
+    if backend == 'laplace':
+        alpha, betas = laplace_draws(X, y, draws, random_seed, prior_mean=prior_mean, prior_cov=prior_cov)
+        self.trace = az.from_dict(posterior={'alpha': alpha[None], 'betas': betas[None]})
+    elif backend == 'nuts':
+        import pymc as pm
+
+        with logistic_model(X, y, prior_mean=prior_mean, prior_cov=prior_cov):
+            self.trace = pm.sample(
+                -(-draws // chains), tune=tune, chains=chains, cores=1,
+                random_seed=random_seed, return_inferencedata=True, progressbar=False
+            )
+    else:
+        raise ValueError(f"Unknown update backend {backend!r}, expected 'laplace' or 'nuts'")
+
+    elapsed = time.perf_counter() - start
+    print(f"Updated on {len(df_new)} rows with {backend} in {elapsed:.2f}s")
+
+    training = dict(self.training or {})
+    training['updates'] = training.get('updates', []) + [{'backend': backend, 'rows': int(len(df_new)), 'wall_time_s': elapsed}]
+    if 'date' in df_new:
+        training['last_date'] = training['updates'][-1]['last_date'] = _last_date(df_new)
+    self.training = training
+
+    self.draws = None
+    os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
+    az.to_netcdf(self.trace, self.model_path)
+    self.save()
+
+  def _ensure_loaded(self):
+    """
+    Loads the artifact if neither a trace nor draws are in memory (the NetCDF trace alone has no preprocessing)
+    """
+    if self.trace is None and self.draws is None:
+        if not os.path.exists(os.path.join(self.artifact_dir, "meta.json")):
+            raise FileNotFoundError(f"Model not found at {self.artifact_dir}")
+        print(f"Loading model from {self.artifact_dir}...")
+        loaded = self.load(self.artifact_dir)
+        self.feature_cols, self.preprocessing, self.draws = loaded.feature_cols, loaded.preprocessing, loaded.draws
+        self.training = loaded.training
+
+  def posterior_draws(self):
+    """
+    Posterior draws with chains stacked: alpha (n_draws,), betas (n_draws, n_features)
+    """
+    if self.draws is not None:
+        return self.draws[:, 0], self.draws[:, 1:]
+    posterior = self.trace.posterior
+    alpha = posterior["alpha"].values.reshape(-1)
+    betas = posterior["betas"].values.reshape(alpha.shape[0], -1)
+    return alpha, betas
+
+
+def _last_date(df: pd.DataFrame) -> str:
+    return pd.to_datetime(df['date']).max().date().isoformat()
 
-    with pm.Model() as model:
-        alpha = pm.Normal("alpha", mu=0, sigma=1)
-        betas = pm.Normal("betas", mu=0, sigma=1, shape=X_scaled.shape[1])
 
-        mu = alpha + pm.math.dot(X_scaled, betas)
+def logistic_model(X: np.ndarray, y: np.ndarray, prior_mean: np.ndarray = None, prior_cov: np.ndarray = None):
+    """
+    The PyMC model: y ~ Bernoulli(sigmoid(alpha + X @ betas)), standard normal priors.
+    With prior_mean / prior_cov, (alpha, betas) get that joint MvNormal prior instead (online updates).
+    Use as a context manager.
+    """
+    import pymc as pm
+
+    with pm.Model() as bayesian_model:
+        if prior_mean is None:
+            alpha = pm.Normal("alpha", mu=0, sigma=1)
+            betas = pm.Normal("betas", mu=0, sigma=1, shape=X.shape[1])
+        else:
+            coefs = pm.MvNormal("coefs", mu=prior_mean, cov=prior_cov)
+            alpha = pm.Deterministic("alpha", coefs[0])
+            betas = pm.Deterministic("betas", coefs[1:])
+
+        mu = alpha + pm.math.dot(X, betas)
         theta = pm.math.sigmoid(mu)
     
-        y_obs = pm.Bernoulli("y_obs", p=theta, shape=len(X_scaled))
+        y_obs = pm.Bernoulli("y_obs", p=theta, observed=y)
 
-        ppc = pm.sample_posterior_predictive(self.trace, var_names=["y_obs"], extend_inferencedata=True)
-            
-    # Extract Mean Probability
-    post_pred = self.trace.posterior_predictive["y_obs"]
-    mean_probs = post_pred.mean(dim=["chain", "draw"]).values
-        
-    return mean_probs
+    return bayesian_model
 
-def simulate_betting(df, threshold=0.05, stake=100):
+
+def adaptive_nuts(chains: int = 4, tune: int = 1000, block_size: int = 250, max_draws: int = ADAPTIVE_MAX_DRAWS,
+                  targets: dict = None, random_seed: int = None, cores: int = None, model=None):
     """
-    Simulates betting $100 whenever our model sees an edge > 5%.
+    NUTS in blocks: after tuning, every chain draws block_size more samples, then R-hat and
+    bulk / tail ESS of alpha and betas are checked; sampling stops when the targets are met
+    or max_draws (total over chains) is reached.
+    Chains run in parallel on up to `cores` worker processes (forked, like pm.sample on Linux),
+    each keeping its chains' position, rng and tuned step size / mass matrix between blocks;
+    with one core (or no fork) they run in this process.
+    Call inside the model context. Returns the trace and the diagnostics of every block.
     """
-    sim = df.copy()
+    import multiprocessing
+    import pymc as pm
+
+    targets = {**CONVERGENCE_TARGETS, **(targets or {})}
+    model = pm.modelcontext(model)
+    rng = np.random.default_rng(random_seed)
+
+    # 1. One compiled NUTS step method; each chain gets its own rng, jittered start and sampling state
+    step = pm.NUTS(model=model)
+    initial = model.initial_point()
+    fresh_state = step.sampling_state
+    nuts_chains = [
+      _NutsChain(step, fresh_state, {k: v + rng.uniform(-1, 1, np.shape(v)) for k, v in initial.items()}, seed)
+      for seed in rng.integers(2**32, size=chains)
+    ]
+
+    n_workers = min(cores or os.cpu_count() or 1, chains)
+    if n_workers > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        n_workers = 1
 
-    # 1. Calculate probability from odds
-    def us_odds_to_prob(odds):
-        if pd.isna(odds): return np.nan
-        if odds > 0:
-            return 100 / (odds + 100)
+    start = time.perf_counter()
+    samples = [{'alpha': [], 'betas': [], 'diverging': []} for _ in range(chains)]
+    blocks = []
+    workers = []
+    try:
+        # 2. Tuning: chain c lives in worker c % n_workers for the whole run
+        if n_workers > 1:
+            context = multiprocessing.get_context('fork')
+            for w in range(n_workers):
+                conn, child_conn = context.Pipe()
+                process = context.Process(target=_nuts_worker, args=(child_conn, nuts_chains[w::n_workers], tune), daemon=True)
+                process.start()
+                workers.append((conn, process))
+            for conn, _ in workers:
+                _receive(conn)
         else:
-            return (-odds) / (-odds + 100)
+            for chain in nuts_chains:
+                chain.tune(tune)
 
-    sim['vegas_prob'] = sim['moneyline_closing'].apply(us_odds_to_prob)
+        # 3. Blocks of draws until converged or out of budget
+        max_per_chain = max(block_size, max_draws // chains)
+        n_draws = 0
+        while n_draws < max_per_chain:
+            n_block = min(block_size, max_per_chain - n_draws)
+            if workers:
+                for conn, _ in workers:
+                    conn.send(n_block)
+                drawn = [None] * chains
+                for w, (conn, _) in enumerate(workers):
+                    drawn[w::n_workers] = _receive(conn)
+            else:
+                drawn = [chain.draw(n_block) for chain in nuts_chains]
+            for chain_samples, block in zip(samples, drawn):
+                for name, values in block.items():
+                    chain_samples[name].extend(values)
+            n_draws += n_block
 
-    # 2. Find the edge
-    sim['edge'] = sim['my_prob'] - sim['vegas_prob']
+            trace = _samples_to_trace(samples)
+            summary = convergence_summary(trace)
+            # elapsed_s includes tuning
+            summary.update({'draws_per_chain': n_draws, 'elapsed_s': time.perf_counter() - start})
+            blocks.append(summary)
+            print(f"  {n_draws} draws/chain: max R-hat {summary['max_rhat']:.4f}, "
+                  f"min ESS bulk {summary['min_ess_bulk']:.0f} / tail {summary['min_ess_tail']:.0f}")
 
-    # 3. Place bets
-    sim['bet_placed'] = sim['edge'] > threshold
+            converged = (summary['max_rhat'] <= targets['rhat'] and summary['min_ess_bulk'] >= targets['ess_bulk']
+                         and summary['min_ess_tail'] >= targets['ess_tail'])
+            if converged:
+                break
+    finally:
+        for conn, process in workers:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
 
-    #4. Calculate profit and loss
-    def calculate_pnl(row):
-        if not row['bet_placed']: return 0
+    diagnostics = {**blocks[-1], 'converged': converged, 'chains': chains, 'tune': tune, 'targets': targets,
+                   'workers': n_workers, 'blocks': blocks}
+    return trace, diagnostics
 
-        # Convert US odds to Decimal multiplier for payout
-        if row['moneyline_closing'] > 0:
-            decimal_odds = 1 + (row['moneyline_closing'] / 100)
-        else:
-            decimal_odds = 1 + (100 / -row['moneyline_closing'])
 
-        if row['result'] == 1:
-            return stake * (decimal_odds - 1)
-        else:
-            return -stake
- 
-      
-    sim['pnl'] = sim.apply(calculate_pnl, axis=1)
-    
-    total_bets = sim['bet_placed'].sum()
-    total_profit = sim['pnl'].sum()
-    roi = (total_profit / (total_bets * stake)) * 100 if total_bets > 0 else 0
-    
+class _NutsChain:
+  """
+  One adaptive_nuts chain: position, rng and sampling state (step size, mass matrix) on a shared step method
+  """
+  def __init__(self, step, state, point: dict, seed: int):
+    self.step = step
+    self.state = state
+    self.point = point
+    self.rng = np.random.default_rng(seed)
+
+  def tune(self, n_steps: int):
+    step = self._activate()
+    step.tune = True
+    step.reset_tuning()
+    for _ in range(n_steps):
+      self.point, _ = step.step(self.point)
+    step.stop_tuning()
+    self.state = step.sampling_state
+
+  def draw(self, n_draws: int) -> dict:
+    step = self._activate()
+    block = {'alpha': [], 'betas': [], 'diverging': []}
+    for _ in range(n_draws):
+      self.point, stats = step.step(self.point)
+      block['alpha'].append(self.point['alpha'])
+      block['betas'].append(self.point['betas'])
+      block['diverging'].append(stats[0]['diverging'])
+    self.state = self.step.sampling_state
+    return block
+
+  def _activate(self):
+    self.step.sampling_state = self.state
+    self.step.set_rng(self.rng)
+    return self.step
+
+
+def _nuts_worker(conn, chains: list, tune: int):
+    """
+    Worker process of adaptive_nuts: tunes its chains, then draws one block per request until it gets None
+    """
+    try:
+        for chain in chains:
+            chain.tune(tune)
+        conn.send('tuned')
+        while True:
+            n_draws = conn.recv()
+            if n_draws is None:
+                break
+            conn.send([chain.draw(n_draws) for chain in chains])
+    except Exception as e:
+        conn.send(e)
+    finally:
+        conn.close()
+
+
+def _receive(conn):
+    message = conn.recv()
+    if isinstance(message, Exception):
+        raise RuntimeError("adaptive NUTS worker failed") from message
+    return message
+
+
+def _samples_to_trace(samples: list):
+    import arviz as az
+
+    return az.from_dict(
+        posterior={
+            'alpha': np.array([chain['alpha'] for chain in samples]),
+            'betas': np.array([chain['betas'] for chain in samples]),
+        },
+        sample_stats={'diverging': np.array([chain['diverging'] for chain in samples])},
+    )
+
+
+def convergence_summary(trace) -> dict:
+    """
+    Worst R-hat and smallest bulk / tail ESS over every alpha / betas coordinate, plus divergences
+    """
+    import arviz as az
+
+    var_names = ['alpha', 'betas']
+    rhat = az.rhat(trace, var_names=var_names)
+    ess_bulk = az.ess(trace, var_names=var_names, method='bulk')
+    ess_tail = az.ess(trace, var_names=var_names, method='tail')
+
+    def worst(dataset, reduce):
+        return float(reduce([reduce(dataset[v].values) for v in var_names]))
+
+    diverging = trace.sample_stats['diverging'].values if 'sample_stats' in trace.groups() else np.zeros(1)
     return {
-    "total_bets": int(total_bets),
-    "total_profit": float(total_profit),
-    "roi": float(roi)
+        'max_rhat': worst(rhat, np.max),
+        'min_ess_bulk': worst(ess_bulk, np.min),
+        'min_ess_tail': worst(ess_tail, np.min),
+        'divergences': int(diverging.sum()),
     }
-    
+
+
+def laplace_draws(X: np.ndarray, y: np.ndarray, n_draws: int, random_seed: int = None, tol: float = 1e-10, max_iter: int = 100,
+                  prior_mean: np.ndarray = None, prior_cov: np.ndarray = None):
+    """
+    Laplace approximation of logistic_model: Newton's method to the posterior mode, then
+    draws from N(mode, inverse Hessian). The log posterior is concave, so this always converges.
+    The prior is N(0, I) unless prior_mean / prior_cov are given.
+    Returns alpha (n_draws,) and betas (n_draws, n_features).
+    """
+    Z = np.column_stack([np.ones(len(X)), X])
+    y = np.asarray(y, dtype=float)
+    k = Z.shape[1]
+    prior_mean = np.zeros(k) if prior_mean is None else np.asarray(prior_mean, dtype=float)
+    prior_precision = np.eye(k) if prior_cov is None else np.linalg.inv(prior_cov)
+    w = prior_mean.copy()
+
+    for _ in range(max_iter):
+        p = 1 / (1 + np.exp(-(Z @ w)))
+        gradient = Z.T @ (y - p) - prior_precision @ (w - prior_mean)
+        hessian = (Z * (p * (1 - p))[:, None]).T @ Z + prior_precision
+        step = np.linalg.solve(hessian, gradient)
+        w += step
+        if np.abs(step).max() < tol:
+            break
+
+    p = 1 / (1 + np.exp(-(Z @ w)))
+    hessian = (Z * (p * (1 - p))[:, None]).T @ Z + prior_precision
+    cov = np.linalg.inv(hessian)
+
+    # Moment-matched draws: their mean / covariance are exactly the mode / inverse Hessian,
+    # so chained online updates (which refit a Gaussian to the draws) add no Monte Carlo drift
+    rng = np.random.default_rng(random_seed)
+    z = rng.standard_normal((n_draws, k))
+    z -= z.mean(axis=0)
+    z = np.linalg.solve(np.linalg.cholesky(np.cov(z, rowvar=False)), z.T).T
+    samples = w + z @ np.linalg.cholesky(cov).T
+    return samples[:, 0], samples[:, 1:]
+
+
+def posterior_probabilities(X: np.ndarray, alpha: np.ndarray, betas: np.ndarray, quantiles: list = None, chunk_size: int = 1024):
+    """
+    Win probability of every row under every posterior draw, averaged over the draws.
+    Rows are scored chunk_size at a time, so memory stays at chunk_size x n_draws
+    whatever the number of games. With quantiles, returns a DataFrame with
+    prob_mean and one prob_q{q} column per quantile.
+    """
+    n = len(X)
+    mean = np.empty(n)
+    bounds = np.empty((len(quantiles), n)) if quantiles else None
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        # (rows, draws) linear predictor in one matrix product
+        mu = X[start:stop] @ betas.T + alpha
+        with np.errstate(over='ignore'):
+            theta = 1 / (1 + np.exp(-mu))
+        mean[start:stop] = theta.mean(axis=1)
+        if quantiles:
+            bounds[:, start:stop] = np.quantile(theta, quantiles, axis=1)
+
+    if not quantiles:
+        return mean
+
+    df = pd.DataFrame({'prob_mean': mean})
+    for q, values in zip(quantiles, bounds):
+        df[f'prob_q{q:g}'] = values
+    return df
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+def american_to_prob(odds):
+    """
+    Implied probability of US moneyline odds (vectorized, NaN stays NaN).
+    +150 -> 100 / 250 = 0.40, -150 -> 150 / 250 = 0.60
+    """
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(odds > 0, 100 / (odds + 100), (-odds) / (-odds + 100))
+
+
+def american_to_decimal(odds):
+    """
+    Decimal payout multiplier (stake included) of US moneyline odds
+    """
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(odds > 0, 1 + (odds / 100), 1 + (100 / -odds))
+
+
+def prob_to_american(prob):
+    """
+    US moneyline odds that imply the given probability (not rounded)
+    """
+    prob = np.asarray(prob, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(prob >= 0.5, -100 * prob / (1 - prob), 100 * (1 - prob) / prob)
+
+
+def devig(prob, opp_prob):
+    """
+    Removes the bookmaker's margin from a two-way market by normalising both implied probabilities to sum to 1.
+    0.60 vs 0.44 (overround 1.04) -> 0.577
+    """
+    prob = np.asarray(prob, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return prob / (prob + np.asarray(opp_prob, dtype=float))
@@ -0,0 +1,161 @@
+import argparse
+import json
+import math
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting.config import TEAM_CODES
+from src.mlb_betting.feature_store import TeamFeatureStore
+from src.mlb_betting.modeling import BayesianBettingModel, posterior_probabilities
+from src.mlb_betting.odds import american_to_prob
+
+
+class ScoringService:
+  """
+  Resident scorer: the model artifact and the current team feature state are loaded once,
+  then every request is a few dict lookups and one small matrix product.
+  Edge is computed as in simulate_betting: model probability minus the moneyline's implied probability.
+  """
+  def __init__(self, model: BayesianBettingModel, store: TeamFeatureStore, threshold: float = 0.05):
+    self.model = model
+    self.store = store
+    self.threshold = threshold
+    self.feature_cols = list(model.feature_cols)
+
+    # Keep the draws in RAM (the artifact memory-maps them) in the layout the scorer wants
+    alpha, betas = model.posterior_draws()
+    self.alpha = np.ascontiguousarray(alpha, dtype=float)
+    self.betas = np.ascontiguousarray(betas, dtype=float)
+
+  @classmethod
+  def from_paths(cls, artifact_dir: str, state_path: str, **kwargs) -> "ScoringService":
+    return cls(BayesianBettingModel.load(artifact_dir), TeamFeatureStore.load(state_path), **kwargs)
+
+  def score(self, games: list) -> list:
+    """
+    Scores a batch of matchups. Each game is a dict with 'home', 'away', 'date'
+    and optionally 'home_moneyline' / 'away_moneyline'.
+    Returns one dict per side (home first): win probability, and edge / bet when a moneyline is given.
+    """
+    # 1. Feature rows from the in-memory state
+    rows = []
+    for game in games:
+      home, away = game['home'], game['away']
+      for team in (home, away):
+        if team not in TEAM_CODES:
+          raise ValueError(f"Unknown team: {team!r}")
+      for row in self.store.matchup(home, away, game['date']):
+        row['team_code'] = TEAM_CODES[row['team']]
+        row['opponent_code'] = TEAM_CODES[row['opponent']]
+        row['moneyline'] = game.get('home_moneyline' if row['is_home'] else 'away_moneyline')
+        rows.append(row)
+
+    # 2. Closed-form posterior mean for every row at once
+    X = np.array([[row[col] for col in self.feature_cols] for row in rows], dtype=float)
+    probs = posterior_probabilities(self.model.transform(X), self.alpha, self.betas)
+
+    # 3. Edge against the supplied line
+    moneylines = np.array([math.nan if row['moneyline'] is None else row['moneyline'] for row in rows], dtype=float)
+    vegas_probs = american_to_prob(moneylines)
+
+    results = []
+    for row, prob, vegas_prob in zip(rows, probs, vegas_probs):
+      result = {
+        'team': row['team'],
+        'opponent': row['opponent'],
+        'is_home': row['is_home'],
+        'date': row['date'].strftime('%Y-%m-%d'),
+        'win_prob': float(prob),
+      }
+      if row['moneyline'] is not None:
+        edge = float(prob - vegas_prob)
+        result.update({
+          'moneyline': row['moneyline'],
+          'vegas_prob': float(vegas_prob),
+          'edge': edge,
+          'bet': edge > self.threshold,
+        })
+      results.append(result)
+    return results
+
+  def score_matchup(self, home: str, away: str, date, home_moneyline=None, away_moneyline=None) -> list:
+    """
+    Single game convenience wrapper around score()
+    """
+    return self.score([{
+      'home': home, 'away': away, 'date': date,
+      'home_moneyline': home_moneyline, 'away_moneyline': away_moneyline,
+    }])
+
+  def update(self, df_games: pd.DataFrame):
+    """
+    Absorbs finished games (merged, one row per game) into the in-memory team state
+    """
+    self.store.update(df_games)
+
+
+def make_server(service: ScoringService, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Local HTTP front end:
+        POST /score   {"games": [{"home": "NYY", "away": "BOS", "date": "2024-04-01", "home_moneyline": -150}, ...]}
+        GET  /health
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Keep-alive + small responses: without TCP_NODELAY, Nagle / delayed ACK add ~40 ms per request
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._send(404, {'error': f"Unknown path {self.path}"})
+            self._send(200, {'status': 'ok', 'teams': len(service.store.teams), 'draws': len(service.alpha)})
+
+        def do_POST(self):
+            if self.path != "/score":
+                return self._send(404, {'error': f"Unknown path {self.path}"})
+            start = time.perf_counter()
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                results = service.score(payload['games'])
+            except (ValueError, KeyError, TypeError) as e:
+                return self._send(400, {'error': str(e)})
+            self._send(200, {'results': results, 'elapsed_ms': (time.perf_counter() - start) * 1000})
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve model scores over HTTP")
+    parser.add_argument('--artifact', required=True, help="Model artifact directory (see BayesianBettingModel.save)")
+    parser.add_argument('--state', required=True, help="Team feature state (see TeamFeatureStore.save)")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--threshold', type=float, default=0.05)
+    args = parser.parse_args()
+
+    service = ScoringService.from_paths(args.artifact, args.state, threshold=args.threshold)
+    server = make_server(service, args.host, args.port)
+    print(f"Scoring service listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from src.mlb_betting.config import TEAM_MAPPING
+from src.mlb_betting.odds import prob_to_american
+
+# One display name per team, in the same form the MLB API returns
+TEAM_NAMES = {}
+for _name, _abbr in TEAM_MAPPING.items():
+    TEAM_NAMES.setdefault(_abbr, _name)
+
+TEAMS = sorted(TEAM_NAMES)
+
+SPORTSBOOKS = ['bet365', 'pinnacle', 'caesars', 'draftkings', 'fanduel', 'betmgm']
+
+
+def generate_games(seasons=(2023,), games_per_day: int = 13, doubleheader_rate: float = 0.02, seed: int = 0) -> pd.DataFrame:
+    """
+    Deterministic fake league: one row per game with box-score stats and a
+    'true' home win probability (used to price the odds).
+    """
+    rng = np.random.default_rng(seed)
+    strength = dict(zip(TEAMS, rng.normal(0, 0.35, len(TEAMS))))
+
+    rows = []
+    for season in seasons:
+        game_pk = season * 100000
+        for date in pd.date_range(f"{season}-04-01", f"{season}-09-30"):
+            teams = rng.permutation(TEAMS)[:2 * games_per_day]
+            matchups = list(zip(teams[0::2], teams[1::2]))
+
+            # Occasional doubleheader: the same matchup twice on one day
+            if rng.random() < doubleheader_rate * games_per_day:
+                matchups.append(matchups[rng.integers(len(matchups))])
+
+            seen = {}
+            for home, away in matchups:
+                seen[(home, away)] = seen.get((home, away), 0) + 1
+                game_pk += 1
+
+                edge = strength[home] - strength[away] + 0.08
+                home_prob = 1 / (1 + np.exp(-edge))
+                home_runs = rng.poisson(4.5 * np.exp(edge / 2))
+                away_runs = rng.poisson(4.5 * np.exp(-edge / 2))
+                if home_runs == away_runs:
+                    # Extra innings
+                    if rng.random() < home_prob:
+                        home_runs += 1
+                    else:
+                        away_runs += 1
+
+                rows.append({
+                    'game_id': game_pk,
+                    'season': season,
+                    'date': date.strftime('%Y-%m-%d'),
+                    'game_number': seen[(home, away)],
+                    'home_abbr': home,
+                    'away_abbr': away,
+                    'home_score': int(home_runs),
+                    'away_score': int(away_runs),
+                    'home_hits': int(home_runs + rng.poisson(4)),
+                    'away_hits': int(away_runs + rng.poisson(4)),
+                    'home_errors': int(rng.poisson(0.6)),
+                    'away_errors': int(rng.poisson(0.6)),
+                    'home_prob': float(home_prob),
+                })
+
+    return pd.DataFrame(rows)
+
+
+def schedule_json(df_games: pd.DataFrame, season: int) -> dict:
+    """
+    MLB Stats API /schedule payload (hydrate=linescore) for one season
+    """
+    dates = []
+    season_games = df_games[df_games['season'] == season]
+    for date, day in season_games.groupby('date', sort=True):
+        games = []
+        for game in day.itertuples(index=False):
+            games.append({
+                'gamePk': int(game.game_id),
+                'gameNumber': int(game.game_number),
+                'status': {'abstractGameState': 'Final'},
+                'teams': {
+                    'home': {'team': {'name': TEAM_NAMES[game.home_abbr]}, 'score': int(game.home_score)},
+                    'away': {'team': {'name': TEAM_NAMES[game.away_abbr]}, 'score': int(game.away_score)},
+                },
+                'linescore': {'teams': {
+                    'home': {'hits': int(game.home_hits), 'errors': int(game.home_errors)},
+                    'away': {'hits': int(game.away_hits), 'errors': int(game.away_errors)},
+                }},
+            })
+        dates.append({'date': date, 'games': games})
+    return {'dates': dates}
+
+
+def schedule_frame(df_games: pd.DataFrame, season: int = None) -> pd.DataFrame:
+    """
+    Same games in the shape MLBStatsAPI.get_season_schedule returns (season=None for all seasons)
+    """
+    season_games = df_games if season is None else df_games[df_games['season'] == season]
+    return pd.DataFrame({
+        'game_id': season_games['game_id'].values,
+        'date': season_games['date'].values,
+        'home_team': season_games['home_abbr'].map(TEAM_NAMES).values,
+        'away_team': season_games['away_abbr'].map(TEAM_NAMES).values,
+        'home_score': season_games['home_score'].values,
+        'away_score': season_games['away_score'].values,
+        'home_hits': season_games['home_hits'].values,
+        'home_errors': season_games['home_errors'].values,
+        'away_hits': season_games['away_hits'].values,
+        'away_errors': season_games['away_errors'].values,
+    })
+
+
+def odds_json(df_games: pd.DataFrame, book_coverage: float = 0.85, no_odds_rate: float = 0.02, seed: int = 0) -> dict:
+    """
+    Odds history in the mlb-odds-scraper layout: {date: [game, ...]}.
+    Each book is missing with probability 1 - book_coverage, and some games have no odds at all.
+    """
+    rng = np.random.default_rng(seed + 1)
+    n_games, n_books = len(df_games), len(SPORTSBOOKS)
+    vig = 0.02
+
+    # 1. Price every (game, book) pair at once
+    has_odds = rng.random(n_games) >= no_odds_rate
+    listed = (rng.random((n_games, n_books)) < book_coverage) & has_odds[:, None]
+    opening = np.clip(df_games['home_prob'].values[:, None] + rng.normal(0, 0.03, (n_games, n_books)), 0.05, 0.95)
+    current = np.clip(opening + rng.normal(0, 0.02, (n_games, n_books)), 0.05, 0.95)
+
+    def quoted(prob):
+        return np.round(prob_to_american(prob)).astype(int)
+
+    odds = {
+        'openingLine': (quoted(opening + vig), quoted(1 - opening + vig)),
+        'currentLine': (quoted(current + vig), quoted(1 - current + vig)),
+    }
+
+    # 2. Nest them the way the scraper does
+    history = {}
+    for i, game in enumerate(df_games.itertuples(index=False)):
+        moneylines = []
+        for b in np.flatnonzero(listed[i]):
+            book = {'sportsbook': SPORTSBOOKS[b]}
+            for label, (home_odds, away_odds) in odds.items():
+                book[label] = {'homeOdds': int(home_odds[i, b]), 'awayOdds': int(away_odds[i, b])}
+            moneylines.append(book)
+
+        history.setdefault(game.date, []).append({
+            'gameView': {
+                'gameType': 'R',
+                'homeTeam': {'shortName': game.home_abbr},
+                'awayTeam': {'shortName': game.away_abbr},
+                'homeTeamScore': int(game.home_score),
+                'awayTeamScore': int(game.away_score),
+            },
+            'odds': {'moneyline': moneylines},
+        })
+
+    return history
+
+
+def write_odds_file(df_games: pd.DataFrame, filepath: str, **kwargs) -> str:
+    with open(filepath, 'w') as f:
+        json.dump(odds_json(df_games, **kwargs), f)
+    return filepath
+
+
+def merged_frame(df_games: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """
+    Shortcut to what load_and_merge_data returns (one book's closing line per game),
+    without writing and parsing an odds file. Handy for feature/model benchmarks.
+    """
+    rng = np.random.default_rng(seed + 2)
+    market_prob = np.clip(df_games['home_prob'].values + rng.normal(0, 0.03, len(df_games)), 0.05, 0.95)
+
+    df = schedule_frame(df_games, None)
+    df['date'] = pd.to_datetime(df['date'])
+    df['home_abbr'] = df_games['home_abbr'].values
+    df['away_abbr'] = df_games['away_abbr'].values
+    df['away_team_abbr'] = df['away_abbr']
+    df['away_score_odds'] = df['away_score']
+    df['home_team_abbr'] = df['home_abbr']
+    df['home_score_odds'] = df['home_score']
+    df['game_type'] = 'R'
+    df['home_moneyline'] = np.round(prob_to_american(market_prob + 0.02))
+    df['away_moneyline'] = np.round(prob_to_american(1 - market_prob + 0.02))
+    df['sportsbook'] = 'bet365'
+    return df
+
+
+def write_schedule_cache(df_games: pd.DataFrame, cache_dir: str) -> list:
+    """
+    Writes every season into an MLBStatsAPI schedule cache (all games final), so
+    get_season_schedule and load_and_merge_seasons run without touching the network
+    """
+    from src.mlb_betting.data_loading import MLBStatsAPI
+
+    api = MLBStatsAPI(cache_dir=cache_dir)
+    paths = []
+    for season in sorted(df_games['season'].unique()):
+        paths.append(api._cache_path(int(season)))
+        api._write_cache(api._parse_schedule(schedule_json(df_games, int(season))), paths[-1])
+    return paths
+
+
+def write_dataset(directory: str, n_seasons: int = 1, last_season: int = 2023, seed: int = 0, **kwargs) -> dict:
+    """
+    N seasons of offline pipeline inputs under directory: odds_history.json and a schedule cache.
+    kwargs go to generate_games (games_per_day, doubleheader_rate).
+    Returns the games, the seasons and the paths to hand to load_and_merge_seasons.
+    """
+    seasons = list(range(last_season - n_seasons + 1, last_season + 1))
+    df_games = generate_games(seasons, seed=seed, **kwargs)
+    cache_dir = os.path.join(directory, "schedules")
+    write_schedule_cache(df_games, cache_dir)
+    return {
+        'games': df_games,
+        'seasons': seasons,
+        'odds_file': write_odds_file(df_games, os.path.join(directory, "odds_history.json"), seed=seed),
+        'cache_dir': cache_dir,
+    }
@@ -0,0 +1,133 @@
+import subprocess
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+from src.mlb_betting import features, modeling
+from src.mlb_betting.artifacts import ArtifactStore
+from src.mlb_betting.modeling import BayesianBettingModel
+
+
+def test_stage_is_skipped_until_an_input_parameter_or_code_changes(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return pd.DataFrame({
+            'team': pd.Categorical(['NYY', 'BOS'], dtype=features.TEAM_DTYPE),
+            'value': np.array([1.5, 2.5], dtype='float32'),
+            'date': pd.to_datetime(['2023-04-01', '2023-04-02']),
+        }, index=[3, 7])
+
+    first, key = store.stage('frame', compute, params={'window': 10}, inputs=['raw-abc'], code=[features])
+    again, same_key = store.stage('frame', compute, params={'window': 10}, inputs=['raw-abc'], code=[features])
+    assert len(calls) == 1 and key == same_key
+    pd.testing.assert_frame_equal(first, again)
+
+    store.stage('frame', compute, params={'window': 5}, inputs=['raw-abc'], code=[features])
+    store.stage('frame', compute, params={'window': 10}, inputs=['raw-xyz'], code=[features])
+    store.stage('frame', compute, params={'window': 10}, inputs=['raw-abc'], code=[features, modeling])
+    assert len(calls) == 4
+
+    # Disabled store: always computes, never writes
+    ArtifactStore(str(tmp_path / "off"), enabled=False).stage('frame', compute)
+    assert len(calls) == 5 and not (tmp_path / "off").exists()
+
+
+def test_model_stage_round_trip_and_eviction(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 2)), columns=['a', 'b'])
+    df['result'] = (rng.random(200) < 1 / (1 + np.exp(-df['a']))).astype(int)
+
+    def train():
+        model = BayesianBettingModel(model_path=str(tmp_path / "scratch" / "model.nc"))
+        model.train(df, ['a', 'b'], backend='laplace', draws=200, random_seed=0)
+        return model
+
+    model, key = store.stage('model', train, inputs=['data'], kind='model')
+    loaded, _ = store.stage('model', lambda: None, inputs=['data'], kind='model')
+    np.testing.assert_allclose(loaded.predict(df), model.predict(df))
+    assert (Path(store.path('model', key)) / "model.nc").exists()
+
+    store.stage('other', lambda: df, inputs=['data'])
+    (Path(store.root) / "other" / "deadbeef.tmp-1").mkdir()  # interrupted write
+    entries = store.entries()
+    assert sorted(entries['stage']) == ['model', 'other']
+    assert (entries['size_mb'] > 0).all()
+
+    assert store.evict(stage='model') == [('model', key)]
+    assert list(store.entries()['stage']) == ['other']
+
+    # CLI
+    cli = [sys.executable, "-m", "src.mlb_betting.artifacts", "--root", store.root]
+    out = subprocess.run(cli + ["list"], cwd=PROJECT_ROOT, check=True, capture_output=True, text=True).stdout
+    assert "other" in out and "1 artifacts" in out
+    refused = subprocess.run(cli + ["evict"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert refused.returncode != 0
+    subprocess.run(cli + ["evict", "--all"], cwd=PROJECT_ROOT, check=True, capture_output=True)
+    assert store.entries().empty
+    assert not (Path(store.root) / "other" / "deadbeef.tmp-1").exists()
+
+
+def test_eviction_age_does_not_depend_on_the_local_time_zone(tmp_path, monkeypatch):
+    import json
+    import time
+
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    _, fresh = store.stage('frame', lambda: pd.DataFrame({'a': [1]}), params={'n': 1})
+    _, old = store.stage('frame', lambda: pd.DataFrame({'a': [2]}), params={'n': 2})
+    meta_file = Path(store.path('frame', old)) / "meta.json"
+    meta = json.loads(meta_file.read_text())
+    meta_file.write_text(json.dumps({**meta, 'created': time.time() - 0.2 * 86400}))
+
+    try:
+        # Far from UTC on either side, a naive local "now" would evict the fresh artifact or keep the old one
+        for zone in ('Asia/Tokyo', 'America/Los_Angeles'):
+            monkeypatch.setenv('TZ', zone)
+            time.tzset()
+            assert str(store.entries()['created'].dt.tz) == 'UTC'
+            assert store.evict(older_than_days=0.1) in ([('frame', old)], [])
+            assert list(store.entries()['key']) == [fresh]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    out = subprocess.run([sys.executable, "-m", "src.mlb_betting.artifacts", "--root", store.root, "list"],
+                         cwd=PROJECT_ROOT, check=True, capture_output=True, text=True).stdout
+    assert "UTC" in out
+
+
+def test_code_version_covers_imported_package_modules(tmp_path):
+    """
+    The ingest stage names data_loading; editing odds.py (which data_loading imports) must
+    still change its key, editing a module it does not use must not.
+    """
+    import shutil
+    from types import SimpleNamespace
+    from src.mlb_betting import data_loading
+
+    package = tmp_path / "src" / "mlb_betting"
+    shutil.copytree(Path(data_loading.__file__).parent, package, ignore=shutil.ignore_patterns('__pycache__'))
+    module = SimpleNamespace(__name__=data_loading.__name__, __file__=str(package / "data_loading.py"))
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+
+    def ingest_key():
+        return store.key('ingest', inputs=['odds-file'], code=[module])
+
+    before = ingest_key()
+    with open(package / "service.py", 'a') as f:
+        f.write("\n# unrelated\n")
+    assert ingest_key() == before
+
+    with open(package / "odds.py", 'a') as f:
+        f.write("\n# consensus line changed\n")
+    assert ingest_key() != before
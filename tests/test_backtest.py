@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+from src.mlb_betting.backtest import backtest, walk_forward_folds
+
+
+def make_games(n_days=60, per_day=8, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = np.repeat(pd.date_range("2023-04-01", periods=n_days, freq="D"), per_day)
+    df = pd.DataFrame({'date': dates, 'a': rng.normal(size=len(dates)), 'b': rng.normal(size=len(dates))})
+    df['result'] = (rng.random(len(df)) < 1 / (1 + np.exp(-(0.8 * df['a'] - 0.5 * df['b'])))).astype(int)
+    return df
+
+
+def test_walk_forward_folds_never_train_on_the_future():
+    dates = make_games()['date']
+    folds = walk_forward_folds(dates, freq='W', min_train_days=14)
+
+    assert folds[0]['test_start'] == pd.Timestamp("2023-04-15")
+    for prev, fold in zip(folds[:-1], folds[1:]):
+        assert prev['test_end'] == fold['test_start']
+    assert folds[-1]['test_end'] > dates.max()
+
+    rolling = walk_forward_folds(dates, freq='W', min_train_days=14, train_days=10)
+    assert all(f['test_start'] - f['train_start'] == pd.Timedelta(days=10) for f in rolling)
+
+
+def test_backtest_is_out_of_sample_cached_and_pool_independent(tmp_path):
+    df = make_games()
+    feature_cols = ['a', 'b']
+    settings = dict(freq='W', min_train_days=14, backend='laplace', train_kwargs={'draws': 200, 'random_seed': 1})
+
+    serial = backtest(df, feature_cols, max_workers=1, cache_dir=str(tmp_path / "cache"), **settings)
+
+    # Every row after the warm-up is predicted exactly once
+    assert serial.index.is_unique
+    assert len(serial) == (df['date'] >= "2023-04-15").sum()
+    assert serial['my_prob'].between(0, 1).all()
+    assert serial['date'].is_monotonic_increasing
+
+    # Second run loads every fold from the cache; a process pool gives the same numbers
+    cached = backtest(df, feature_cols, max_workers=1, cache_dir=str(tmp_path / "cache"), **settings)
+    pooled = backtest(df, feature_cols, max_workers=2, **settings)
+    np.testing.assert_allclose(cached['my_prob'], serial['my_prob'])
+    np.testing.assert_allclose(pooled['my_prob'], serial['my_prob'])
+    assert len([p for p in (tmp_path / "cache").iterdir() if p.is_dir()]) == serial['fold'].nunique()
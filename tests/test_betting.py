@@ -0,0 +1,219 @@
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.mlb_betting.betting import bankroll_summary, market_probabilities, simulate_bankroll, simulate_betting, sweep_betting
+from src.mlb_betting.modeling import BayesianBettingModel
+
+
+def legacy_simulate_betting(df, threshold=0.05, stake=100):
+    """
+    The original row-wise implementation, kept as the reference
+    """
+    sim = df.copy()
+
+    def us_odds_to_prob(odds):
+        if pd.isna(odds): return np.nan
+        if odds > 0:
+            return 100 / (odds + 100)
+        else:
+            return (-odds) / (-odds + 100)
+
+    sim['vegas_prob'] = sim['moneyline_closing'].apply(us_odds_to_prob)
+    sim['edge'] = sim['my_prob'] - sim['vegas_prob']
+    sim['bet_placed'] = sim['edge'] > threshold
+
+    def calculate_pnl(row):
+        if not row['bet_placed']: return 0
+        if row['moneyline_closing'] > 0:
+            decimal_odds = 1 + (row['moneyline_closing'] / 100)
+        else:
+            decimal_odds = 1 + (100 / -row['moneyline_closing'])
+        if row['result'] == 1:
+            return stake * (decimal_odds - 1)
+        else:
+            return -stake
+
+    sim['pnl'] = sim.apply(calculate_pnl, axis=1)
+    total_bets = sim['bet_placed'].sum()
+    total_profit = sim['pnl'].sum()
+    roi = (total_profit / (total_bets * stake)) * 100 if total_bets > 0 else 0
+    return {"total_bets": int(total_bets), "total_profit": float(total_profit), "roi": float(roi)}
+
+
+def make_bets(n=500, seed=2):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'my_prob': rng.uniform(0.3, 0.7, n),
+        'moneyline_closing': rng.choice([-200, -150, -110, 100, 120, 150, 180], n).astype('float32'),
+        'alt_moneyline': rng.choice([-160, -105, 110, 140], n).astype(float),
+        'result': rng.integers(0, 2, n),
+    })
+    df.loc[::13, 'moneyline_closing'] = np.nan
+    return df
+
+
+def test_simulate_betting_matches_row_wise_reference():
+    df = make_bets()
+    for threshold, stake in [(0.05, 100), (0.0, 25), (-1.0, 10), (0.5, 100)]:
+        expected = legacy_simulate_betting(df, threshold, stake)
+        result = simulate_betting(df, threshold, stake)
+        assert result['total_bets'] == expected['total_bets']
+        np.testing.assert_allclose(result['total_profit'], expected['total_profit'], atol=1e-6)
+        np.testing.assert_allclose(result['roi'], expected['roi'], atol=1e-9)
+
+
+def test_sweep_covers_the_grid_and_matches_single_runs():
+    df = make_bets()
+    thresholds = np.linspace(-0.05, 0.15, 9)
+    table = sweep_betting(df, thresholds, stakes=[50, 100], kelly_fractions=[0.25],
+                          odds_cols={'main': 'moneyline_closing', 'alt': 'alt_moneyline'}, bankroll=1000)
+
+    assert len(table) == 2 * 9 * 3
+    flat = table[(table['sportsbook'] == 'main') & (table['stake_rule'] == 'flat') & (table['stake'] == 100)]
+    for _, row in flat.iterrows():
+        expected = legacy_simulate_betting(df, row['threshold'], 100)
+        assert row['total_bets'] == expected['total_bets']
+        np.testing.assert_allclose(row['total_profit'], expected['total_profit'], atol=1e-6)
+
+    # Kelly stakes by brute force on the alternative book
+    kelly = table[(table['sportsbook'] == 'alt') & (table['stake_rule'] == 'kelly')]
+    decimal_odds = np.where(df['alt_moneyline'] > 0, 1 + df['alt_moneyline'] / 100, 1 + 100 / -df['alt_moneyline'])
+    fraction = np.clip((df['my_prob'] * decimal_odds - 1) / (decimal_odds - 1), 0, None)
+    edge = df['my_prob'] - 1 / decimal_odds
+    for _, row in kelly.iterrows():
+        bet = edge > row['threshold']
+        stakes = 0.25 * 1000 * fraction[bet]
+        profit = np.where(df['result'][bet] == 1, stakes * (decimal_odds[bet] - 1), -stakes).sum()
+        np.testing.assert_allclose(row['total_staked'], stakes.sum())
+        np.testing.assert_allclose(row['total_profit'], profit)
+
+
+def make_season_model(df, alpha_mean=0.0, n_draws=200, seed=4, spread=0.1):
+    """
+    Model over one feature 'a' with a hand-made posterior (alpha ~ N(alpha_mean, spread), beta ~ N(0.5, spread))
+    """
+    rng = np.random.default_rng(seed)
+    model = BayesianBettingModel(model_path="unused.nc")
+    model.feature_cols = ['a']
+    model.fit_preprocessing(df[['a']].values)
+    model.draws = np.c_[rng.normal(alpha_mean, spread, n_draws), rng.normal(0.5, spread, n_draws)]
+    return model
+
+
+def make_season(n_days=50, per_day=6, seed=1):
+    """
+    make_bets rows over n_days dates, per_day games a day, with a model feature 'a'
+    """
+    df = make_bets(n_days * per_day)
+    df['date'] = pd.Timestamp("2023-04-01") + pd.to_timedelta(np.arange(len(df)) // per_day, unit='D')
+    df['a'] = np.random.default_rng(seed).normal(size=len(df))
+    return df
+
+
+def test_bankroll_simulation_compounds_daily_and_reports_risk():
+    # Every day the same games, every bet won, one posterior point: each season is the same path
+    day = make_bets(6)
+    day['a'] = np.linspace(-1, 1, 6)
+    df = pd.concat([day.assign(date=pd.Timestamp("2023-04-01") + pd.Timedelta(days=d)) for d in range(50)], ignore_index=True)
+    df['result'] = 1
+    model = make_season_model(df, spread=0.0)
+    sims = simulate_bankroll(df, model, n_sims=50, kelly_fraction=0.5, bankroll=1000, seed=0, outcomes='bootstrap')
+
+    probs = 1 / (1 + np.exp(-(model.draws[0, 0] + model.draws[0, 1] * model.transform(day[['a']].values)[:, 0])))
+    odds = day['moneyline_closing'].to_numpy(dtype=float)
+    decimal_odds = np.where(odds > 0, 1 + odds / 100, 1 + 100 / -odds)
+    fraction = 0.5 * np.clip((probs * decimal_odds - 1) / (decimal_odds - 1), 0, None)
+    bet = probs - 1 / decimal_odds > 0
+    daily = np.nansum(np.where(bet, fraction * (decimal_odds - 1), 0))
+    assert daily > 0
+    np.testing.assert_allclose(sims['final_bankroll'], 1000 * (1 + daily) ** 50, rtol=1e-6)
+    assert (sims['max_drawdown'] == 0).all() and not sims['ruined'].any()
+
+    # Zero stake never moves the bankroll
+    df = make_season()
+    model = make_season_model(df)
+    flat = simulate_bankroll(df, model, n_sims=100, kelly_fraction=0.0, seed=0)
+    np.testing.assert_allclose(flat['final_bankroll'], 1000)
+
+    # Chunking only changes memory, not the simulated seasons' distribution
+    small = simulate_bankroll(df, model, n_sims=4000, kelly_fraction=1.0, chunk_size=250, seed=1)
+    large = simulate_bankroll(df, model, n_sims=4000, kelly_fraction=1.0, chunk_size=4000, seed=2)
+    assert abs(small['max_drawdown'].mean() - large['max_drawdown'].mean()) < 0.02
+    assert ((small['max_drawdown'] >= 0) & (small['max_drawdown'] <= 1)).all()
+
+    summary = bankroll_summary(small)
+    assert 0 <= summary['risk_of_ruin'] <= 1
+    assert list(summary['distribution'].index) == ['final_bankroll', 'max_drawdown']
+    assert summary['distribution'].loc['max_drawdown', 'p95'] >= summary['distribution'].loc['max_drawdown', 'p5']
+
+
+def test_wider_posterior_widens_the_bankroll_distribution():
+    """
+    Each season bets on its own posterior draw, so parameter uncertainty adds to the outcome noise
+    """
+    df = make_season()
+    narrow = simulate_bankroll(df, make_season_model(df, spread=0.0), n_sims=4000, kelly_fraction=0.25, seed=0)
+    wide = simulate_bankroll(df, make_season_model(df, spread=0.3), n_sims=4000, kelly_fraction=0.25, seed=0)
+
+    # Final bankrolls compound, so their spread is compared on the log scale
+    for sims in (narrow, wide):
+        sims['log_final'] = np.log(sims['final_bankroll'])
+    for column in ['log_final', 'max_drawdown']:
+        spread_narrow = narrow[column].quantile(0.95) - narrow[column].quantile(0.05)
+        spread_wide = wide[column].quantile(0.95) - wide[column].quantile(0.05)
+        assert spread_wide > 1.2 * spread_narrow, column
+
+
+def test_bankroll_outcomes_do_not_come_from_the_model():
+    """
+    A model that is sure of an edge the market does not give loses money against the
+    de-vigged line and against the actual results.
+    """
+    n_days = 60
+    dates = np.repeat(pd.date_range("2023-04-01", periods=n_days), 2)
+    df = pd.DataFrame({
+        'date': dates,
+        'team': np.tile(['NYY', 'BOS'], n_days),
+        'opponent': np.tile(['BOS', 'NYY'], n_days),
+        'moneyline_closing': -110.0,
+        'result': np.tile([0, 1], n_days),
+        'a': 1.0,
+    })
+    model = make_season_model(df, alpha_mean=50.0)
+
+    np.testing.assert_allclose(market_probabilities(df), 0.5)
+    market = bankroll_summary(simulate_bankroll(df, model, n_sims=500, seed=0))
+    bootstrap = bankroll_summary(simulate_bankroll(df, model, n_sims=500, seed=0, outcomes='bootstrap'))
+    assert market['outcomes'] == 'market' and market['median_final_bankroll'] < 1000
+    # Every day is one win and one loss at -110: a sure loss however the days are resampled
+    assert bootstrap['outcomes'] == 'bootstrap' and bootstrap['prob_profit'] == 0
+
+    with pytest.raises(ValueError):
+        simulate_bankroll(df, model, outcomes='posterior')
+
+
+def test_market_probabilities_pair_both_sides_of_each_game():
+    df = pd.DataFrame({
+        'date': pd.to_datetime(['2023-05-01'] * 4 + ['2023-05-02']),
+        'team': ['NYY', 'BOS', 'NYY', 'BOS', 'TOR'],
+        'opponent': ['BOS', 'NYY', 'BOS', 'NYY', 'TB'],
+        # Doubleheader: the second game has a different line
+        'moneyline_closing': [-150.0, 130.0, 120.0, -140.0, -120.0],
+    })
+    implied = np.array([150 / 250, 100 / 230, 100 / 220, 140 / 240, 120 / 220])
+    probs = market_probabilities(df)
+    np.testing.assert_allclose(probs[:2], implied[:2] / implied[:2].sum())
+    np.testing.assert_allclose(probs[2:4], implied[2:4] / implied[2:4].sum())
+    np.testing.assert_allclose(probs[:4].reshape(2, 2).sum(axis=1), 1)
+    # Unpaired row: the typical margin of the paired games is taken off
+    typical = np.median([implied[:2].sum(), implied[:2].sum(), implied[2:4].sum(), implied[2:4].sum()])
+    np.testing.assert_allclose(probs[4], implied[4] / typical)
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import pandas as pd
+import main
+from src.mlb_betting import artifacts, data_loading, synthetic
+
+
+def test_cli_startup_imports_nothing_heavy():
+    code = (
+        "import sys, main; main.build_parser().parse_args(['simulate', '--threshold', '0.05']); "
+        "print(','.join(m for m in ('pandas', 'pymc', 'arviz', 'sklearn') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_subcommands_reuse_stored_stages(tmp_path, monkeypatch, capsys):
+    (tmp_path / "raw").mkdir()
+    (tmp_path / "raw" / "odds_history.json").write_text("{}")
+    games = synthetic.merged_frame(synthetic.generate_games([2023], games_per_day=8))
+    monkeypatch.setattr(main, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(main, 'TEAM_STATE_PATH', tmp_path / "state" / "team_state.json")
+    monkeypatch.setattr(artifacts, 'ARTIFACT_DIR', tmp_path / "artifacts")
+    monkeypatch.setattr(data_loading, 'load_and_merge_data', lambda **kwargs: games)
+    metrics = ['--metrics', str(tmp_path / "runs.jsonl")]
+
+    main.main(['predict', '--backend', 'laplace', *metrics])
+    predictions = pd.read_csv(tmp_path / "predictions" / "predictions_2023.csv")
+    assert predictions['my_prob'].between(0, 1).all()
+
+    # Everything upstream of the sweep is loaded, not recomputed
+    capsys.readouterr()
+    main.main(['simulate', '--backend', 'laplace', '--threshold', '0.0', '0.05', *metrics])
+    out = capsys.readouterr().out
+    for stage in ('ingest', 'training_data', 'model', 'predict'):
+        assert f"[{stage}] up to date" in out
+    assert "Fitting with" not in out
+
+
+def test_run_backtests_only_when_asked(tmp_path, monkeypatch, capsys):
+    (tmp_path / "raw").mkdir()
+    (tmp_path / "raw" / "odds_history.json").write_text("{}")
+    games = synthetic.merged_frame(synthetic.generate_games([2023], games_per_day=8))
+    monkeypatch.setattr(main, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(main, 'TEAM_STATE_PATH', tmp_path / "state" / "team_state.json")
+    monkeypatch.setattr(artifacts, 'ARTIFACT_DIR', tmp_path / "artifacts")
+    monkeypatch.setattr(data_loading, 'load_and_merge_data', lambda **kwargs: games)
+    # Folds are one fit each: stand in the in-sample predictions
+    calls = []
+    monkeypatch.setattr(main.PipelineRun, 'backtest', lambda self, freq='W': calls.append(freq) or self.predictions())
+    metrics = ['--metrics', str(tmp_path / "runs.jsonl")]
+
+    main.main(['--backend', 'laplace', *metrics])
+    assert calls == [] and "WALK-FORWARD" not in capsys.readouterr().out
+
+    main.main(['run', '--backend', 'laplace', '--backtest', *metrics])
+    assert calls == ['W'] and "WALK-FORWARD" in capsys.readouterr().out
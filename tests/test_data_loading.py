@@ -0,0 +1,343 @@
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.mlb_betting import synthetic
+from src.mlb_betting.data_loading import MLBStatsAPI, BettingDataLoader, load_and_merge_seasons, _merge_games_and_odds
+
+
+def _game(game_pk, home, away, status, home_score=None, away_score=None):
+    teams = {'home': {'team': {'name': home}}, 'away': {'team': {'name': away}}}
+    if home_score is not None:
+        teams['home']['score'] = home_score
+        teams['away']['score'] = away_score
+    return {
+        'gamePk': game_pk,
+        'status': {'abstractGameState': status},
+        'teams': teams,
+        'linescore': {'teams': {'home': {'hits': 8, 'errors': 0}, 'away': {'hits': 6, 'errors': 1}}}
+    }
+
+
+class StubScheduleServer:
+    """
+    Minimal stand-in for statsapi.mlb.com that serves a mutable schedule and logs every request.
+    """
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                stub.requests.append(params)
+                dates = [
+                    {'date': d, 'games': games} for d, games in sorted(stub.schedule.items())
+                    if d.startswith(params.get('season', ''))
+                    and params.get('startDate', '0000') <= d <= params.get('endDate', '9999')
+                ]
+                body = json.dumps({'dates': dates}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/api/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubScheduleServer({
+        '2023-04-01': [_game(1, 'New York Yankees', 'Boston Red Sox', 'Final', 5, 3)],
+        '2023-04-02': [_game(2, 'New York Yankees', 'Boston Red Sox', 'Final', 2, 4)],
+        '2023-04-03': [_game(3, 'New York Yankees', 'Boston Red Sox', 'Preview')],
+    })
+    yield server
+    server.close()
+
+
+def test_schedule_cache_only_refetches_open_dates(stub_server, tmp_path):
+    """
+    A warm cache should only request the dates that were not final, and nothing once all are final.
+    """
+    api = MLBStatsAPI(cache_dir=str(tmp_path), base_url=stub_server.url)
+
+    # 1. Cold cache: one full-season request, unplayed game is not returned
+    df = api.get_season_schedule(2023, end_date='2023-04-03')
+    assert len(stub_server.requests) == 1
+    assert 'startDate' not in stub_server.requests[0]
+    assert list(df['game_id']) == [1, 2]
+    assert (tmp_path / "schedule_2023.parquet").exists()
+
+    # 2. The open date finishes: only that date is requested
+    stub_server.schedule['2023-04-03'] = [_game(3, 'New York Yankees', 'Boston Red Sox', 'Final', 7, 1)]
+    df = api.get_season_schedule(2023, end_date='2023-04-03')
+    assert len(stub_server.requests) == 2
+    assert stub_server.requests[1]['startDate'] == '2023-04-03'
+    assert stub_server.requests[1]['endDate'] == '2023-04-03'
+    assert list(df['game_id']) == [1, 2, 3]
+    assert df.loc[2, 'home_score'] == 7
+
+    # 3. Everything final: served from disk, no request
+    df_cached = MLBStatsAPI(cache_dir=str(tmp_path), base_url=stub_server.url).get_season_schedule(2023, end_date='2023-04-03')
+    assert len(stub_server.requests) == 2
+    pd.testing.assert_frame_equal(df, df_cached)
+
+
+def test_schedule_cache_refetches_games_without_a_status(stub_server, tmp_path):
+    api = MLBStatsAPI(cache_dir=str(tmp_path), base_url=stub_server.url)
+    game = _game(2, 'New York Yankees', 'Boston Red Sox', 'Final', 2, 4)
+    del game['status']
+    stub_server.schedule['2023-04-02'] = [game]
+
+    api.get_season_schedule(2023, end_date='2023-04-03')
+    df_cached = pd.read_parquet(tmp_path / "schedule_2023.parquet")
+    assert df_cached.loc[df_cached['game_id'] == 2, 'status'].item() != 'Final'
+
+    # The status-less date is requested again along with the open one
+    stub_server.schedule['2023-04-02'] = [_game(2, 'New York Yankees', 'Boston Red Sox', 'Final', 2, 4)]
+    api.get_season_schedule(2023, end_date='2023-04-03')
+    assert (stub_server.requests[1]['startDate'], stub_server.requests[1]['endDate']) == ('2023-04-02', '2023-04-03')
+    df_cached = pd.read_parquet(tmp_path / "schedule_2023.parquet")
+    assert df_cached.loc[df_cached['game_id'] == 2, 'status'].item() == 'Final'
+
+
+def test_schedule_without_cache_matches_cached_result(stub_server, tmp_path):
+    df_live = MLBStatsAPI(base_url=stub_server.url).get_season_schedule(2023)
+    df_cached = MLBStatsAPI(cache_dir=str(tmp_path), base_url=stub_server.url).get_season_schedule(2023)
+    pd.testing.assert_frame_equal(df_live, df_cached)
+    assert list(df_live.columns) == [
+        'game_id', 'date', 'home_team', 'away_team', 'home_score', 'away_score',
+        'home_hits', 'home_errors', 'away_hits', 'away_errors'
+    ]
+
+
+def _odds_game(home, away, home_score, away_score, books):
+    return {
+        'gameView': {
+            'gameType': 'R',
+            'homeTeam': {'shortName': home}, 'awayTeam': {'shortName': away},
+            'homeTeamScore': home_score, 'awayTeamScore': away_score
+        },
+        'odds': {'moneyline': [
+            {'sportsbook': book, 'openingLine': {'homeOdds': h, 'awayOdds': a},
+             'currentLine': {'homeOdds': h, 'awayOdds': a}}
+            for book, h, a in books
+        ]}
+    }
+
+
+def test_multi_season_ingestion_parses_odds_once(tmp_path, monkeypatch):
+    server = StubScheduleServer({
+        '2022-05-01': [_game(10, 'New York Yankees', 'Boston Red Sox', 'Final', 3, 2)],
+        '2023-05-01': [_game(20, 'Boston Red Sox', 'New York Yankees', 'Final', 1, 6)],
+    })
+    monkeypatch.setattr(MLBStatsAPI, 'base_url', server.url)
+
+    odds_file = tmp_path / "odds_history.json"
+    odds_file.write_text(json.dumps({
+        '2022-05-01': [_odds_game('NYY', 'BOS', 3, 2, [('bet365', -150, 130)])],
+        '2023-05-01': [_odds_game('BOS', 'NYY', 1, 6, [('fanduel', 110, -120)])],
+    }))
+
+    calls = []
+    original_load_odds = BettingDataLoader.load_odds
+    def counting_load_odds(self, *args, **kwargs):
+        calls.append(1)
+        return original_load_odds(self, *args, **kwargs)
+    monkeypatch.setattr(BettingDataLoader, 'load_odds', counting_load_odds)
+
+    df = load_and_merge_seasons([2022, 2023], str(odds_file), max_workers=2)
+    server.close()
+
+    assert len(calls) == 1, "Odds file should be parsed once for all seasons"
+    assert sorted(season['season'] for season in server.requests) == ['2022', '2023']
+    assert list(df['game_id']) == [10, 20]
+    assert list(df['home_moneyline']) == [-150, 110]
+    assert list(df['sportsbook']) == ['bet365', 'fanduel']
+
+
+def test_ingestion_without_any_games_names_the_seasons(tmp_path, monkeypatch):
+    server = StubScheduleServer({})
+    monkeypatch.setattr(MLBStatsAPI, 'base_url', server.url)
+    odds_file = tmp_path / "odds_history.json"
+    odds_file.write_text("{}")
+
+    with pytest.raises(ValueError, match=r"\[2021, 2022\]"):
+        load_and_merge_seasons([2021, 2022], str(odds_file), cache_dir=str(tmp_path / "cache"))
+    server.close()
+
+
+def test_streaming_odds_matches_json_load(tmp_path):
+    """
+    stream=True must produce the same rows as the json.load path, just with compact dtypes.
+    """
+    games = synthetic.generate_games([2022, 2023], games_per_day=4)
+    odds_file = synthetic.write_odds_file(games, str(tmp_path / "odds_history.json"))
+    loader = BettingDataLoader(odds_file)
+
+    df_eager = loader.load_odds(target_book='pinnacle')
+    df_stream = loader.load_odds(target_book='pinnacle', stream=True)
+
+    assert df_stream['home_team_abbr'].dtype == 'category'
+    assert df_stream['home_moneyline'].dtype == 'float32'
+
+    df_eager['date'] = pd.to_datetime(df_eager['date'])
+    pd.testing.assert_frame_equal(df_eager, df_stream, check_dtype=False, check_categorical=False)
+
+    # Filters are applied while walking the file
+    df_2023 = loader.load_odds(stream=True, seasons=[2023])
+    assert len(df_2023) == (games['season'] == 2023).sum()
+    df_may = loader.load_odds(stream=True, start_date='2022-05-01', end_date='2022-05-31')
+    assert df_may['date'].min() == pd.Timestamp('2022-05-01')
+    assert df_may['date'].max() == pd.Timestamp('2022-05-31')
+
+
+def test_games_without_any_sportsbook_load_with_empty_odds(tmp_path):
+    odds_file = tmp_path / "odds_history.json"
+    odds_file.write_text(json.dumps({'2023-04-01': [_odds_game('NYY', 'BOS', 3, 2, [])]}))
+    loader = BettingDataLoader(str(odds_file))
+
+    for stream in (False, True):
+        df = loader.load_odds(stream=stream)
+        assert len(df) == 1
+        assert df['home_moneyline'].isna().all() and df['sportsbook'].isna().all()
+
+    # A trailing batch that lists no books still merges with the ones that do
+    odds_file.write_text(json.dumps({
+        '2023-04-01': [_odds_game('NYY', 'BOS', 3, 2, [('bet365', -150, 130)])],
+        '2023-04-02': [_odds_game('NYY', 'BOS', 1, 4, [])],
+    }))
+    market = loader.load_market(batch_size=1)
+    assert market.books == ['bet365']
+    assert list(market.select_book()['home_moneyline'].isna()) == [False, True]
+
+
+def test_market_table_book_selection_and_consensus(tmp_path):
+    """
+    One parse, then any book / fallback order is a lookup on the long table.
+    """
+    odds_file = tmp_path / "odds_history.json"
+    odds_file.write_text(json.dumps({'2023-06-01': [
+        _odds_game('NYY', 'BOS', 3, 2, [('FanDuel', -120, 100), ('Bet365', -110, -110)]),
+        _odds_game('TB', 'TOR', 1, 0, [('betmgm', 150, -170), ('Caesars', 140, -160), ('Pinnacle', 145, -165)]),
+        _odds_game('SEA', 'HOU', 4, 5, [('betmgm', 120, -140), ('unibet', 125, -145)]),
+        _odds_game('SD', 'SF', 2, 7, []),
+    ]}))
+    market = BettingDataLoader(str(odds_file)).load_market()
+
+    assert len(market.games) == 4
+    assert len(market.lines) == 7
+    assert market.lines['book'].dtype == 'category'
+
+    # Target (case insensitive), fallback order, first listed, nothing listed
+    df = market.select_book('bet365')
+    assert list(df['sportsbook'].astype(object).fillna('none')) == ['Bet365', 'Pinnacle', 'betmgm', 'none']
+    assert list(df['home_moneyline'].fillna(0)) == [-110, 145, 120, 0]
+
+    df = market.select_book('betmgm', fallbacks=['fanduel'])
+    assert list(df['sportsbook'].astype(object).fillna('none')) == ['FanDuel', 'betmgm', 'betmgm', 'none']
+
+    # Same result as the per-game path
+    pd.testing.assert_frame_equal(market.select_book('bet365'), BettingDataLoader(str(odds_file)).load_odds('bet365'))
+
+    consensus = market.consensus()
+    assert list(consensus['n_books']) == [2, 3, 2, 0]
+    assert consensus.loc[0, 'consensus_home_prob'] == pytest.approx((120 / 220 / (120 / 220 + 0.5) + 0.5) / 2)
+    assert np.isnan(consensus.loc[3, 'consensus_home_prob'])
+
+    wide = market.book_matrix(side='away')
+    assert wide.loc[1, 'Caesars'] == -160
+
+
+def test_game_join_is_one_to_one_on_doubleheaders(capsys):
+    def schedule(rows):
+        return pd.DataFrame([
+            {'game_id': gid, 'date': date, 'home_team': home, 'away_team': away, 'home_score': hs, 'away_score': as_,
+             'home_hits': 8, 'home_errors': 0, 'away_hits': 7, 'away_errors': 1}
+            for gid, date, home, away, hs, as_ in rows
+        ])
+
+    def odds(rows):
+        return pd.DataFrame([
+            {'date': date, 'away_team_abbr': away, 'away_score': as_, 'home_team_abbr': home, 'home_score': hs,
+             'game_type': 'R', 'home_moneyline': ml, 'away_moneyline': -ml, 'sportsbook': 'bet365'}
+            for date, home, away, hs, as_, ml in rows
+        ])
+
+    df_mlb = schedule([
+        (1, '2023-06-01', 'New York Yankees', 'Boston Red Sox', 3, 2),   # doubleheader, odds listed in reverse
+        (2, '2023-06-01', 'New York Yankees', 'Boston Red Sox', 1, 4),
+        (3, '2023-06-02', 'Tampa Bay Rays', 'Toronto Blue Jays', 5, 5),  # doubleheader, same score twice
+        (4, '2023-06-02', 'Tampa Bay Rays', 'Toronto Blue Jays', 5, 5),
+        (5, '2023-06-03', 'Seattle Mariners', 'Houston Astros', 2, 1),   # doubleheader, odds without scores
+        (6, '2023-06-03', 'Seattle Mariners', 'Houston Astros', 0, 6),
+        (7, '2023-06-04', 'Springfield Isotopes', 'Boston Red Sox', 1, 0),  # unknown name, no odds
+    ])
+    df_odds = odds([
+        ('2023-06-01', 'NYY', 'BOS', 1, 4, 102),
+        ('2023-06-01', 'NYY', 'BOS', 3, 2, 101),
+        ('2023-06-02', 'TB', 'TOR', 5, 5, 103),
+        ('2023-06-02', 'TB', 'TOR', 5, 5, 104),
+        ('2023-06-03', 'SEA', 'HOU', np.nan, np.nan, 105),
+        ('2023-06-03', 'SEA', 'HOU', np.nan, np.nan, 106),
+        ('2023-06-05', 'SD', 'SF', 2, 7, 107),                         # no such game
+    ])
+
+    df = _merge_games_and_odds(df_mlb, df_odds)
+
+    assert list(df['game_id']) == [1, 2, 3, 4, 5, 6, 7]
+    assert list(df['home_moneyline'].fillna(0)) == [101, 102, 103, 104, 105, 106, 0]
+    assert list(df['home_abbr']) == ['NYY', 'NYY', 'TB', 'TB', 'SEA', 'SEA', 'UNKNOWN']
+    assert list(df['game_number']) == [1, 2, 1, 2, 1, 2, 1]
+    assert {'home_score_odds', 'away_score_odds', 'home_team_abbr', 'sportsbook'} <= set(df.columns)
+
+    out = capsys.readouterr().out
+    assert "Springfield Isotopes" in out
+    assert "(4 on score, 2 on game number); 1 games without odds, 1 odds records without a game" in out
+
+    # The first odds record contradicts game 1's score: the unscored second one still belongs to game 2
+    df = _merge_games_and_odds(df_mlb.iloc[4:6], odds([
+        ('2023-06-03', 'SEA', 'HOU', 9, 9, 105),
+        ('2023-06-03', 'SEA', 'HOU', np.nan, np.nan, 106),
+    ]))
+    assert list(df['game_number']) == [1, 2]
+    assert list(df['home_moneyline'].fillna(0)) == [0, 106]
+
+
+def test_synthetic_dataset_ingests_offline(tmp_path, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("ingestion should be served from the schedule cache")
+
+    monkeypatch.setattr(MLBStatsAPI, '_fetch_schedule', no_network)
+    data = synthetic.write_dataset(str(tmp_path), n_seasons=2, games_per_day=6, doubleheader_rate=0.05)
+    games = data['games']
+
+    df = load_and_merge_seasons(data['seasons'], data['odds_file'], cache_dir=data['cache_dir'])
+
+    assert data['seasons'] == [2022, 2023]
+    assert games['home_abbr'].nunique() == 30 and (games['game_number'] > 1).any()
+    assert len(df) == len(games) and df['game_id'].is_unique
+    # Games without bet365 fall back to another book; games without any book have no line
+    assert df['sportsbook'].nunique() > 1 and df['home_moneyline'].isna().any()
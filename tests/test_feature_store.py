@@ -0,0 +1,149 @@
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.config import MODEL_FEATURES
+from src.mlb_betting.feature_store import TeamFeatureStore, FeatureIndex
+
+
+@pytest.fixture
+def games():
+    df_games = synthetic.generate_games([2023], games_per_day=6, doubleheader_rate=0.05)
+    return synthetic.merged_frame(df_games)
+
+
+def batch_features(df_master):
+    df_long = features.create_team_centric_df(df_master)
+    return features.calculate_advanced_features(features.calculate_form_features(df_long))
+
+
+def assert_same_rows(expected: pd.DataFrame, actual: pd.DataFrame):
+    for col in actual.columns:
+        x, y = expected[col].to_numpy(), actual[col].to_numpy()
+        if x.dtype.kind == 'f' or y.dtype.kind == 'f':
+            assert np.array_equal(x.astype(float), y.astype(float), equal_nan=True), f"{col} differs"
+        else:
+            assert (x == y).all(), f"{col} differs"
+
+
+def test_store_replay_is_bit_identical_to_batch(games):
+    df_batch = batch_features(games)
+    df_store = TeamFeatureStore().process(games)
+
+    assert len(df_store) == len(df_batch) == 2 * len(games)
+    assert_same_rows(df_batch.reset_index(drop=True), df_store)
+
+
+def test_incremental_update_matches_batch_for_next_day(games, tmp_path):
+    """
+    State built from history (and saved/loaded) must give the same pre-game rows
+    for tomorrow's slate as recomputing everything.
+    """
+    dates = games['date'].sort_values().unique()
+    # A slate without a doubleheader: its second game would need the first one's result
+    day = next(d for d in dates[100:] if not games[games['date'] == d].duplicated(['home_abbr', 'away_abbr']).any())
+    history = games[games['date'] < day]
+    today = games[games['date'] == day]
+
+    store = TeamFeatureStore()
+    store.update(history)
+    store.save(str(tmp_path / "team_state.json"))
+    store = TeamFeatureStore.load(str(tmp_path / "team_state.json"))
+
+    df_next = store.features_for(today)
+
+    df_batch = batch_features(pd.concat([history, today]))
+    df_batch = df_batch[df_batch['date'] == day].reset_index(drop=True)
+
+    assert len(df_next) == 2 * len(today)
+    assert 'result' not in df_next.columns
+    assert_same_rows(df_batch, df_next)
+
+
+def test_update_skips_days_already_absorbed(games, tmp_path):
+    """
+    Re-running a day's update (after a reload, too) must not count its games twice
+    """
+    day = games['date'].sort_values().unique()[100]
+    once = TeamFeatureStore()
+    once.update(games[games['date'] <= day])
+
+    twice = TeamFeatureStore()
+    twice.update(games[games['date'] < day])
+    twice.update(games[games['date'] == day])
+    twice.save(str(tmp_path / "team_state.json"))
+    twice = TeamFeatureStore.load(str(tmp_path / "team_state.json"))
+    twice.update(games[games['date'] == day])
+
+    assert twice.last_update == once.last_update == day
+    assert {t: s.to_dict() for t, s in twice.teams.items()} == {t: s.to_dict() for t, s in once.teams.items()}
+
+
+def test_feature_index_as_of_lookups(games):
+    """
+    "As of D" is the form after the team's last game before D: exactly the pre-game row of its
+    next game on or after D in the batch pipeline, never anything from D itself.
+    """
+    df_features = batch_features(games)
+    index = FeatureIndex.from_games(games)
+
+    rng = np.random.default_rng(1)
+    teams = rng.choice(list(index.teams) + ['XXX'], 200)
+    dates = df_features['date'].min() - pd.Timedelta(days=3) + pd.to_timedelta(rng.integers(0, 200, 200), unit='D')
+
+    df_lookup = index.lookup(teams, dates)
+
+    for i, (team, date) in enumerate(zip(teams, dates)):
+        rows = df_features[df_features['team'] == team]
+        history, upcoming = rows[rows['date'] < date], rows[rows['date'] >= date]
+        single = index.as_of(team, date)
+        if history.empty:
+            assert df_lookup.iloc[i][index.feature_cols].isna().all()
+            assert pd.isna(single.name)
+            continue
+        assert df_lookup.loc[i, 'last_game_date'] == history['date'].iloc[-1] == single.name
+        if upcoming.empty:
+            continue
+        expected = upcoming.iloc[0][index.feature_cols].astype(float).to_numpy()
+        np.testing.assert_array_equal(df_lookup.loc[i, index.feature_cols].astype(float), expected)
+        np.testing.assert_array_equal(single.values, expected)
+
+    vector = index.matchup('NYY', 'BOS', dates[50])
+    batched = index.matchups(['NYY'], ['BOS'], [dates[50]]).iloc[0]
+    np.testing.assert_array_equal(vector.values, batched.values.astype(float))
+
+
+def test_feature_index_matchup_on_a_day_without_games(games):
+    """
+    On a date the team did not play, the matchup vector includes its last game: the same
+    model inputs as the incremental store after all earlier games
+    """
+    index = FeatureIndex.from_games(games)
+    nyy = games[(games['home_abbr'] == 'NYY') | (games['away_abbr'] == 'NYY')]
+    off_day = next(d for d in pd.date_range(nyy['date'].iloc[20], periods=30) if not (nyy['date'] == d).any())
+    after_season = games['date'].max() + pd.Timedelta(days=1)
+
+    for day in (off_day, after_season):
+        store = TeamFeatureStore()
+        store.update(games[games['date'] < day])
+        game = pd.DataFrame({'date': [day], 'home_abbr': ['NYY'], 'away_abbr': ['BOS'],
+                             'home_team_abbr': ['NYY'], 'away_team_abbr': ['BOS'], 'home_moneyline': [np.nan]})
+        expected = store.features_for(game)
+        expected = expected[expected['team'] == 'NYY'].iloc[0]
+
+        vector = index.matchup('NYY', 'BOS', day)
+        assert vector['rest_days'] == (day - nyy.loc[nyy['date'] < day, 'date'].max()).days
+        for col in MODEL_FEATURES:
+            if col.endswith('_code'):
+                continue
+            assert float(vector[col]) == float(expected[col]), col
+        assert (vector['team_code'], vector['opponent_code']) == tuple(features.team_codes(['NYY', 'BOS']))
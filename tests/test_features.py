@@ -51,3 +51,127 @@ def test_rolling_features_shift_logic():
     assert actual_rolling == 3.5, f"Expected 3.5, got {actual_rolling}. Leakage detected!"
 
     print("Rolling Window Test Passed: No Data Leakage detected.")
+
+
+def test_vectorized_rolling_matches_groupby_reference():
+    """
+    The prefix-sum engine must reproduce groupby().shift(1).rolling() exactly (once stored
+    as float32), with interleaved teams, unsorted rows and missing values.
+    """
+    rng = np.random.default_rng(7)
+    n = 300
+    df = pd.DataFrame({
+        'date': pd.to_datetime('2023-04-01') + pd.to_timedelta(rng.integers(0, 150, n), unit='D'),
+        'team': rng.choice(['NYY', 'BOS', 'TB', 'TOR'], n),
+        'opponent': 'BAL',
+        'runs_scored': rng.integers(0, 12, n),
+        'runs_allowed': rng.integers(0, 12, n),
+        'hits': rng.integers(0, 15, n).astype(float),
+        'errors': rng.integers(0, 3, n),
+    })
+    df.loc[[5, 50, 120], 'hits'] = np.nan
+
+    window = 4
+    df_engineered = features.calculate_rolling_features(df, window_size=window)
+
+    for metric in ['runs_scored', 'runs_allowed', 'hits', 'errors']:
+        expected = df.groupby('team')[metric].transform(lambda x: x.shift(1).rolling(window).mean())
+        np.testing.assert_array_equal(df_engineered[f'rolling_{window}_{metric}'].values, expected.values.astype(np.float32))
+
+    runs = df.groupby('team')['runs_scored'].transform(lambda x: x.shift(1).rolling(window).sum())
+    allowed = df.groupby('team')['runs_allowed'].transform(lambda x: x.shift(1).rolling(window).sum())
+    expected_pythag = (runs ** 2) / ((runs ** 2) + (allowed ** 2) + 1e-9)
+    np.testing.assert_array_equal(df_engineered['rolling_pythag_win_pct'].values, expected_pythag.values.astype(np.float32))
+
+
+def test_form_features_spec_matches_single_window_calls():
+    """
+    One multi-window pass must give the same columns as separate single-window calls,
+    and the EWMA columns must still exclude the current game.
+    """
+    rng = np.random.default_rng(3)
+    n = 200
+    df = pd.DataFrame({
+        'date': pd.date_range('2023-04-01', periods=n, freq='D'),
+        'team': rng.choice(['NYY', 'BOS', 'TB'], n),
+        'opponent': 'BAL',
+        'runs_scored': rng.integers(0, 12, n),
+        'runs_allowed': rng.integers(0, 12, n),
+        'hits': rng.integers(0, 15, n),
+        'errors': rng.integers(0, 3, n),
+    })
+    spec = {'metrics': ['runs_scored', 'runs_allowed', 'hits', 'errors'], 'windows': [3, 5], 'ewm_spans': [4], 'primary_window': 5}
+
+    df_form = features.calculate_form_features(df, spec)
+    assert [c for c in df_form.columns if c not in df.columns] == features.form_feature_columns(spec)
+
+    for window in spec['windows']:
+        single = features.calculate_rolling_features(df, window_size=window)
+        np.testing.assert_array_equal(df_form[f'rolling_{window}_hits'], single[f'rolling_{window}_hits'])
+
+    single = features.calculate_rolling_features(df, window_size=3)
+    np.testing.assert_array_equal(df_form['rolling_3_pythag_win_pct'], single['rolling_pythag_win_pct'])
+
+    expected_ewm = df.groupby('team')['runs_scored'].transform(lambda x: x.shift(1).ewm(span=4).mean())
+    np.testing.assert_array_equal(df_form['ewm_4_runs_scored'], expected_ewm.astype(np.float32))
+
+
+def test_team_codes_are_stable_across_frames(capsys):
+    """
+    Codes come from the fixed team dictionary, not from whichever teams a frame happens to hold.
+    """
+    from src.mlb_betting.config import TEAMS, TEAM_CODES
+
+    df_master = pd.DataFrame({
+        'date': pd.to_datetime(['2023-04-01', '2023-04-02']),
+        'home_team_abbr': ['NYY', 'SEA'], 'away_team_abbr': ['BOS', 'XXX'],
+        'home_score': [5, 2], 'away_score': [3, 4],
+        'home_hits': [9, 6], 'away_hits': [7, 8],
+        'home_errors': [0, 1], 'away_errors': [1, 0],
+        'home_moneyline': [-150, 120], 'away_moneyline': [130, -140],
+    })
+    df_long = features.create_team_centric_df(df_master)
+
+    assert df_long['team'].dtype == features.TEAM_DTYPE
+    assert df_long['team'].cat.codes.dtype == np.int8
+    assert df_long['runs_scored'].dtype == np.float32
+    assert df_long['is_home'].dtype == np.int8
+    assert df_long['team'].isna().sum() == 1, "Unknown abbreviations should become missing"
+    assert "⚠️ Unknown odds team abbreviations: ['XXX'] (2 team rows without a team or opponent code)" in capsys.readouterr().out
+
+    codes = features.team_codes(df_long['team'])
+    assert list(codes[:3]) == [TEAM_CODES['BOS'], TEAM_CODES['NYY'], TEAM_CODES['SEA']]
+    assert list(features.team_codes(['SEA', 'XXX', None])) == [TEAMS.index('SEA'), -1, -1]
+
+
+def test_opponent_features_pair_the_two_sides_of_each_game():
+    """
+    A doubleheader must not cross-join: each row gets its own game's opponent row
+    """
+    df_master = pd.DataFrame({
+        'game_id': [1, 2, 3],
+        'date': pd.to_datetime(['2023-05-01', '2023-05-02', '2023-05-02']),
+        'home_team_abbr': ['NYY', 'NYY', 'NYY'], 'away_team_abbr': ['BOS', 'BOS', 'BOS'],
+        'home_score': [5, 1, 7], 'away_score': [2, 3, 0],
+        'home_hits': [9, 4, 11], 'away_hits': [6, 8, 3],
+        'home_errors': [0, 1, 0], 'away_errors': [1, 0, 2],
+        'home_moneyline': [-120, -110, -130], 'away_moneyline': [100, -110, 110],
+    })
+    df_long = features.create_team_centric_df(df_master)
+    df = features.calculate_advanced_features(features.calculate_rolling_features(df_long, window_size=1))
+
+    assert len(df) == 6
+    assert sorted(df['game_id']) == [1, 1, 2, 2, 3, 3]
+    for _, row in df.iterrows():
+        other = df[(df['game_id'] == row['game_id']) & (df['team'] != row['team'])].iloc[0]
+        assert np.array_equal(row['opp_pythag_win_pct'], other['rolling_pythag_win_pct'], equal_nan=True)
+
+    # Game 3 (second of the doubleheader) sees game 2 in both teams' windows
+    nyy_game_3 = df[(df['game_id'] == 3) & (df['team'] == 'NYY')].iloc[0]
+    assert nyy_game_3['rolling_1_runs_scored'] == 1
+    assert nyy_game_3['opp_pythag_win_pct'] == pytest.approx(9 / 10, abs=1e-6)
+
+    # Real-sized ids survive the float32 downcast of the metrics
+    df_ids = features.compact_dtypes(df_long.assign(game_id=df_long['game_id'] + 202300000))
+    assert df_ids['game_id'].dtype == 'int64' and df_ids['runs_scored'].dtype == 'float32'
+    assert sorted(df_ids['game_id'].unique()) == [202300001, 202300002, 202300003]
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.mlb_betting.instrumentation import RunMetrics, compare_runs, load_runs
+
+
+def test_stage_records_time_memory_rows_and_profile(tmp_path):
+    metrics = RunMetrics(trace_memory=True, profile_stage='sum', profile_dir=str(tmp_path / "profiles"))
+
+    with metrics.stage('allocate', rows_in=10) as record:
+        values = np.ones((1000, 1000))
+        record['rows_out'] = len(values)
+    frame = metrics.track('sum', lambda df: df.cumsum(), pd.DataFrame({'x': range(500)}), rows_in=500)
+    metrics.track('totals', lambda: {'a': 1, 'b': 2})
+
+    allocate, total, totals = metrics.stages
+    assert allocate['rows_in'] == 10 and allocate['rows_out'] == 1000
+    assert allocate['tracemalloc_peak_mb'] >= 8
+    assert allocate['wall_s'] > 0 and allocate['cpu_s'] >= 0 and allocate['peak_rss_mb'] > 0
+    assert total['rows_out'] == len(frame) == 500
+    assert totals['rows_out'] is None
+    assert Path(total['profile']).exists() and 'profile' not in allocate
+
+    # Stages that raise are still recorded
+    with pytest.raises(ZeroDivisionError):
+        with metrics.stage('broken'):
+            1 / 0
+    assert metrics.stages[-1]['stage'] == 'broken'
+
+
+def test_runs_append_and_compare(tmp_path):
+    path = str(tmp_path / "runs.jsonl")
+    for seconds in (1.0, 1.5):
+        metrics = RunMetrics()
+        metrics.stages = [{'stage': 'train', 'wall_s': seconds}, {'stage': 'simulate', 'wall_s': 0.1},
+                          {'stage': 'simulate', 'wall_s': 0.1}]
+        metrics.write(path)
+
+    runs = load_runs(path)
+    assert len(runs) == 2 and runs[0]['run_id'] != runs[1]['run_id']
+
+    table = compare_runs(runs)
+    assert table.loc['train', 'change_%'] == pytest.approx(50)
+    assert table.loc['simulate', runs[0]['run_id']] == pytest.approx(0.2)
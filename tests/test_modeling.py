@@ -0,0 +1,300 @@
+import subprocess
+import sys
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import arviz as az
+import numpy as np
+import pandas as pd
+import pytest
+from src.mlb_betting.modeling import BayesianBettingModel, posterior_probabilities
+
+
+@pytest.fixture
+def fitted_model(tmp_path):
+    """
+    Model with a hand-made posterior (2 chains x 300 draws) and fitted preprocessing
+    """
+    rng = np.random.default_rng(0)
+    feature_cols = ['a', 'b', 'c']
+    df = pd.DataFrame(rng.normal(size=(500, 3)), columns=feature_cols)
+    df.loc[::7, 'b'] = np.nan
+
+    model = BayesianBettingModel(model_path=str(tmp_path / "model.nc"))
+    model.feature_cols = feature_cols
+    model.fit_preprocessing(df[feature_cols].values)
+    model.trace = az.from_dict(posterior={
+        'alpha': rng.normal(0.1, 0.05, (2, 300)),
+        'betas': rng.normal([0.5, -0.3, 0.0], 0.1, (2, 300, 3)),
+    })
+    return model, df, feature_cols
+
+
+def test_closed_form_predict_matches_draw_by_draw_average(fitted_model):
+    model, df, feature_cols = fitted_model
+
+    X = model.transform(df[feature_cols].values)
+    alpha, betas = model.posterior_draws()
+    assert alpha.shape == (600,) and betas.shape == (600, 3)
+
+    expected = np.mean([1 / (1 + np.exp(-(a + X @ b))) for a, b in zip(alpha, betas)], axis=0)
+
+    # Chunking must not change anything
+    probs = model.predict(df, feature_cols, chunk_size=64)
+    np.testing.assert_allclose(probs, expected, rtol=1e-12)
+    np.testing.assert_allclose(model.predict(df, feature_cols), probs, rtol=1e-12)
+    assert 'posterior_predictive' not in model.trace.groups(), "Scoring must not grow the trace"
+
+
+def test_predict_credible_interval(fitted_model):
+    model, df, feature_cols = fitted_model
+
+    df_probs = model.predict(df, feature_cols, credible_interval=0.9, chunk_size=100)
+    assert list(df_probs.columns) == ['prob_mean', 'prob_lower', 'prob_upper']
+    assert (df_probs['prob_lower'] <= df_probs['prob_mean']).all()
+    assert (df_probs['prob_mean'] <= df_probs['prob_upper']).all()
+
+    # Same interval straight from the helper
+    X = model.transform(df[feature_cols].values)
+    alpha, betas = model.posterior_draws()
+    df_helper = posterior_probabilities(X, alpha, betas, quantiles=[0.05, 0.95])
+    np.testing.assert_allclose(df_probs['prob_lower'], df_helper['prob_q0.05'])
+    np.testing.assert_allclose(df_probs['prob_upper'], df_helper['prob_q0.95'])
+
+
+def test_numpy_preprocessing_matches_sklearn(fitted_model):
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler
+
+    model, df, feature_cols = fitted_model
+    X = df[feature_cols].values
+    imputer = SimpleImputer(strategy='mean').fit(X)
+    scaler = StandardScaler().fit(imputer.transform(X))
+
+    X_new = X[::-1].copy()
+    np.testing.assert_allclose(model.transform(X_new), scaler.transform(imputer.transform(X_new)), rtol=1e-12)
+
+
+def test_artifact_round_trip_and_cold_start(fitted_model, tmp_path):
+    """
+    A fresh process scores from the artifact alone: same probabilities,
+    and neither PyMC, ArviZ nor scikit-learn gets imported.
+    """
+    model, df, feature_cols = fitted_model
+    artifact_dir = model.save(str(tmp_path / "artifact"))
+    expected = model.predict(df, feature_cols)
+
+    loaded = BayesianBettingModel.load(artifact_dir)
+    assert isinstance(loaded.draws, np.memmap)
+    np.testing.assert_array_equal(loaded.predict(df), expected)
+
+    with pytest.raises(ValueError):
+        loaded.predict(df, ['a', 'c', 'b'])
+
+    # Lazy load through model_path, as main.py does
+    lazy = BayesianBettingModel(model_path=str(tmp_path / "artifact.nc"))
+    np.testing.assert_array_equal(lazy.predict(df, feature_cols), expected)
+
+    df.to_parquet(tmp_path / "rows.parquet")
+    script = (
+        "import sys, numpy as np, pandas as pd\n"
+        f"sys.path.append({str(PROJECT_ROOT)!r})\n"
+        "from src.mlb_betting.modeling import BayesianBettingModel\n"
+        f"model = BayesianBettingModel.load({artifact_dir!r})\n"
+        f"probs = model.predict(pd.read_parquet({str(tmp_path / 'rows.parquet')!r}))\n"
+        f"np.save({str(tmp_path / 'probs.npy')!r}, probs)\n"
+        "heavy = [m for m in ('pymc', 'arviz', 'sklearn') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+    np.testing.assert_array_equal(np.load(tmp_path / "probs.npy"), expected)
+
+
+def test_training_backends_share_the_draws_interface(tmp_path):
+    """
+    Every backend must give (chain, draw) alpha / betas that predict() and save() can use,
+    and land near the same posterior on an easy problem.
+    """
+    rng = np.random.default_rng(5)
+    feature_cols = ['a', 'b']
+    df = pd.DataFrame(rng.normal(size=(400, 2)), columns=feature_cols)
+    true_logit = 0.3 + 1.2 * df['a'] - 0.8 * df['b']
+    df['result'] = (rng.random(400) < 1 / (1 + np.exp(-true_logit))).astype(int)
+
+    means = {}
+    for backend in ['laplace', 'advi', 'fullrank_advi', 'nuts']:
+        model = BayesianBettingModel(model_path=str(tmp_path / f"{backend}.nc"))
+        model.train(df, feature_cols, backend=backend, draws=400, tune=300, chains=2, cores=1, vi_iterations=10000, random_seed=1)
+
+        alpha, betas = model.posterior_draws()
+        assert alpha.shape == (400,) and betas.shape == (400, 2)
+        assert model.training['backend'] == backend
+
+        loaded = BayesianBettingModel.load(model.artifact_dir)
+        np.testing.assert_allclose(loaded.predict(df), model.predict(df, feature_cols))
+        means[backend] = np.r_[alpha.mean(), betas.mean(axis=0)]
+
+    for backend, mean in means.items():
+        np.testing.assert_allclose(mean, means['nuts'], atol=0.1, err_msg=backend)
+
+    with pytest.raises(ValueError):
+        BayesianBettingModel(model_path=str(tmp_path / "x.nc")).train(df, feature_cols, backend='gibbs')
+
+
+def test_default_nuts_chains_are_capped_on_many_cores(tmp_path, monkeypatch):
+    import pymc as pm
+
+    calls = []
+    def fake_sample(draws, tune, chains, cores, random_seed=None, **kwargs):
+        calls.append({'draws': draws, 'chains': chains, 'cores': cores})
+        rng = np.random.default_rng(0)
+        return az.from_dict(posterior={'alpha': rng.normal(size=(chains, draws)),
+                                       'betas': rng.normal(size=(chains, draws, 1))})
+
+    monkeypatch.setattr(pm, 'sample', fake_sample)
+    monkeypatch.setattr('os.cpu_count', lambda: 32)
+    df = pd.DataFrame({'a': np.arange(20.0), 'result': [0, 1] * 10})
+    model = BayesianBettingModel(model_path=str(tmp_path / "model.nc"))
+
+    model.train(df, ['a'], draws=2000)
+    assert calls[-1] == {'draws': 500, 'chains': 4, 'cores': 4}
+    # Explicit chains are still honoured
+    model.train(df, ['a'], draws=2000, chains=8, cores=8)
+    assert calls[-1] == {'draws': 250, 'chains': 8, 'cores': 8}
+
+
+def test_adaptive_sampling_stops_when_converged(tmp_path):
+    """
+    An easy posterior converges after the first block, far below the budget,
+    and the diagnostics end up in the saved artifact.
+    """
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(rng.normal(size=(300, 2)), columns=['a', 'b'])
+    df['result'] = (rng.random(300) < 1 / (1 + np.exp(-df['a']))).astype(int)
+
+    model = BayesianBettingModel(model_path=str(tmp_path / "model.nc"))
+    model.train(df, ['a', 'b'], adaptive=True, draws=8000, tune=300, block_size=200, random_seed=3)
+
+    diagnostics = model.training['diagnostics']
+    assert diagnostics['converged']
+    assert diagnostics['max_rhat'] <= 1.01 and diagnostics['min_ess_bulk'] >= 400
+    assert model.training['draws'] == 4 * diagnostics['draws_per_chain'] < 8000
+    assert len(model.posterior_draws()[0]) == model.training['draws']
+
+    # A target that cannot be met runs to the budget
+    model.train(df, ['a', 'b'], adaptive=True, draws=1600, tune=300, block_size=200,
+                targets={'ess_bulk': 10**6}, random_seed=3)
+    assert not model.training['diagnostics']['converged']
+    assert [b['draws_per_chain'] for b in model.training['diagnostics']['blocks']] == [200, 400]
+
+    saved = BayesianBettingModel.load(model.artifact_dir).training
+    assert saved['diagnostics']['blocks'][-1]['draws_per_chain'] == 400
+
+
+def test_adaptive_chains_run_in_parallel_workers(tmp_path):
+    """
+    Worker processes keep every chain's state between blocks, so the parallel run draws exactly
+    what the in-process run draws. Adaptive mode has its own (larger) budget and needs NUTS.
+    """
+    from src.mlb_betting.modeling import ADAPTIVE_MAX_DRAWS
+
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(rng.normal(size=(300, 2)), columns=['a', 'b'])
+    df['result'] = (rng.random(300) < 1 / (1 + np.exp(-df['a']))).astype(int)
+    options = {'adaptive': True, 'tune': 200, 'block_size': 100, 'targets': {'ess_bulk': 10**6}, 'random_seed': 5}
+
+    model = BayesianBettingModel(model_path=str(tmp_path / "model.nc"))
+    model.train(df, ['a', 'b'], draws=800, cores=2, **options)
+    assert model.training['diagnostics']['workers'] == 2
+    parallel = model.trace.posterior['betas'].values
+    model.train(df, ['a', 'b'], draws=800, cores=1, **options)
+    assert model.training['diagnostics']['workers'] == 1
+    np.testing.assert_array_equal(model.trace.posterior['betas'].values, parallel)
+    assert parallel.shape == (4, 200, 2)
+
+    assert ADAPTIVE_MAX_DRAWS > 2000
+    with pytest.raises(ValueError, match="nuts"):
+        model.train(df, ['a', 'b'], backend='advi', adaptive=True)
+
+
+def test_online_update_matches_full_refit(tmp_path):
+    """
+    Daily Laplace updates (previous posterior as the prior, new games only) must land on
+    the same posterior as one fit on all the rows with the same preprocessing.
+    """
+    from src.mlb_betting.modeling import laplace_draws
+
+    rng = np.random.default_rng(4)
+    feature_cols = ['a', 'b', 'c']
+    df = pd.DataFrame(rng.normal(size=(1200, 3)), columns=feature_cols)
+    df['result'] = (rng.random(1200) < 1 / (1 + np.exp(-(0.2 + df['a'] - 0.5 * df['c'])))).astype(int)
+
+    model = BayesianBettingModel(model_path=str(tmp_path / "model.nc"))
+    model.train(df.iloc[:600], feature_cols, backend='laplace', random_seed=0)
+    for i, start in enumerate(range(600, 1200, 100)):
+        model.update(df.iloc[start:start + 100], random_seed=i)
+    assert len(model.training['updates']) == 6
+
+    alpha, betas = model.posterior_draws()
+    updated = np.column_stack([alpha, betas])
+    alpha, betas = laplace_draws(model.transform(df[feature_cols].values), df['result'].values, 2000, random_seed=9)
+    full = np.column_stack([alpha, betas])
+
+    np.testing.assert_allclose(updated.mean(axis=0), full.mean(axis=0), atol=0.05 * full.std(axis=0).min())
+    np.testing.assert_allclose(updated.std(axis=0), full.std(axis=0), rtol=0.02)
+
+    # The saved artifact is the updated model
+    loaded = BayesianBettingModel.load(model.artifact_dir)
+    np.testing.assert_allclose(loaded.predict(df), model.predict(df, feature_cols))
+    assert len(loaded.training['updates']) == 6
+
+
+def test_saving_over_a_loaded_artifact(tmp_path):
+    """
+    A scoring process keeps its memory-mapped draws intact while a new artifact is saved
+    into the same directory; the next load() sees the new one, whole.
+    """
+    rng = np.random.default_rng(6)
+    df = pd.DataFrame(rng.normal(size=(400, 2)), columns=['a', 'b'])
+    df['result'] = (rng.random(400) < 1 / (1 + np.exp(-df['a']))).astype(int)
+
+    model = BayesianBettingModel(model_path=str(tmp_path / "model.nc"))
+    model.train(df, ['a', 'b'], backend='laplace', draws=500, random_seed=0)
+    serving = BayesianBettingModel.load(model.artifact_dir)
+    before = serving.predict(df)
+
+    model.train(df.assign(result=1 - df['result']), ['a', 'b'], backend='laplace', draws=500, random_seed=1)
+    np.testing.assert_array_equal(serving.predict(df), before)
+    reloaded = BayesianBettingModel.load(model.artifact_dir)
+    np.testing.assert_allclose(reloaded.predict(df), model.predict(df))
+    assert reloaded.training['wall_time_s'] == model.training['wall_time_s']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['model', 'model.nc']
+
+
+def test_online_update_skips_days_already_applied(tmp_path):
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame(rng.normal(size=(600, 2)), columns=['a', 'b'])
+    df['result'] = (rng.random(600) < 1 / (1 + np.exp(-df['a']))).astype(int)
+    df['date'] = pd.Timestamp("2023-04-01") + pd.to_timedelta(np.arange(600) // 20, unit='D')
+    first_days, next_day = df[df['date'] < "2023-04-25"], df[df['date'] == "2023-04-25"]
+
+    model = BayesianBettingModel(model_path=str(tmp_path / "model.nc"))
+    model.train(first_days, ['a', 'b'], backend='laplace', random_seed=0)
+    assert model.training['last_date'] == "2023-04-24"
+    model.update(next_day, random_seed=1)
+    draws = np.column_stack(model.posterior_draws())
+
+    # The same day again, from a reloaded artifact: nothing is applied
+    reloaded = BayesianBettingModel.load(model.artifact_dir)
+    reloaded.update(next_day, random_seed=2)
+    assert len(reloaded.training['updates']) == 1 and reloaded.training['last_date'] == "2023-04-25"
+    np.testing.assert_array_equal(np.column_stack(reloaded.posterior_draws()), draws)
+
+    # A batch overlapping the last day keeps only the new rows
+    reloaded.update(df[df['date'] >= "2023-04-25"], random_seed=3)
+    assert reloaded.training['updates'][-1]['rows'] == (df['date'] > "2023-04-25").sum()
@@ -0,0 +1,98 @@
+import sys
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+TEST_DIR = Path(__file__).resolve().parent
+
+PROJECT_ROOT = TEST_DIR.parent
+
+sys.path.append(str(PROJECT_ROOT))
+
+import arviz as az
+import numpy as np
+import pytest
+from src.mlb_betting import features, synthetic
+from src.mlb_betting.config import MODEL_FEATURES
+from src.mlb_betting.feature_store import TeamFeatureStore
+from src.mlb_betting.modeling import BayesianBettingModel
+from src.mlb_betting.odds import american_to_prob
+from src.mlb_betting.service import ScoringService, make_server
+
+
+@pytest.fixture
+def service():
+    """
+    Service over a hand-made posterior, with team state up to (not including) the last day
+    """
+    games = synthetic.merged_frame(synthetic.generate_games([2023], games_per_day=6, doubleheader_rate=0))
+    last_day = games['date'].max()
+
+    df_train = features.finalize_training_data(features.calculate_advanced_features(
+        features.calculate_form_features(features.create_team_centric_df(games))))
+
+    rng = np.random.default_rng(0)
+    model = BayesianBettingModel(model_path="unused.nc")
+    model.feature_cols = MODEL_FEATURES
+    model.fit_preprocessing(df_train[MODEL_FEATURES].values)
+    model.trace = az.from_dict(posterior={
+        'alpha': rng.normal(0, 0.1, (2, 200)),
+        'betas': rng.normal(0, 0.3, (2, 200, len(MODEL_FEATURES))),
+    })
+
+    store = TeamFeatureStore()
+    store.update(games[games['date'] < last_day])
+    return ScoringService(model, store), games[games['date'] == last_day]
+
+
+def test_scores_match_batch_predict_and_betting_math(service):
+    service, slate = service
+
+    payload = [
+        {'home': g.home_team_abbr, 'away': g.away_team_abbr, 'date': g.date,
+         'home_moneyline': g.home_moneyline, 'away_moneyline': g.away_moneyline}
+        for g in slate.itertuples()
+    ]
+    results = service.score(payload)
+    assert len(results) == 2 * len(slate)
+
+    # Same probabilities as the store's feature frame through model.predict
+    df_rows = service.store.features_for(slate)
+    df_rows['team_code'] = features.team_codes(df_rows['team'])
+    df_rows['opponent_code'] = features.team_codes(df_rows['opponent'])
+    expected = dict(zip(df_rows['team'].astype(str), service.model.predict(df_rows, MODEL_FEATURES)))
+
+    for result in results:
+        assert result['win_prob'] == pytest.approx(expected[result['team']], rel=1e-6)
+        assert result['vegas_prob'] == pytest.approx(float(american_to_prob(result['moneyline'])))
+        assert result['edge'] == pytest.approx(result['win_prob'] - result['vegas_prob'])
+        assert result['bet'] == (result['edge'] > 0.05)
+
+    single = service.score_matchup(payload[0]['home'], payload[0]['away'], payload[0]['date'])
+    assert single[0]['win_prob'] == results[0]['win_prob']
+    assert 'edge' not in single[0]
+
+
+def test_http_endpoint(service):
+    service, slate = service
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    game = slate.iloc[0]
+    body = json.dumps({'games': [{'home': game['home_team_abbr'], 'away': game['away_team_abbr'],
+                                  'date': str(game['date'].date()), 'home_moneyline': -130}]}).encode()
+    with urllib.request.urlopen(urllib.request.Request(f"{url}/score", data=body)) as response:
+        results = json.loads(response.read())['results']
+    assert [r['team'] for r in results] == [game['home_team_abbr'], game['away_team_abbr']]
+    assert 'edge' in results[0] and 'edge' not in results[1]
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(urllib.request.Request(f"{url}/score", data=b'{"games": [{"home": "XXX", "away": "BOS", "date": "2023-09-30"}]}'))
+    assert error.value.code == 400
+
+    with urllib.request.urlopen(f"{url}/health") as response:
+        assert json.loads(response.read())['status'] == 'ok'
+    server.shutdown()